@@ -221,6 +221,11 @@ class DirectionalVariogram(Variogram):
         # Before we do anything else, make kwargs available
         self._kwargs = self._validate_kwargs(**kwargs)
 
+        # cached results and their hit / miss counters
+        self._cache_experimental = True
+        self._cache = dict()
+        self._cache_stats = dict()
+
         # FIXME: Call __init__ of baseclass?
         # No, because the sequence at which the arguments get initialized
         # does matter. There is way too much transitive dependence, thus
@@ -230,7 +235,12 @@ class DirectionalVariogram(Variogram):
 
         if not isinstance(coordinates, MetricSpace):
             coordinates = np.asarray(coordinates)
-            coordinates = MetricSpace(coordinates.copy(), dist_func)
+            coordinates = MetricSpace(
+                coordinates,
+                dist_func,
+                dtype=self._kwargs.get('dtype', np.float64),
+                copy=self._kwargs.get('copy', True)
+            )
             # FIXME: Currently _direction_mask / _angles / _euclidean_dist don't get correctly calculated for sparse dspaces
             # coordinates = MetricSpace(coordinates.copy(), dist_func, maxlag if maxlag and not isinstance(maxlag, str) and maxlag >= 1 else None)
         else:
@@ -294,6 +304,7 @@ class DirectionalVariogram(Variogram):
         # the binning settings
         self._bin_func = None
         self._groups = None
+        self._group_index = None
         self._bins = None
         self.set_bin_func(bin_func=bin_func)
 
@@ -312,9 +323,6 @@ class DirectionalVariogram(Variogram):
         self.cov = None
         self.cof = None
 
-        # settings, not reachable by init (not yet)
-        self._cache_experimental = False
-
         # do the preprocessing and fitting upon initialization
         # Note that fit() calls preprocessing
         self.fit(force=True)
@@ -324,6 +332,11 @@ class DirectionalVariogram(Variogram):
         self._calc_diff(force=force)
         self._calc_groups(force=force)
 
+    def append(self, coordinates, values):
+        # the direction mask has to be aligned to the new point pairs
+        self._direction_mask_cache = None
+        super(DirectionalVariogram, self).append(coordinates, values)
+
     def _calc_direction_mask_data(self, force=False):
         r"""
         Calculate directional mask data.
@@ -354,9 +367,6 @@ class DirectionalVariogram(Variogram):
 
         """
 
-        # FIXME: This should be optimized for the sparse case (range << bbox(coordinates)),
-        # i.e. use the MetricSpace in self._X
-
         # check if already calculated
         if self._angles is not None and not force:
             return
@@ -369,24 +379,29 @@ class DirectionalVariogram(Variogram):
         else:
             raise NotImplementedError('N-dimensional coordinates cannot be handled')
 
+        # the angles are aligned to the point pairs of the MetricSpace
+        pairs = self._X.pairs
+
         # for angles, we need Euklidean distance,
         # no matter which distance function is used
-        # if self._dist_func_name == "euclidean":
-        #    self._euclidean_dist = scipy.spatial.distance.squareform(self.distance_matrix)
-        # else:
-        self._euclidean_dist = pdist(_x, "euclidean")
+        if pairs.implicit:
+            # all pairs in pdist order, without creating the index
+            self._euclidean_dist = pdist(_x, "euclidean")
+            xdiff = pdist(np.array([np.dot(_x, [1, 0])]).T, np.subtract)
+            ydiff = pdist(np.array([np.dot(_x, [0, 1])]).T, np.subtract)
+        else:
+            delta = _x[pairs.i] - _x[pairs.j]
+            self._euclidean_dist = np.sqrt(np.sum(delta**2, axis=1))
+            xdiff, ydiff = delta[:, 0], delta[:, 1]
 
         # Calculate the angles
         # (a - b).[1,0] = ||a - b|| * ||[1,0]|| * cos(v)
         # cos(v) = (a - b).[1,0] / ||a - b||
         # cos(v) = (a.[1,0] - b.[1,0]) / ||a - b||
-        scalar = pdist(np.array([np.dot(_x, [1, 0])]).T, np.subtract)
-        pos_angles = np.arccos(scalar / self._euclidean_dist)
+        pos_angles = np.arccos(xdiff / self._euclidean_dist)
 
         # cos(v) for [2,1] and [2, -1] is the same,
-        # but v is not (v vs -v), fix that.
-        ydiff = pdist(np.array([np.dot(_x, [0, 1])]).T, np.subtract)
-
+        # but v is not (v vs -v), fix that:
         # store the angle or negative angle, depending on the
         # amount of the x coordinate
         self._angles = np.where(ydiff >= 0, pos_angles, -pos_angles)
@@ -423,6 +438,7 @@ class DirectionalVariogram(Variogram):
         # reset groups and mask cache on azimuth change
         self._direction_mask_cache = None
         self._groups = None
+        self._invalidate()
 
     @property
     def tolerance(self):
@@ -455,6 +471,7 @@ class DirectionalVariogram(Variogram):
         # reset groups and mask on tolerance change
         self._direction_mask_cache = None
         self._groups = None
+        self._invalidate()
 
     @property
     def bandwidth(self):
@@ -498,6 +515,7 @@ class DirectionalVariogram(Variogram):
         # reset groups and direction mask cache on bandwidth change
         self._direction_mask_cache = None
         self._groups = None
+        self._invalidate()
 
     def set_directional_model(self, model_name):
         """Set new directional model
@@ -553,6 +571,7 @@ class DirectionalVariogram(Variogram):
 
         # reset the groups as the directional model changed
         self._groups = None
+        self._invalidate()
 
     @property
     def bins(self):
@@ -570,6 +589,14 @@ class DirectionalVariogram(Variogram):
 
         return self._bins.copy()
 
+    @property
+    def streaming(self):
+        """
+        The direction mask is applied to the stored lag groups, thus a
+        DirectionalVariogram does not support streaming.
+        """
+        return False
+
     def to_gstools(self, *args, **kwargs):
         raise NotImplementedError(
             "Exporting DirectinalVariogram is currently not supported."
@@ -0,0 +1,490 @@
+"""
+Grid Variogram
+"""
+import numpy as np
+from scipy import fft
+
+from .Variogram import Variogram
+
+
+class GridVariogram(Variogram):
+    """GridVariogram Class
+
+    .. versionadded:: 0.6.5
+
+    Calculates the experimental variogram of regularly gridded data, like
+    rasters or images. The sums of squared differences and the number of
+    point pairs of every lag vector on the grid are calculated by Fourier
+    transforms [201]_, at a cost of O(N log N) for N grid cells. The point
+    pairs are never enumerated, which makes whole images tractable.
+
+    The lag vectors are grouped into the same lag classes and the same
+    theoretical models are fitted, as by a
+    :class:`Variogram <skgstat.Variogram>` of the cell centers. As the
+    pairwise differences are not available, only the Matheron estimator,
+    the ``'even'`` and ``'uniform'`` binning and the euclidean distance
+    are supported. Methods that need the individual pairs, like
+    :func:`lag_classes <skgstat.Variogram.lag_classes>`, raise a
+    :class:`NotImplementedError`. Use ``plot(hist=False)`` for plotting.
+
+    References
+    ----------
+    .. [201] Marcotte, D. (1996): Fast variogram computation with FFT.
+        Computers & Geosciences, 22(10), 1175-1186.
+        https://doi.org/10.1016/S0098-3004(96)00026-X
+
+    """
+    def __init__(self,
+                 array=None,
+                 spacing=1.,
+                 mask=None,
+                 estimator='matheron',
+                 model='spherical',
+                 bin_func='even',
+                 normalize=False,
+                 fit_method='trf',
+                 fit_sigma=None,
+                 use_nugget=False,
+                 maxlag=None,
+                 n_lags=10,
+                 verbose=False,
+                 **kwargs
+                 ):
+        r"""GridVariogram Class
+
+        Parameters
+        ----------
+        array : numpy.ndarray
+            N-dimensional array of the gridded observations. NaN cells
+            are treated as missing.
+        spacing : float, tuple
+            Cell size of the grid in lag units. Either a single value for
+            all axes, or one value per axis of `array`. Defaults to ``1``.
+        mask : numpy.ndarray
+            Boolean array of the same shape as `array`. Cells that are
+            True are missing and not used in any point pair.
+        estimator : str
+            Semi-variance estimator. Only ``'matheron'`` is supported.
+        model : str
+            String identifying the theoretical variogram function.
+            See :class:`Variogram <skgstat.Variogram>`.
+        bin_func : str, list
+            Binning function, either ``'even'`` (default) or ``'uniform'``,
+            or a list of upper bin edges.
+        normalize : bool
+            Normalize the lags and semi-variances to the interval [0, 1].
+        fit_method : str
+            Fitting method. See :func:`fit <skgstat.Variogram.fit>`.
+        fit_sigma : numpy.ndarray, str
+            Fitting uncertainties. See
+            :func:`fit_sigma <skgstat.Variogram.fit_sigma>`. The
+            ``'entropy'`` option is not supported.
+        use_nugget : bool
+            If True, a nugget effect will be added to the model.
+        maxlag : float, str
+            Maximum lag distance. Can be given in lag units, as share
+            ``0 < maxlag < 1`` of the maximum lag distance, or as
+            ``'mean'`` or ``'median'`` of all point pair distances.
+        n_lags : int
+            Number of lag classes.
+        verbose : bool
+            Unused, for compatibility with
+            :class:`Variogram <skgstat.Variogram>`.
+
+        """
+        # Before we do anything else, make kwargs available
+        self._kwargs = self._validate_kwargs(**kwargs)
+
+        # cached results and their hit / miss counters
+        self._cache_experimental = True
+        self._cache = dict()
+        self._cache_stats = dict()
+
+        # handle the grid
+        array = np.asarray(array, dtype=float)
+        if array.ndim < 1 or array.size < 2:
+            raise ValueError('array has to contain at least two cells')
+
+        footprint = np.ones(array.shape, dtype=bool)
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+            if mask.shape != array.shape:
+                raise ValueError('mask has to be of the same shape as array')
+            footprint = ~mask
+        valid = footprint & np.isfinite(array)
+
+        spacing = np.broadcast_to(np.asarray(spacing, dtype=float), (array.ndim, )).copy()
+        if np.any(spacing <= 0):
+            raise ValueError('spacing has to be positive')
+
+        self._array = array
+        self._footprint = footprint
+        self._valid = valid
+        self._spacing = spacing
+        self._1d = array.ndim == 1
+
+        # there is no MetricSpace, the pairs are never enumerated
+        self._X = None
+        self._diff = None
+        self._lags = None
+
+        # set verbosity
+        self.verbose = verbose
+
+        # set values
+        self._values = None
+        self.set_values(values=array, calc_diff=True)
+
+        # lags and max lag
+        self._n_lags_passed_value = n_lags
+        self._n_lags = None
+        self.n_lags = n_lags
+        self._maxlag = None
+        self.maxlag = maxlag
+
+        # harmonize model placeholder
+        self._harmonize = False
+
+        # estimator can only be matheron
+        self._estimator = None
+        self.set_estimator(estimator_name=estimator)
+
+        # the binning settings
+        self._bin_func_name = None
+        self._bin_func = None
+        self._groups = None
+        self._group_index = None
+        self._bins = None
+        self.set_bin_func(bin_func=bin_func)
+
+        # Needed for harmonized models
+        self.preprocessing(force=False)
+
+        # model can be a function or a string
+        self._model = None
+        self.set_model(model_name=model)
+
+        # specify if the lag should be given absolute or relative to the maxlag
+        self._normalized = normalize
+
+        # set if nugget effect shall be used
+        self._use_nugget = None
+        self.use_nugget = use_nugget
+
+        # set the fitting method and sigma array
+        self._fit_method = fit_method
+        self._fit_sigma = None
+        self.fit_sigma = fit_sigma
+
+        # set attributes to be filled during calculation
+        self.cov = None
+        self.cof = None
+
+        # do the fitting upon initialization
+        self.fit(force=False)
+
+        self._experimental_conf_interval = None
+        self._model_conf_interval = None
+
+    @property
+    def coordinates(self):
+        """Coordinates property
+
+        Cell center coordinates of all valid cells, in lag units.
+
+        Returns
+        -------
+        coordinates : numpy.array
+
+        """
+        return np.argwhere(self._valid) * self._spacing
+
+    @property
+    def dim(self):
+        """
+        Dimensionality of the grid.
+        """
+        return self._array.ndim
+
+    @property
+    def dist_function(self):
+        return 'euclidean'
+
+    @dist_function.setter
+    def dist_function(self, func):
+        self.set_dist_function(func)
+
+    def set_dist_function(self, func):
+        """The grid lags only support the euclidean distance"""
+        if func != 'euclidean':
+            raise ValueError('GridVariogram only supports the euclidean distance')
+
+    def set_values(self, values, calc_diff=True):
+        """Set new values
+
+        Will set the passed grid as new value array. The array has to be
+        of the same shape as the grid the GridVariogram was created for.
+        Cells that are NaN in the new array are missing as well.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+
+        Returns
+        -------
+        void
+
+        """
+        _y = np.asarray(values, dtype=float)
+        if _y.shape != self._array.shape:
+            raise ValueError('The values have to be of the same shape as the grid')
+
+        # the missing cells of the old values do not matter
+        valid = self._footprint & np.isfinite(_y)
+        if len(set(_y[valid])) < 2:
+            raise Warning('All input values are the same.')
+
+        # other cells have other lag distances
+        if not np.array_equal(valid, self._valid):
+            self._bins = None
+        self._valid = valid
+
+        # reset fitting parameter
+        self.cof, self.cov = None, None
+        self._lags = None
+        self._groups = None
+        self._invalidate()
+
+        self._array = _y
+        self._values = _y[self._valid]
+
+        if calc_diff:
+            self._calc_diff(force=True)
+
+    def append(self, coordinates, values):
+        raise NotImplementedError('Points cannot be appended to a GridVariogram')
+
+    def set_estimator(self, estimator_name):
+        if not (isinstance(estimator_name, str) and estimator_name.lower() == 'matheron'):
+            raise ValueError("GridVariogram only supports the 'matheron' estimator")
+        super(GridVariogram, self).set_estimator(estimator_name)
+
+    def set_bin_func(self, bin_func):
+        """Set binning function
+
+        Sets a new binning function. Only ``'even'`` and ``'uniform'`` are
+        supported, as all other methods need the distances of the
+        individual point pairs. See
+        :func:`Variogram.set_bin_func <skgstat.Variogram.set_bin_func>`.
+
+        """
+        if isinstance(bin_func, str) and bin_func.lower() not in ('even', 'uniform'):
+            raise ValueError("GridVariogram only supports the 'even' and 'uniform' bin_func")
+
+        super(GridVariogram, self).set_bin_func(bin_func)
+
+        # count the point pairs of each lag vector for uniform binning
+        if isinstance(bin_func, str) and bin_func.lower() == 'uniform':
+            self._bin_func = self._uniform_count_lags
+
+    def _uniform_count_lags(self, distances, n, maxlag):
+        """
+        :func:`uniform_count_lags <skgstat.binning.uniform_count_lags>`
+        weighted by the number of point pairs of each lag vector.
+        """
+        d, count = self._lags[0], self._lags[1]
+        if maxlag is None or maxlag > d.max():
+            maxlag = d.max()
+
+        within = d <= maxlag
+        return _weighted_percentile(
+            d[within], count[within], np.arange(1, n + 1) / n
+        ), None
+
+    @property
+    def distance(self):
+        """
+        Distances of all lag vectors on the grid, that have at least one
+        point pair. Each lag vector is listed once, see
+        :func:`pair_counts <skgstat.GridVariogram.pair_counts>` for the
+        number of point pairs.
+        """
+        if self._lags is None:
+            self._calc_diff()
+        return self._lags[0]
+
+    @property
+    def pair_counts(self):
+        """
+        Number of point pairs of each lag vector, aligned to
+        :func:`distance <skgstat.GridVariogram.distance>`.
+        """
+        if self._lags is None:
+            self._calc_diff()
+        return self._lags[1].astype(int)
+
+    @property
+    def triangular_distance_matrix(self):
+        raise NotImplementedError('GridVariogram does not enumerate point pairs')
+
+    @Variogram.maxlag.setter
+    def maxlag(self, value):
+        # reset fitting
+        self.cof, self.cov = None, None
+
+        # remove bins
+        self._bins = None
+        self._groups = None
+        self._invalidate()
+
+        # mean and median of all point pairs, from the lag vector counts
+        d, count = self._lags[0], self._lags[1]
+        if value is None:
+            self._maxlag = None
+        elif isinstance(value, str):
+            if value == 'median':
+                self._maxlag = _weighted_percentile(d, count, [0.5])[0]
+            elif value == 'mean':
+                self._maxlag = np.average(d, weights=count)
+        elif value < 1:
+            self._maxlag = value * np.max(d)
+        else:
+            self._maxlag = value
+
+    def lag_classes(self):
+        raise NotImplementedError('GridVariogram does not enumerate point pairs')
+
+    def scattergram(self, *args, **kwargs):
+        raise NotImplementedError('GridVariogram does not enumerate point pairs')
+
+    def distance_difference_plot(self, *args, **kwargs):
+        raise NotImplementedError('GridVariogram does not enumerate point pairs')
+
+    def _calc_diff(self, force=False):
+        """
+        Calculates the number of point pairs and the sum of squared
+        differences of all lag vectors on the grid using FFTs.
+
+        Returns
+        -------
+        void
+
+        """
+        if self._lags is not None and not force:
+            return
+
+        self._lags = _fft_lags(self._array, self._valid, self._spacing)
+
+    def _calc_groups(self, force=False):
+        """Calculate the lag class of each lag vector"""
+        if self._groups is not None and not force:
+            return
+
+        bin_edges = self.bins
+        d = self.distance
+
+        # -1 is the group for distances outside maxlag
+        groups = np.searchsorted(bin_edges, d, side='right').astype(np.int32)
+        groups[groups == len(bin_edges)] = -1
+        self._groups = groups
+
+    @property
+    def _experimental(self):
+        """
+        Matheron semi-variance of the lag classes, aggregated from the
+        lag vectors.
+        """
+        _, count, sq = self._lags
+        groups = self.lag_groups()
+        n = len(self.bins)
+
+        inside = groups >= 0
+        counts = np.bincount(groups[inside], weights=count[inside], minlength=n)
+        sums = np.bincount(groups[inside], weights=sq[inside], minlength=n)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, sums / (2 * counts), np.nan)
+
+    def __repr__(self):  # pragma: no cover
+        """
+        Textual representation of this GridVariogram instance.
+
+        Returns
+        -------
+        str
+
+        """
+        try:
+            _name = self._model.__name__
+            _b = int(len(self.bins))
+        except Exception:
+            return "< abstract GridVariogram >"
+        return "< %s Semivariogram fitted to %d bins >" % (_name, _b)
+
+
+def _weighted_percentile(x, weights, q):
+    """Percentiles `q` in [0, 1] of `x`, with integer `weights`"""
+    order = np.argsort(x, kind='stable')
+    x, cum = x[order], np.cumsum(weights[order])
+
+    # same linear interpolation as numpy.percentile on the repeated values
+    pos = np.asarray(q, dtype=float) * (cum[-1] - 1)
+    lo, hi = np.floor(pos), np.ceil(pos)
+    xlo = x[np.searchsorted(cum, lo, side='right')]
+    xhi = x[np.searchsorted(cum, hi, side='right')]
+    return xlo + (xhi - xlo) * (pos - lo)
+
+
+def _fft_lags(array, valid, spacing):
+    """
+    Number of point pairs and sum of squared differences of all lag
+    vectors on the grid, following Marcotte (1996). Each pair of cells is
+    counted once, thus only lag vectors in one half-space are returned.
+
+    Returns
+    -------
+    d : numpy.ndarray
+        Euclidean length of the lag vectors
+    count : numpy.ndarray
+        Number of point pairs
+    sq : numpy.ndarray
+        Sum of the squared differences of the point pairs
+
+    """
+    shape = array.shape
+    pad = [fft.next_fast_len(2 * s - 1, real=True) for s in shape]
+    axes = tuple(range(array.ndim))
+
+    # center the values, which does not change the differences,
+    # but reduces the cancellation in the FFT sums
+    i = valid.astype(float)
+    z = np.where(valid, array - array[valid].mean(), 0.)
+
+    fi = fft.rfftn(i, pad, axes=axes)
+    fz = fft.rfftn(z, pad, axes=axes)
+    fz2 = fft.rfftn(z**2, pad, axes=axes)
+
+    # sum of I(x)I(x+h), I(x)Z(x+h)^2 + Z(x)^2 I(x+h) and Z(x)Z(x+h)
+    count = fft.irfftn(np.conj(fi) * fi, pad, axes=axes)
+    cross = fft.irfftn(np.conj(fi) * fz2 + np.conj(fz2) * fi, pad, axes=axes)
+    zz = fft.irfftn(np.conj(fz) * fz, pad, axes=axes)
+    sq = cross - 2 * zz
+
+    # lag vector components of the wrapped FFT output
+    lags = np.meshgrid(
+        *[np.where(np.arange(p) < s, np.arange(p), np.arange(p) - p) for s, p in zip(shape, pad)],
+        indexing='ij'
+    )
+
+    # lag vectors that are lexicographically positive and within the grid
+    half = np.zeros(count.shape, dtype=bool)
+    undecided = np.ones(count.shape, dtype=bool)
+    inside = np.ones(count.shape, dtype=bool)
+    for h, s in zip(lags, shape):
+        half |= undecided & (h > 0)
+        undecided &= h == 0
+        inside &= np.abs(h) < s
+    use = half & inside & (count > 0.5)
+
+    d = np.sqrt(sum((h[use] * dx)**2 for h, dx in zip(lags, spacing)))
+    return d, np.round(count[use]), np.maximum(sq[use], 0.)
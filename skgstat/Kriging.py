@@ -12,7 +12,7 @@ from numpy.linalg import solve as numpy_solve, LinAlgError, inv
 from multiprocessing import Pool
 
 from .Variogram import Variogram
-from .MetricSpace import MetricSpace, MetricSpacePair
+from .MetricSpace import MetricSpace, MetricSpacePair, _readonly
 
 
 class LessPointsError(RuntimeError):
@@ -44,7 +44,8 @@ class OrdinaryKriging:
             perf=False,
             sparse=False,
             coordinates=None,
-            values=None
+            values=None,
+            copy=True
     ):
         """Ordinary Kriging routine
 
@@ -95,6 +96,13 @@ class OrdinaryKriging:
 
         coordinates: numpy.ndarray, MetricSpace
         values: numpy.ndarray
+        copy : bool
+            .. versionadded:: 0.6.5
+
+            If True (default), the coordinates and values are copied. If
+            False, read-only views on the passed arrays are used. Removing
+            duplicated coordinates always creates new arrays, which are
+            not copied again.
 
         """
         # store arguments to the instance
@@ -128,12 +136,16 @@ class OrdinaryKriging:
 
         # coordinates and semivariance function
         if not isinstance(coordinates, MetricSpace):
+            n = len(coordinates)
             coordinates, values = self._remove_duplicated_coordinates(coordinates, values)
-            coordinates = MetricSpace(coordinates.copy(), self.dist_metric, self.range if self.sparse else None)
+
+            # removing duplicates already created new arrays
+            copy = copy and len(coordinates) == n
+            coordinates = MetricSpace(coordinates, self.dist_metric, self.range if self.sparse else None, copy=copy)
         else:
             assert self.dist_metric == coordinates.dist_metric, "Distance metric of variogram differs from distance metric of coordinates"
             assert coordinates.max_dist is None or coordinates.max_dist == self.range, "Sparse coordinates must have max_dist == variogram.effective_range"
-        self.values = values.copy()
+        self.values = _readonly(values, copy=copy)
         self.coords = coordinates
         self.gamma_model = Variogram.fitted_model_function(**variogram)
         self.z = None
@@ -175,12 +187,16 @@ class OrdinaryKriging:
         make it singular.
 
         """
-        c = coords
-        v = values
+        c = np.asarray(coords)
+        v = np.asarray(values)
 
         _, idx = np.unique(c, axis=0, return_index=True)
 
-        # sort the index to preserve initial order, if no duplicates were found
+        # no duplicates, avoid copying the arrays
+        if len(idx) == len(c):
+            return c, v
+
+        # sort the index to preserve initial order
         idx.sort()
 
         return c[idx], v[idx]
@@ -294,11 +310,18 @@ class OrdinaryKriging:
             self.perf_dist, self.perf_mat, self.perf_solv = [], [], []
 
         if len(x) != 1 or not isinstance(x[0], MetricSpace):
-            self.transform_coords = MetricSpace(np.column_stack(x).copy(), self.dist_metric, self.range if self.sparse else None)
+            self.transform_coords = MetricSpace(np.column_stack(x), self.dist_metric, self.range if self.sparse else None, copy=False)
         else:
             self.transform_coords = x[0]
         self.transform_coords_pair = MetricSpacePair(self.transform_coords, self.coords)
 
+        # find the neighbors of all unobserved locations at once
+        self._neighbors, _ = self.transform_coords_pair.find_closest_batch(
+            np.arange(len(self.transform_coords)),
+            self.range,
+            self._maxp
+        )
+
         # DEV: this is dirty, not sure how to do it better at the moment
         #self.sigma = np.empty(len(x[0]))
         self.sigma = np.ones(len(x[0])) * np.nan
@@ -424,11 +447,8 @@ class OrdinaryKriging:
 
         # get the point and index
         p = self.transform_coords.coords[idx, :]
-        idx = self.transform_coords_pair.find_closest(
-            idx,
-            self.range,
-            self._maxp
-        )
+        idx = self._neighbors[idx]
+        idx = idx[idx < len(self.coords)]
 
         # raise an error if not enough points are found
         if idx.size < self._minp:
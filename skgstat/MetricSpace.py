@@ -1,8 +1,13 @@
 from scipy.spatial.distance import pdist, cdist, squareform
 from scipy.spatial import cKDTree
 from scipy import sparse
+from sklearn.neighbors import BallTree
 import numpy as np
 
+from .util.cache import DistanceCache
+from .util.shared import share_array, attach_array, release
+from .util.grid import GridIndex
+
 
 def _sparse_dok_get(m, fill_value=np.NaN):
     """Like m.toarray(), but setting empty values to `fill_value`, by
@@ -19,6 +24,417 @@ def _sparse_dok_get(m, fill_value=np.NaN):
     return mm
 
 
+# name of the great circle distance metric for (lon, lat) coordinates
+GREAT_CIRCLE = "great_circle"
+
+# mean earth radius in kilometers
+EARTH_RADIUS = 6371.0088
+
+
+def _unit_vectors(coords):
+    """Map (lon, lat) coordinates in degrees to 3D unit vectors"""
+    if coords.ndim != 2 or coords.shape[1] != 2:
+        raise ValueError(
+            "Great circle distances need coordinates of shape (Npoints, 2)"
+        )
+    lon, lat = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+    return np.column_stack((
+        np.cos(lat) * np.cos(lon),
+        np.cos(lat) * np.sin(lon),
+        np.sin(lat)
+    ))
+
+
+def _chord_to_arc(chord):
+    """Convert chord lengths on the unit sphere to great circle distances"""
+    chord = np.asarray(chord, dtype=float)
+    arc = np.full(chord.shape, np.inf)
+    finite = np.isfinite(chord)
+    arc[finite] = 2 * EARTH_RADIUS * np.arcsin(np.clip(chord[finite] / 2, 0, 1))
+    return arc
+
+
+def _arc_to_chord(arc):
+    """Convert a great circle distance to the chord length on the unit sphere"""
+    if arc is None or not np.isfinite(arc):
+        return arc
+    return 2 * np.sin(min(arc / EARTH_RADIUS, np.pi) / 2)
+
+
+def great_circle_pdist(coords):
+    """
+    .. versionadded:: 0.6.5
+
+    Great circle distances in kilometers between all (lon, lat)
+    coordinate pairs, in the condensed form of
+    :func:`pdist <scipy.spatial.distance.pdist>`.
+    """
+    return _chord_to_arc(pdist(_unit_vectors(coords)))
+
+
+def great_circle_cdist(coords1, coords2):
+    """
+    .. versionadded:: 0.6.5
+
+    Great circle distances in kilometers between each pair of the two
+    (lon, lat) coordinate collections, like
+    :func:`cdist <scipy.spatial.distance.cdist>`.
+    """
+    return _chord_to_arc(cdist(_unit_vectors(coords1), _unit_vectors(coords2)))
+
+
+def _pdist(coords, dist_metric):
+    if isinstance(dist_metric, str) and dist_metric == GREAT_CIRCLE:
+        return great_circle_pdist(coords)
+    return pdist(coords, metric=dist_metric)
+
+
+def _cdist(coords1, coords2, dist_metric):
+    if isinstance(dist_metric, str) and dist_metric == GREAT_CIRCLE:
+        return great_circle_cdist(coords1, coords2)
+    return cdist(coords1, coords2, metric=dist_metric)
+
+
+def _pdist_as(coords, dist_metric, dtype, block_size=2**18):
+    """
+    Condensed distances of dtype. Single precision distances are
+    calculated in blocks of rows, which are written into the result,
+    thus the full double precision array is never allocated.
+    """
+    # the parameters of seuclidean or mahalanobis are estimated from all points
+    if dtype == np.float64 or dist_metric in PARAMETRIC_METRICS:
+        return _pdist(coords, dist_metric).astype(dtype, copy=False)
+
+    n = len(coords)
+    d = np.empty(n * (n - 1) // 2, dtype=dtype)
+    rows = max(1, block_size // max(n, 1))
+    for a in range(0, n - 1, rows):
+        b = min(a + rows, n - 1)
+        upper = np.arange(a, n)[None, :] > np.arange(a, b)[:, None]
+
+        # condensed position of the first pair of row a
+        start, stop = a * n - a * (a + 1) // 2, b * n - b * (b + 1) // 2
+        d[start:stop] = _cdist(coords[a:b], coords[a:], dist_metric)[upper]
+    return d
+
+
+# metrics that are Minkowski p-norms and can use a cKDTree
+MINKOWSKI_METRICS = {
+    "euclidean": 2,
+    "cityblock": 1,
+    "chebyshev": np.inf,
+    "minkowski": 2,
+}
+
+# BallTree metrics that need extra parameters, like the variances of
+# seuclidean, which are estimated from all points by pdist
+PARAMETRIC_METRICS = {"seuclidean", "mahalanobis", "wminkowski", "pyfunc"}
+
+
+def tree_supported(dist_metric):
+    """
+    .. versionadded:: 0.6.5
+
+    Check if a coordinate tree can be built for the given distance metric.
+    The Minkowski p-norms and great circle distances use a
+    :class:`cKDTree <scipy.spatial.cKDTree>`, all other metrics known to
+    :class:`BallTree <sklearn.neighbors.BallTree>` use a ball tree.
+    Callables and metrics with parameters, like ``'seuclidean'`` or
+    ``'mahalanobis'``, are not supported.
+    """
+    if not isinstance(dist_metric, str):
+        return False
+    return (
+        dist_metric == GREAT_CIRCLE or
+        dist_metric in MINKOWSKI_METRICS or
+        (
+            dist_metric in BallTree.valid_metrics and
+            dist_metric not in PARAMETRIC_METRICS
+        )
+    )
+
+
+def grid_supported(dist_metric):
+    """
+    .. versionadded:: 0.6.5
+
+    Check if a :class:`GridIndex <skgstat.util.grid.GridIndex>` can be
+    built for the given distance metric. Only the Minkowski p-norms
+    are supported.
+    """
+    return isinstance(dist_metric, str) and dist_metric in MINKOWSKI_METRICS
+
+
+def _build_grid(coords, dist_metric, max_dist=None):
+    """Build a grid index with cells of max_dist edge length"""
+    if not grid_supported(dist_metric):
+        raise ValueError((
+            "A grid index is only supported for the Minkowski "
+            "p-norms: %s" % ", ".join(MINKOWSKI_METRICS)
+        ))
+    return GridIndex(coords, cell_size=max_dist, p=MINKOWSKI_METRICS[dist_metric])
+
+
+def _sorted_pairs(i, j, d, n, dtype=float):
+    """Point pairs in pdist order, with the smallest index type"""
+    order = np.lexsort((j, i))
+    idx_dtype = _index_dtype(n)
+    return dict(
+        i=np.ascontiguousarray(i[order], dtype=idx_dtype),
+        j=np.ascontiguousarray(j[order], dtype=idx_dtype),
+        d=np.ascontiguousarray(d[order], dtype=dtype)
+    )
+
+
+def _build_tree(coords, dist_metric):
+    """Build the coordinate tree for the given distance metric"""
+    if not tree_supported(dist_metric):
+        raise ValueError((
+            "A coordinate tree can not be constructed "
+            "for the distance metric %s" % str(dist_metric)
+        ))
+
+    # great circles are searched by chord length of the unit vectors
+    if dist_metric == GREAT_CIRCLE:
+        return cKDTree(_unit_vectors(coords))
+    if dist_metric in MINKOWSKI_METRICS:
+        return cKDTree(coords)
+    return BallTree(coords, metric=dist_metric)
+
+
+def _sparse_distance_matrix(tree1, tree2, coords1, max_dist, dist_metric):
+    """
+    Sparse matrix of all distances between the points in tree1 and
+    tree2 up to max_dist as a `scipy.sparse.csr_matrix`.
+    """
+    if dist_metric == GREAT_CIRCLE:
+        m = tree1.sparse_distance_matrix(
+            tree2,
+            _arc_to_chord(max_dist),
+            output_type="coo_matrix"
+        ).tocsr()
+        m.data = _chord_to_arc(m.data)
+        return m
+
+    if isinstance(tree1, cKDTree):
+        return tree1.sparse_distance_matrix(
+            tree2,
+            max_dist,
+            p=MINKOWSKI_METRICS[dist_metric],
+            output_type="coo_matrix"
+        ).tocsr()
+
+    # ball tree - query all points of the left set in the right tree
+    ind, dist = tree2.query_radius(coords1, r=max_dist, return_distance=True)
+    indptr = np.concatenate(([0], np.cumsum([len(i) for i in ind])))
+    return sparse.csr_matrix(
+        (np.concatenate(dist), np.concatenate(ind), indptr),
+        shape=(len(coords1), tree2.data.shape[0])
+    )
+
+
+def _query_tree(tree, coords, k, max_dist, dist_metric):
+    """
+    Query the k closest points in tree up to max_dist. Missing
+    neighbors are indicated by the number of points in the tree
+    and a distance of infinity, like in cKDTree.query.
+    """
+    if dist_metric == GREAT_CIRCLE:
+        bound = np.inf if max_dist is None else np.nextafter(_arc_to_chord(max_dist), np.inf)
+        d, r = tree.query(_unit_vectors(coords), k=k, distance_upper_bound=bound)
+        return _chord_to_arc(d), r
+
+    if isinstance(tree, cKDTree):
+        # the tree search excludes points at exactly the upper bound
+        bound = np.inf if max_dist is None else np.nextafter(max_dist, np.inf)
+        return tree.query(
+            coords,
+            k=k,
+            p=MINKOWSKI_METRICS[dist_metric],
+            distance_upper_bound=bound
+        )
+
+    d, r = tree.query(coords, k=k)
+    if max_dist is not None:
+        out = d > max_dist
+        d[out] = np.inf
+        r[out] = tree.data.shape[0]
+    return d, r
+
+
+def _paired_dists(coords1, coords2, dist_metric):
+    """Distances between the rows of coords1 and coords2 with the same index"""
+    if isinstance(dist_metric, str):
+        if dist_metric == GREAT_CIRCLE:
+            return _chord_to_arc(np.linalg.norm(
+                _unit_vectors(coords1) - _unit_vectors(coords2), axis=1
+            ))
+        if dist_metric in MINKOWSKI_METRICS:
+            return np.linalg.norm(
+                coords1 - coords2, ord=MINKOWSKI_METRICS[dist_metric], axis=1
+            )
+        if dist_metric == "sqeuclidean":
+            return np.sum((coords1 - coords2)**2, axis=1)
+
+    # other metrics are evaluated pair by pair
+    return np.fromiter(
+        (_pdist(np.stack((a, b)), dist_metric)[0] for a, b in zip(coords1, coords2)),
+        dtype=float,
+        count=len(coords1)
+    )
+
+
+def _condensed_to_pairs(k, n):
+    """
+    Map indices into the condensed distance array of n points to the
+    point pair indices i < j.
+    """
+    k = np.asarray(k, dtype=np.int64)
+    i = (n - 2 - np.floor(np.sqrt(-8 * k + 4 * n * (n - 1) - 7) / 2 - 0.5)).astype(np.int64)
+
+    # correct floating point errors at the row boundaries
+    start = i * n - i * (i + 1) // 2
+    i = np.where(k < start, i - 1, i)
+    start = i * n - i * (i + 1) // 2
+    i = np.where(k >= start + n - 1 - i, i + 1, i)
+    start = i * n - i * (i + 1) // 2
+
+    return i, k - start + i + 1
+
+
+def _float_dtype(dtype):
+    """Check the floating point type of the distances"""
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError("dtype has to be numpy.float32 or numpy.float64")
+    return dtype
+
+
+def _readonly(arr, copy=True):
+    """
+    Read-only array of `arr`. If `copy` is False, a view on `arr` is
+    returned, which does not change the flags of `arr` itself.
+    """
+    arr = np.array(arr) if copy else np.asarray(arr).view()
+    arr.flags.writeable = False
+    return arr
+
+
+def _index_dtype(n):
+    """Smallest integer type that can index n points"""
+    return np.int32 if n <= np.iinfo(np.int32).max else np.int64
+
+
+def _pairs_from_sparse(m, n, dtype=float):
+    """
+    Extract the point pairs ``i < j`` of a sparse distance matrix in
+    the order of pdist. The pairs are taken from the lower triangle,
+    which is the same as the upper one for symmetric matrices.
+    """
+    m = m.tocoo()
+    lower = m.row > m.col
+    return _sorted_pairs(m.col[lower], m.row[lower], m.data[lower], n, dtype=dtype)
+
+
+class PairList(object):
+    """
+    .. versionadded:: 0.6.5
+
+    Compact list of point pairs of a
+    :class:`MetricSpace <skgstat.MetricSpace>`. The pairs are stored as
+    three contiguous arrays `i`, `j` and `d`, holding the indices of
+    both points and their distance. The indices use 32 bit integers,
+    if the number of points allows it.
+    If all point pairs are included, the indices are implicit in the
+    order of :func:`pdist <scipy.spatial.distance.pdist>` and only
+    created on first access.
+
+    Parameters
+    ----------
+    d : numpy.ndarray
+        Distances of the point pairs
+    n : int
+        Number of points
+    i : numpy.ndarray
+        Index of the first point of each pair. Implicit if None.
+    j : numpy.ndarray
+        Index of the second point of each pair. Implicit if None.
+
+    """
+    def __init__(self, d, n, i=None, j=None):
+        if (i is None) != (j is None):
+            raise ValueError("Either both or none of i, j have to be given.")
+        if i is None and len(d) != n * (n - 1) // 2:
+            raise ValueError("Implicit indices need the distances of all point pairs.")
+
+        self.d = d
+        self.n = n
+        self._i = i
+        self._j = j
+
+    @property
+    def implicit(self):
+        """True if the indices are implicit in pdist order"""
+        return self._i is None
+
+    def _calc_index(self):
+        dtype = _index_dtype(self.n)
+        i, j = np.triu_indices(self.n, k=1)
+        self._i, self._j = i.astype(dtype), j.astype(dtype)
+
+    @property
+    def i(self):
+        """Index of the first point of each pair"""
+        if self._i is None:
+            self._calc_index()
+        return self._i
+
+    @property
+    def j(self):
+        """Index of the second point of each pair"""
+        if self._j is None:
+            self._calc_index()
+        return self._j
+
+    def diff(self, values):
+        """
+        Absolute difference of `values` for each point pair.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Array of shape (n, ) aligned to the points
+
+        Returns
+        -------
+        diff : numpy.ndarray
+            Array aligned to `self.d`, of the same dtype
+
+        """
+        values = np.asarray(values)
+        if self.implicit:
+            # avoid creating the implicit index
+            # euclidean: sqrt((a-b)**2 + (0-0)**2) == sqrt((a-b)**2)
+            return pdist(
+                np.column_stack((values, np.zeros(len(values)))),
+                metric="euclidean"
+            ).astype(self.d.dtype, copy=False)
+
+        values = values.astype(self.d.dtype, copy=False)
+        return np.abs(values[self.i] - values[self.j])
+
+    def tocsr(self):
+        """Symmetric sparse distance matrix of shape (n, n)"""
+        i, j = self.i, self.j
+        return sparse.coo_matrix(
+            (np.concatenate((self.d, self.d)), (np.concatenate((i, j)), np.concatenate((j, i)))),
+            shape=(self.n, self.n)
+        ).tocsr()
+
+    def __len__(self):
+        return len(self.d)
+
+
 class DistanceMethods(object):
     def find_closest(self, idx, max_dist=None, N=None):
         """find neighbors
@@ -81,76 +497,678 @@ class MetricSpace(DistanceMethods):
     used for the distances, which saves space and calculation time for
     large datasets, especially where max_dist << the size of the point
     cloud in space. However, it slows things down for small datasets.
+
+    If a max_memory is specified, the distances are calculated tile by
+    tile (see :func:`tiles <skgstat.MetricSpace.tiles>`) and the dense
+    (Npoints, Npoints) matrix is never built to feed a
+    :class:`Variogram <skgstat.Variogram>`. Only the point pairs within
+    max_dist are kept. Without max_dist, all Npoints * (Npoints - 1) / 2
+    distances are still stored.
     """
 
-    def __init__(self, coords, dist_metric="euclidean", max_dist=None):
-        """ProbabalisticMetricSpace class
+    def __init__(
+            self,
+            coords,
+            dist_metric="euclidean",
+            max_dist=None,
+            max_memory=None,
+            cache=None,
+            dtype=np.float64,
+            index="tree",
+            copy=True
+        ):
+        """MetricSpace class
 
         Parameters
         ----------
         coords : numpy.ndarray
             Coordinate array of shape (Npoints, Ndim)
         dist_metric : str
-            Distance metric names as used by scipy.spatial.distance.pdist
+            Distance metric names as used by scipy.spatial.distance.pdist.
+            Additionally, ``'great_circle'`` calculates great circle
+            distances in kilometers between (lon, lat) coordinates
+            given in degrees.
+
+            .. versionchanged:: 0.6.5
+                added ``'great_circle'``
         max_dist : float
             Maximum distance between points after which the distance
             is considered infinite and not calculated.
+        max_memory : int
+            .. versionadded:: 0.6.5
+
+            Approximate memory budget in bytes for a single distance
+            tile. If set, the distances are calculated in blocks of rows
+            and the squareform distance matrix is not materialized.
+            The budget bounds the peak memory only together with
+            `max_dist`, otherwise the condensed distances of all point
+            pairs are collected.
+        cache : skgstat.util.cache.DistanceCache, str
+            .. versionadded:: 0.6.5
+
+            Persistent on-disk cache for the distances. If a path is
+            given, a :class:`DistanceCache <skgstat.util.cache.DistanceCache>`
+            is opened at that location. Cached distances are re-opened
+            as read-only memory maps instead of being calculated again.
+        dtype : numpy.dtype
+            .. versionadded:: 0.6.5
+
+            Floating point type of the distances, either ``numpy.float64``
+            (default) or ``numpy.float32``. The distances are calculated
+            in double precision and stored in `dtype`. Single precision
+            halves the memory of the point pairs, at a relative error
+            of at most ``2**-24`` (about ``6e-8``) per distance.
+        index : str
+            .. versionadded:: 0.6.5
+
+            Spatial index used for the neighbor searches. ``'tree'``
+            (default) uses the coordinate :func:`tree <skgstat.MetricSpace.tree>`,
+            ``'grid'`` a uniform grid spatial hash
+            (see :func:`grid <skgstat.MetricSpace.grid>`), which is faster
+            for regular or quasi-uniform point clouds, like raster data.
+            The grid only supports the Minkowski p-norms.
+        copy : bool
+            .. versionadded:: 0.6.5
+
+            If True (default), the MetricSpace stores a copy of `coords`.
+            If False, a read-only view on `coords` is used without
+            copying. In this case, `coords` must not be changed in place
+            afterwards.
+
+        .. versionchanged:: 0.6.5
+            The coordinates are read-only.
         """
-        self.coords = coords.copy()
+        if index not in ("tree", "grid"):
+            raise ValueError("index has to be one of 'tree', 'grid'")
+        if index == "grid" and not grid_supported(dist_metric):
+            raise ValueError(
+                "The grid index is not supported for %s" % str(dist_metric)
+            )
+
+        self.coords = _readonly(coords, copy=copy)
         self.dist_metric = dist_metric
         self.max_dist = max_dist
+        self.max_memory = max_memory
+        self.dtype = _float_dtype(dtype)
+        if isinstance(cache, str):
+            cache = DistanceCache(cache)
+        self.cache = cache
+        self.index = index
         self._tree = None
+        self._grid = None
         self._dists = None
+        self._pairs = None
+        self._shared = None
 
         # Check if self.dist_metric is valid
         try:
-            pdist(self.coords[:1, :], metric=self.dist_metric)
+            _pdist(self.coords[:1, :], self.dist_metric)
         except ValueError as e:
             raise e
 
     @property
     def tree(self):
-        """If `self.dist_metric` is `euclidean`, a `scipy.spatial.cKDTree`
-        instance of `self.coords`. Undefined otherwise."""
-        # only Euclidean supported
-        if self.dist_metric != "euclidean":
-            raise ValueError((
-                "A coordinate tree can only be constructed "
-                "for an euclidean space"
-            ))
+        """A coordinate tree of `self.coords`. Minkowski p-norms
+        (`euclidean`, `cityblock`, `chebyshev`, `minkowski`) use a
+        `scipy.spatial.cKDTree`, all other metrics supported by
+        `sklearn.neighbors.BallTree` use a ball tree. Undefined otherwise.
 
+        .. versionchanged:: 0.6.5
+            Support for non-euclidean distance metrics
+        """
         # if not cached - calculate
         if self._tree is None:
-            self._tree = cKDTree(self.coords)
+            self._tree = _build_tree(self.coords, self.dist_metric)
 
         # return
         return self._tree
 
+    @property
+    def grid(self):
+        """
+        .. versionadded:: 0.6.5
+
+        A :class:`GridIndex <skgstat.util.grid.GridIndex>` of
+        `self.coords`. If `self.max_dist` is set, the edge length of
+        the cells is `max_dist`, so that fixed-radius searches only need
+        to look into the neighboring cells. Otherwise, the cells are
+        sized to hold about two points each.
+        Only supported for the Minkowski p-norms.
+        """
+        if self._grid is None:
+            self._grid = _build_grid(self.coords, self.dist_metric, self.max_dist)
+        return self._grid
+
+    @property
+    def tiled(self):
+        """
+        .. versionadded:: 0.6.5
+
+        `True` if the distances are calculated tile by tile. This is the
+        case if `self.max_memory` is set and the distances cannot be
+        obtained from the coordinate tree.
+        """
+        if self.max_memory is None:
+            return False
+        return self.max_dist is None or not tree_supported(self.dist_metric)
+
+    def _tile_rows(self):
+        """Number of coordinate rows per distance tile"""
+        # a tile holds the distances, the masks and the pair indices,
+        # which is roughly 32 bytes per point pair
+        n = max(len(self.coords), 1)
+        return max(1, int(self.max_memory // (32 * n)))
+
+    def tiles(self):
+        """
+        .. versionadded:: 0.6.5
+
+        Iterate over the point pairs in blocks of rows. Each tile holds
+        the pairs ``i < j`` of up to
+        ``max_memory / (32 * Npoints)`` rows of the distance matrix,
+        thus the memory needed at once is bounded by `self.max_memory`.
+        If `self.max_dist` is set, only point pairs closer than
+        `self.max_dist` are returned.
+        The tiles follow the order of
+        :func:`pdist <scipy.spatial.distance.pdist>`.
+
+        Yields
+        ------
+        i : numpy.ndarray
+            Row indices of the point pairs in this tile
+        j : numpy.ndarray
+            Column indices of the point pairs in this tile
+        d : numpy.ndarray
+            Distances of the point pairs in this tile
+
+        """
+        n = len(self.coords)
+        rows = self._tile_rows() if self.max_memory is not None else n
+
+        for start in range(0, n - 1, rows):
+            stop = min(start + rows, n - 1)
+
+            # distances of the rows to all points at and after start
+            d = _cdist(
+                self.coords[start:stop],
+                self.coords[start:],
+                self.dist_metric
+            )
+
+            # use only the upper triangle
+            mask = np.arange(d.shape[1]) > np.arange(d.shape[0])[:, None]
+            if self.max_dist is not None:
+                mask &= d <= self.max_dist
+
+            r, c = np.nonzero(mask)
+            yield r + start, c + start, d[r, c]
+
+    def _cached(self, names, max_dist, calc):
+        """
+        Load the arrays `names` from `self.cache`. If they are not
+        cached, `calc` is called to create them and the result is stored.
+        """
+        if self.cache is None:
+            return calc()
+
+        key = self.cache.key(self.coords, self.dist_metric, max_dist, dtype=self.dtype)
+        arrays = self.cache.load(key, names)
+        if arrays is None:
+            arrays = self.cache.store(key, **calc())
+
+        return arrays
+
+    def _calc_tiles(self):
+        """Collect all tiles into the point pair arrays"""
+        if self.max_dist is None:
+            # preallocate, as the indices are implicit in condensed form
+            n = len(self.coords)
+            d = np.empty(n * (n - 1) // 2, dtype=self.dtype)
+            pos = 0
+            for _, _, tile in self.tiles():
+                d[pos:pos + tile.size] = tile
+                pos += tile.size
+            return dict(d=d)
+        else:
+            dtype = _index_dtype(len(self.coords))
+            i, j, d = [np.array([], dtype=dtype)], [np.array([], dtype=dtype)], [np.array([], dtype=self.dtype)]
+            for ti, tj, td in self.tiles():
+                i.append(ti.astype(dtype))
+                j.append(tj.astype(dtype))
+                d.append(td.astype(self.dtype))
+            return dict(i=np.concatenate(i), j=np.concatenate(j), d=np.concatenate(d))
+
+    def _calc_tree_pairs(self):
+        """Collect the point pairs within max_dist from the coordinate tree"""
+        m = _sparse_distance_matrix(
+            self.tree,
+            self.tree,
+            self.coords,
+            self.max_dist,
+            self.dist_metric
+        )
+        return _pairs_from_sparse(m, len(self.coords), dtype=self.dtype)
+
+    def _calc_grid_pairs(self):
+        """Collect the point pairs within max_dist from the grid index"""
+        i, j, d = self.grid.query_pairs(self.max_dist)
+        return _sorted_pairs(i, j, d, len(self.coords), dtype=self.dtype)
+
+    def _calc_pairs(self):
+        """Load or calculate the point pairs"""
+        if self.max_dist is not None and (self.tiled or tree_supported(self.dist_metric)):
+            if self.tiled:
+                calc = self._calc_tiles
+            elif self.index == "grid":
+                calc = self._calc_grid_pairs
+            else:
+                calc = self._calc_tree_pairs
+            arrays = self._cached(('i', 'j', 'd'), self.max_dist, calc)
+        elif self.tiled:
+            arrays = self._cached(('d', ), None, self._calc_tiles)
+        else:
+            arrays = self._cached(
+                ('d', ),
+                None,
+                lambda: dict(d=_pdist_as(self.coords, self.dist_metric, self.dtype))
+            )
+
+        self._pairs = PairList(
+            arrays['d'],
+            len(self.coords),
+            i=arrays.get('i'),
+            j=arrays.get('j')
+        )
+
+    @property
+    def pairs(self):
+        """
+        .. versionadded:: 0.6.5
+
+        :class:`PairList <skgstat.MetricSpace.PairList>` of all point
+        pairs ``i < j`` in the order of
+        :func:`pdist <scipy.spatial.distance.pdist>`. If `self.max_dist`
+        is set, only the point pairs within `max_dist` are included.
+        The pair list is the primary representation of the distances,
+        the :func:`dists <skgstat.MetricSpace.dists>` matrix is only
+        built from it on request.
+        """
+        if self._pairs is None:
+            self._calc_pairs()
+        return self._pairs
+
+    def _block_neighbors(self, a, b):
+        """
+        Point pairs ``i < j`` within `self.max_dist` of the rows a to b,
+        from the grid index or the coordinate tree, in pdist order
+        """
+        block = self.coords[a:b]
+        if self.index == "grid" and grid_supported(self.dist_metric):
+            i, j, d = self.grid.query_pairs(self.max_dist, coords=block)
+        else:
+            # a ball tree only needs the query points
+            tree = None if isinstance(self.tree, BallTree) else _build_tree(block, self.dist_metric)
+            m = _sparse_distance_matrix(
+                tree, self.tree, block, self.max_dist, self.dist_metric
+            ).tocoo()
+            i, j, d = m.row, m.col, m.data
+
+        i = i + a
+        upper = j > i
+        pairs = _sorted_pairs(i[upper], j[upper], d[upper], len(self.coords), dtype=self.dtype)
+        return pairs['i'], pairs['j'], pairs['d']
+
+    def iter_pairs(self, values=None, max_memory=None):
+        """
+        .. versionadded:: 0.6.5
+
+        Iterate over the point pairs in chunks, in the order of
+        :func:`pairs <skgstat.MetricSpace.pairs>`. If the pairs are not
+        yet calculated, the distances are calculated block by block of
+        rows and never stored, thus the memory is limited to one chunk.
+        If `self.max_dist` is set, only pairs within `max_dist` are
+        yielded, and the neighbors of each block are searched in the
+        coordinate tree or grid index, if the metric supports it.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            Optional array of shape (n, ) aligned to the points. If given,
+            the absolute differences of the values are yielded along
+            with the distances.
+        max_memory : int
+            Approximate memory budget of a chunk in bytes. Defaults to
+            `self.max_memory`, or 128 MB if not set.
+
+        Yields
+        ------
+        d : numpy.ndarray
+            Distances of the point pairs in the chunk
+        diff : numpy.ndarray
+            Absolute differences of `values` of the point pairs in the
+            chunk, or None if no values are given
+
+        """
+        budget = max_memory or self.max_memory or 2**27
+        n = len(self.coords)
+        v = None if values is None else np.asarray(values, dtype=np.float64)
+
+        # explicit pairs are already in memory
+        if self._pairs is not None and not self._pairs.implicit:
+            pairs = self._pairs
+            size = max(1, int(budget // 32))
+            for start in range(0, len(pairs), size):
+                stop = start + size
+                if v is None:
+                    diff = None
+                else:
+                    diff = np.abs(v[pairs.i[start:stop]] - v[pairs.j[start:stop]])
+                yield pairs.d[start:stop], diff
+            return
+
+        # blocks of rows, each row a paired with all following points
+        rows = max(1, int(budget // (32 * max(n, 1))))
+
+        # search the neighbors of each block within max_dist
+        if self._pairs is None and self.max_dist is not None and tree_supported(self.dist_metric):
+            for a in range(0, n - 1, rows):
+                i, j, d = self._block_neighbors(a, min(a + rows, n - 1))
+                diff = None if v is None else np.abs(v[i] - v[j])
+                yield d, diff
+            return
+
+        for a in range(0, n - 1, rows):
+            b = min(a + rows, n - 1)
+            upper = np.arange(a, n)[None, :] > np.arange(a, b)[:, None]
+
+            if self._pairs is not None:
+                # condensed position of the first pair of row a
+                start, stop = a * n - a * (a + 1) // 2, b * n - b * (b + 1) // 2
+                d = self._pairs.d[start:stop]
+            else:
+                d = _cdist(self.coords[a:b], self.coords[a:], self.dist_metric)[upper]
+                d = d.astype(self.dtype, copy=False)
+            diff = None if v is None else np.abs(v[a:b, None] - v[None, a:])[upper]
+
+            if self.max_dist is not None:
+                within = d <= self.max_dist
+                d = d[within]
+                diff = None if diff is None else diff[within]
+            yield d, diff
+
     @property
     def dists(self):
         """A distance matrix of all point pairs. If `self.max_dist` is
-        not `None` and `self.dist_metric` is set to `euclidean`, a
-        `scipy.sparse.csr_matrix` sparse matrix is returned.
+        not `None` and a coordinate tree is supported for
+        `self.dist_metric`, a `scipy.sparse.csr_matrix` sparse matrix
+        is returned.
+
+        .. versionchanged:: 0.6.5
+            For tiled MetricSpaces with a `max_dist`, a sparse matrix
+            is built from the tiles for any distance metric.
+
+        .. versionchanged:: 0.6.5
+            Sparse matrices are supported for all metrics that
+            support a coordinate tree.
+
+        .. versionchanged:: 0.6.5
+            The matrix is built from :func:`pairs <skgstat.MetricSpace.pairs>`.
         """
         # calculate if not cached
         if self._dists is None:
-            # check if max dist is given
-            if self.max_dist is not None and self.dist_metric == "euclidean":
-                self._dists = self.tree.sparse_distance_matrix(
-                    self.tree,
-                    self.max_dist,
-                    output_type="coo_matrix"
-                ).tocsr()
-
-            # otherwise use pdist
+            if self.pairs.implicit:
+                self._dists = squareform(self.pairs.d)
             else:
-                self._dists = squareform(
-                    pdist(self.coords, metric=self.dist_metric)
-                )
+                self._dists = self.pairs.tocsr()
 
         # return
         return self._dists
 
+    def _calc_new_pairs(self, coords, max_dist):
+        """
+        Point pairs between the existing points and the new `coords`
+        and among the new points, up to `max_dist`. The indices of the
+        new points start at ``len(self.coords)``.
+        """
+        n0, m = len(self.coords), len(coords)
+        dtype = _index_dtype(n0 + m)
+
+        # new-vs-existing, from the grid index
+        if max_dist is not None and self.index == "grid":
+            cj, ci, cd = self.grid.query_pairs(max_dist, coords=coords)
+            cj = cj + n0
+            inner = _sorted_pairs(
+                *_build_grid(coords, self.dist_metric, max_dist).query_pairs(max_dist), m
+            )
+            ni, nj, nd = inner['i'], inner['j'], inner['d']
+
+        # new-vs-existing, from the trees if possible
+        elif max_dist is not None and tree_supported(self.dist_metric):
+            tree = _build_tree(coords, self.dist_metric)
+            cross = _sparse_distance_matrix(
+                self.tree, tree, self.coords, max_dist, self.dist_metric
+            ).tocoo()
+            ci, cj, cd = cross.row, cross.col + n0, cross.data
+            inner = _pairs_from_sparse(_sparse_distance_matrix(
+                tree, tree, coords, max_dist, self.dist_metric
+            ), m)
+            ni, nj, nd = inner['i'], inner['j'], inner['d']
+
+        # otherwise, calculate the distances in chunks of existing points
+        else:
+            budget = self.max_memory or 2**27
+            rows = max(1, int(budget // (32 * m)))
+            ci, cj, cd = [], [], []
+            for start in range(0, n0, rows):
+                d = _cdist(self.coords[start:start + rows], coords, self.dist_metric)
+                if max_dist is not None:
+                    r, c = np.nonzero(d <= max_dist)
+                else:
+                    r, c = np.divmod(np.arange(d.size), m)
+                ci.append(r + start)
+                cj.append(c + n0)
+                cd.append(d[r, c])
+            ci = np.concatenate(ci) if ci else np.array([], dtype=int)
+            cj = np.concatenate(cj) if cj else np.array([], dtype=int)
+            cd = np.concatenate(cd) if cd else np.array([])
+
+            nd = _pdist(coords, self.dist_metric)
+            ni, nj = np.triu_indices(m, k=1)
+            if max_dist is not None:
+                within = nd <= max_dist
+                ni, nj, nd = ni[within], nj[within], nd[within]
+
+        # cross pairs in pdist order
+        order = np.lexsort((cj, ci))
+        return (
+            ci[order].astype(dtype), cj[order].astype(dtype), cd[order].astype(self.dtype),
+            (ni + n0).astype(dtype), (nj + n0).astype(dtype), nd.astype(self.dtype)
+        )
+
+    def append(self, coords):
+        """
+        .. versionadded:: 0.6.5
+
+        Append new points to the MetricSpace. If the point pairs were
+        already calculated, only the distances between the new and the
+        existing points and among the new points are calculated and
+        merged into :func:`pairs <skgstat.MetricSpace.pairs>`.
+        The coordinate tree and the distance matrix are rebuilt on
+        next access. If `self.cache` is set, the extended point pairs
+        are stored for the new coordinates.
+
+        Note: Instances using this MetricSpace, like a
+        :class:`Variogram <skgstat.Variogram>`, need to be updated as
+        well. Use :func:`Variogram.append <skgstat.Variogram.append>`
+        to append observations to a Variogram.
+
+        Parameters
+        ----------
+        coords : numpy.ndarray
+            Coordinate array of shape (Mpoints, Ndim)
+
+        """
+        coords = np.asarray(coords, dtype=self.coords.dtype)
+        if coords.ndim != 2 or coords.shape[1] != self.coords.shape[1]:
+            raise ValueError(
+                "The coordinates need to be of shape (Mpoints, %d)" % self.coords.shape[1]
+            )
+
+        # the extended arrays are private to this process
+        self.unshare()
+
+        pairs = self._pairs
+        max_dist = None if pairs is None or pairs.implicit else self.max_dist
+        if pairs is not None and len(coords) > 0:
+            ci, cj, cd, ni, nj, nd = self._calc_new_pairs(coords, max_dist)
+            n0 = len(self.coords)
+
+            if pairs.implicit:
+                # in pdist order, each existing row i is extended by the
+                # distances to all new points, followed by the new rows
+                rows = np.arange(1, n0 + 1)
+                row_end = rows * n0 - rows * (rows + 1) // 2
+                d = np.concatenate((
+                    np.insert(pairs.d, np.repeat(row_end, len(coords)), cd),
+                    nd
+                ))
+                arrays = dict(d=d)
+            else:
+                # new pairs are inserted after the last pair of their row
+                pos = np.searchsorted(pairs.i, ci, side='right')
+                dtype = ci.dtype
+                arrays = dict(
+                    i=np.concatenate((np.insert(pairs.i.astype(dtype), pos, ci), ni)),
+                    j=np.concatenate((np.insert(pairs.j.astype(dtype), pos, cj), nj)),
+                    d=np.concatenate((np.insert(pairs.d, pos, cd), nd))
+                )
+        else:
+            arrays = None
+
+        self.coords = _readonly(np.concatenate((self.coords, coords)), copy=False)
+        self._tree = None
+        self._grid = None
+        self._dists = None
+        self._pairs = None
+
+        if arrays is not None:
+            arrays = self._cached(tuple(arrays.keys()), max_dist, lambda: arrays)
+            self._pairs = PairList(
+                arrays['d'],
+                len(self.coords),
+                i=arrays.get('i'),
+                j=arrays.get('j')
+            )
+
+    @property
+    def shared(self):
+        """
+        .. versionadded:: 0.6.5
+
+        `True` if the coordinates and point pairs are held in shared
+        memory. See :func:`share <skgstat.MetricSpace.share>`.
+        """
+        return getattr(self, '_shared', None) is not None
+
+    def _shared_arrays(self):
+        """The arrays that are exported to shared memory"""
+        pairs = self.pairs
+        arrays = dict(coords=self.coords, d=pairs.d)
+        if not pairs.implicit:
+            arrays.update(i=pairs.i, j=pairs.j)
+        return arrays
+
+    def _set_shared_arrays(self, arrays):
+        """Use the passed arrays for the coordinates and point pairs"""
+        self.coords = arrays['coords']
+        self._pairs = PairList(
+            arrays['d'],
+            len(self.coords),
+            i=arrays.get('i'),
+            j=arrays.get('j')
+        )
+        self._dists = None
+
+    def share(self):
+        """
+        .. versionadded:: 0.6.5
+
+        Export the coordinates and the
+        :func:`pairs <skgstat.MetricSpace.pairs>` into
+        :mod:`multiprocessing.shared_memory` blocks. The point pairs
+        are calculated first, if needed. Afterwards, this MetricSpace
+        uses read-only views on the blocks. Pickled copies, as sent to
+        `joblib` or `multiprocessing` workers, only carry the names of
+        the blocks and re-attach to them without copying the arrays.
+        The coordinate tree is rebuilt from the shared coordinates in
+        each worker on first access.
+
+        The blocks are owned by this instance and need to be released
+        by :func:`unshare <skgstat.MetricSpace.unshare>`.
+
+        Returns
+        -------
+        self : MetricSpace
+
+        """
+        if self.shared:
+            return self
+
+        shared, views = dict(), dict()
+        for name, arr in self._shared_arrays().items():
+            shared[name], views[name] = share_array(arr)
+
+        self._set_shared_arrays(views)
+        self._shared = shared
+        self._shared_owner = True
+
+        return self
+
+    def unshare(self):
+        """
+        .. versionadded:: 0.6.5
+
+        Copy the coordinates and point pairs back into the memory of
+        this process and release the shared memory blocks. If this
+        instance created the blocks, they are removed and can no
+        longer be attached to.
+        """
+        if not self.shared:
+            return
+
+        arrays = {k: _readonly(v) for k, v in self._shared_arrays().items()}
+        self._set_shared_arrays(arrays)
+
+        for shm in self._shared.values():
+            release(shm, unlink=self._shared_owner)
+        self._shared = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if not self.shared:
+            return state
+
+        # only pass the names of the shared blocks
+        state['_shared'] = {
+            name: (self._shared[name].name, arr.shape, arr.dtype.str)
+            for name, arr in self._shared_arrays().items()
+        }
+        state['_shared_owner'] = False
+        state.update(coords=None, _pairs=None, _tree=None, _grid=None, _dists=None)
+        return state
+
+    def __setstate__(self, state):
+        shared = state.get('_shared')
+        self.__dict__.update(state)
+        if shared is None:
+            return
+
+        # attach to the shared blocks
+        self._shared, views = dict(), dict()
+        for name, (shm_name, shape, dtype) in shared.items():
+            self._shared[name], views[name] = attach_array(shm_name, shape, dtype)
+        self._set_shared_arrays(views)
+
     def diagonal(self, idx=None):
         """
         Return a diagonal matrix (as per
@@ -168,6 +1186,13 @@ class MetricSpace(DistanceMethods):
             squareform matrix of the subset of coordinates
 
         """
+        # tiled spaces calculate the subset directly
+        if self.tiled and idx is not None:
+            dists = _pdist(self.coords[idx], self.dist_metric)
+            if self.max_dist is not None:
+                dists[dists > self.max_dist] = np.inf
+            return dists
+
         # get the dists
         dist_mat = self.dists
 
@@ -231,30 +1256,131 @@ class MetricSpacePair(DistanceMethods):
     @property
     def dists(self):
         """A distance matrix of all point pairs. If `self.max_dist` is
-        not `None` and `self.dist_metric` is set to `euclidean`, a
-        `scipy.sparse.csr_matrix` sparse matrix is returned.
+        not `None` and a coordinate tree is supported for
+        `self.dist_metric`, a `scipy.sparse.csr_matrix` sparse matrix
+        is returned.
         """
         # if not cached, calculate
         if self._dists is None:
-            # handle euclidean with max_dist with Tree
-            if self.max_dist is not None and self.dist_metric == "euclidean":
-                self._dists = self.ms1.tree.sparse_distance_matrix(
+            # handle max_dist with the grid index
+            if self.max_dist is not None and self.ms2.index == "grid":
+                i, j, d = self.ms2.grid.query_pairs(self.max_dist, coords=self.ms1.coords)
+                self._dists = sparse.csr_matrix(
+                    (d, (i, j)),
+                    shape=(len(self.ms1), len(self.ms2))
+                )
+
+            # handle max_dist with Tree
+            elif self.max_dist is not None and tree_supported(self.dist_metric):
+                self._dists = _sparse_distance_matrix(
+                    self.ms1.tree,
                     self.ms2.tree,
+                    self.ms1.coords,
                     self.max_dist,
-                    output_type="coo_matrix"
-                ).tocsr()
+                    self.dist_metric
+                )
 
             # otherwise Tree not possible
             else:
-                self._dists = cdist(
+                self._dists = _cdist(
                     self.ms1.coords,
                     self.ms2.coords,
-                    metric=self.ms1.dist_metric
+                    self.ms1.dist_metric
                 )
 
         # return
         return self._dists
 
+    def find_closest_batch(self, idxs, max_dist=None, N=None):
+        """
+        .. versionadded:: 0.6.5
+
+        Find the (N) closest points (in the right set) to all points
+        with the indices idxs (in the left set) at once. If the distance
+        metric supports a coordinate tree, a single tree query is used,
+        otherwise the distances are calculated in chunks of rows.
+        Unlike :func:`find_closest <skgstat.MetricSpacePair.find_closest>`,
+        the neighbors are always ordered by distance.
+
+        Parameters
+        ----------
+        idxs : numpy.ndarray
+            Indices of the points that the N closest neighbors
+            are searched for.
+        max_dist : float
+            Maximum distance at which other points are searched
+        N : int
+            Number of points searched. Defaults to all points.
+
+        Returns
+        -------
+        ridx : numpy.ndarray
+            Array of shape (len(idxs), N) holding the indices of the
+            closest points. Missing neighbors are padded with
+            ``len(self.ms2)``.
+        dists : numpy.ndarray
+            Array of shape (len(idxs), N) holding the distances to the
+            closest points. Missing neighbors are padded with ``np.inf``.
+
+        """
+        if max_dist is None:
+            max_dist = self.max_dist
+        else:
+            if self.max_dist is not None and max_dist != self.max_dist:
+                raise AttributeError(
+                    "max_dist specified and max_dist != self.max_dist"
+                )
+
+        idxs = np.atleast_1d(np.asarray(idxs, dtype=int))
+        n = len(self.ms2)
+        N = n if N is None else min(N, n)
+
+        ridx = np.full((len(idxs), N), n, dtype=int)
+        dists = np.full((len(idxs), N), np.inf)
+        if N == 0 or len(idxs) == 0:
+            return ridx, dists
+
+        if self.ms2.index == "grid":
+            d, r = self.ms2.grid.query(
+                self.ms1.coords[idxs],
+                k=N,
+                distance_upper_bound=np.inf if max_dist is None else max_dist
+            )
+            ridx[:, :] = r
+            dists[:, :] = d
+            return ridx, dists
+
+        if tree_supported(self.dist_metric):
+            d, r = _query_tree(
+                self.ms2.tree,
+                self.ms1.coords[idxs],
+                N,
+                max_dist,
+                self.dist_metric
+            )
+            ridx[:, :] = np.reshape(r, (len(idxs), N))
+            dists[:, :] = np.reshape(d, (len(idxs), N))
+            return ridx, dists
+
+        # without a tree, use chunks of the distance matrix
+        budget = self.ms1.max_memory or 2**27
+        rows = max(1, int(budget // (16 * n)))
+        for start in range(0, len(idxs), rows):
+            d = _cdist(
+                self.ms1.coords[idxs[start:start + rows]],
+                self.ms2.coords,
+                self.dist_metric
+            )
+            if max_dist is not None:
+                d[d > max_dist] = np.inf
+
+            order = np.argsort(d, axis=1, kind="stable")[:, :N]
+            d = np.take_along_axis(d, order, axis=1)
+            ridx[start:start + rows] = np.where(np.isfinite(d), order, n)
+            dists[start:start + rows] = d
+
+        return ridx, dists
+
 
 class ProbabalisticMetricSpace(MetricSpace):
     """Like MetricSpace but samples the distance pairs only returning a
@@ -267,7 +1393,11 @@ class ProbabalisticMetricSpace(MetricSpace):
             dist_metric="euclidean",
             max_dist=None,
             samples=0.5,
-            rnd=None
+            rnd=None,
+            sampling="subset",
+            bands=10,
+            dtype=np.float64,
+            copy=True
         ):
         """ProbabalisticMetricSpace class
 
@@ -284,11 +1414,55 @@ class ProbabalisticMetricSpace(MetricSpace):
             Number of samples (int) or fraction of coords to sample (float < 1).
         rnd : numpy.random.RandomState, int
             Random state to use for the sampling.
+        sampling : str
+            .. versionadded:: 0.6.5
+
+            Sampling method. Can be one of:
+
+              * ``'subset'``: calculate the distances between two random
+                subsets of `samples` points each (default).
+              * ``'uniform'``: draw point pairs directly and uniformly
+                from all point pairs.
+              * ``'stratified'``: draw point pairs directly, using the
+                same number of pairs in each of `bands` distance bands.
+
+            The direct methods draw as many point pairs as a full
+            MetricSpace of `samples` points has, using time and memory
+            proportional to the number of pairs. If `max_dist` is set,
+            only pairs within `max_dist` are kept. At most ten times the
+            number of pairs are drawn, thus sparse distance bands may
+            hold fewer pairs.
+        bands : int
+            .. versionadded:: 0.6.5
+
+            Number of equal width distance bands for
+            ``sampling='stratified'``.
+        dtype : numpy.dtype
+            .. versionadded:: 0.6.5
+
+            Floating point type of the distances. See
+            :class:`MetricSpace <skgstat.MetricSpace>`.
+        copy : bool
+            .. versionadded:: 0.6.5
+
+            If False, a read-only view on `coords` is used without
+            copying. See :class:`MetricSpace <skgstat.MetricSpace>`.
         """
-        self.coords = coords.copy()
+        if sampling not in ("subset", "uniform", "stratified"):
+            raise ValueError(
+                "sampling has to be one of 'subset', 'uniform', 'stratified'"
+            )
+
+        self.coords = _readonly(coords, copy=copy)
         self.dist_metric = dist_metric
         self.max_dist = max_dist
+        self.max_memory = None
+        self.cache = None
+        self.index = "tree"
+        self.dtype = _float_dtype(dtype)
         self.samples = samples
+        self.sampling = sampling
+        self.bands = bands
         if rnd is None:
             self.rnd = np.random
         elif isinstance(rnd, np.random.RandomState):
@@ -300,10 +1474,13 @@ class ProbabalisticMetricSpace(MetricSpace):
         self._ridx = None
         self._ltree = None
         self._rtree = None
+        self._grid = None
         self._dists = None
+        self._pairs = None
+        self._shared = None
         # Do a very quick check to see throw exceptions 
         # if self.dist_metric is invalid...
-        pdist(self.coords[:1, :], metric=self.dist_metric)
+        _pdist(self.coords[:1, :], self.dist_metric)
 
     @property
     def sample_count(self):
@@ -327,49 +1504,49 @@ class ProbabalisticMetricSpace(MetricSpace):
 
     @property
     def ltree(self):
-        """If `self.dist_metric` is `euclidean`, a `scipy.spatial.cKDTree`
-        instance of the left sample of `self.coords`. Undefined otherwise."""
-
-        # only Euclidean supported
-        if self.dist_metric != "euclidean":
-            raise ValueError((
-                "A coordinate tree can only be constructed "
-                "for an euclidean space"
-            ))
-
+        """A coordinate tree of the left sample of `self.coords`.
+        See :func:`tree <skgstat.MetricSpace.tree>`."""
         if self._ltree is None:
-            self._ltree = cKDTree(self.coords[self.lidx, :])
+            self._ltree = _build_tree(self.coords[self.lidx, :], self.dist_metric)
         return self._ltree
 
     @property
     def rtree(self):
-        """If `self.dist_metric` is `euclidean`, a `scipy.spatial.cKDTree`
-        instance of the right sample of `self.coords`. Undefined otherwise."""
-
-        # only Euclidean supported
-        if self.dist_metric != "euclidean":
-            raise ValueError((
-                "A coordinate tree can only be constructed "
-                "for an euclidean space"
-            ))
-
+        """A coordinate tree of the right sample of `self.coords`.
+        See :func:`tree <skgstat.MetricSpace.tree>`."""
         if self._rtree is None:
-            self._rtree = cKDTree(self.coords[self.ridx, :])
+            self._rtree = _build_tree(self.coords[self.ridx, :], self.dist_metric)
         return self._rtree
 
+    @property
+    def pair_count(self):
+        """
+        .. versionadded:: 0.6.5
+
+        Number of point pairs drawn by the direct sampling methods.
+        """
+        n = len(self.coords)
+        k = min(self.sample_count, n)
+        return k * (k - 1) // 2
+
     @property
     def dists(self):
         """A distance matrix of the sampled point pairs as a
         `scipy.sparse.csr_matrix` sparse matrix. """
+        if self.sampling != "subset":
+            return super(ProbabalisticMetricSpace, self).dists
+
         if self._dists is None:
             max_dist = self.max_dist
             if max_dist is None:
                 max_dist = np.finfo(float).max
-            dists = self.ltree.sparse_distance_matrix(
+            dists = _sparse_distance_matrix(
+                self.ltree,
                 self.rtree,
+                self.coords[self.lidx, :],
                 max_dist,
-                output_type="coo_matrix"
-            ).tocsr()
+                self.dist_metric
+            )
             dists.resize((len(self.coords), len(self.coords)))
             dists.indices = self.ridx[dists.indices]
             dists = dists.tocsc()
@@ -377,3 +1554,112 @@ class ProbabalisticMetricSpace(MetricSpace):
             dists = dists.tocsr()
             self._dists = dists
         return self._dists
+
+    def _sample_pairs(self):
+        """
+        Draw point pairs uniformly from all pairs until each distance
+        band holds its share of `self.pair_count` pairs.
+        """
+        n = len(self.coords)
+        total = n * (n - 1) // 2
+        target = self.pair_count
+        nbands = self.bands if self.sampling == "stratified" else 1
+
+        # share of the pairs per band
+        quota = np.full(nbands, target // nbands)
+        quota[:target % nbands] += 1
+
+        edges = None
+        if self.max_dist is not None:
+            edges = np.linspace(0, self.max_dist, nbands + 1)
+
+        # a rejected pair is in a full band and would be rejected again,
+        # thus only the accepted pairs have to be unique
+        accepted = np.array([], dtype=np.int64)
+        kept = []
+        max_draws = min(total, 10 * max(target, 1))
+        max_size = max(2 * target, 2**16)
+        drawn_total = 0
+        size = target
+        while quota.sum() > 0 and drawn_total < max_draws:
+            if total <= 2 * target:
+                # only a few more pairs than needed, use all of them
+                draw = self.rnd.permutation(total).astype(np.int64)
+                max_draws = 0
+            else:
+                size = int(min(max(size, 1024), max_size, max_draws - drawn_total))
+                draw = self.rnd.randint(0, total, size=size).astype(np.int64)
+
+                # remove duplicates, but keep the random order
+                _, first = np.unique(draw, return_index=True)
+                draw = draw[np.sort(first)]
+            drawn = len(draw)
+            drawn_total += drawn
+
+            i, j = _condensed_to_pairs(draw, n)
+            d = _paired_dists(self.coords[i], self.coords[j], self.dist_metric)
+
+            if self.max_dist is not None:
+                within = d <= self.max_dist
+                draw, d = draw[within], d[within]
+
+            # the first draw defines the bands if there is no max_dist
+            if edges is None:
+                edges = np.linspace(0, np.max(d) if d.size else 0, nbands + 1)
+
+            # drop the pairs accepted in an earlier round
+            new = ~np.isin(draw, accepted)
+            draw, d = draw[new], d[new]
+
+            band = np.clip(np.searchsorted(edges, d, side='right') - 1, 0, nbands - 1)
+            n_accepted = 0
+            for b in np.flatnonzero(quota):
+                idx = np.flatnonzero(band == b)[:quota[b]]
+                quota[b] -= len(idx)
+                n_accepted += len(idx)
+                kept.append((draw[idx], d[idx]))
+                accepted = np.concatenate((accepted, draw[idx]))
+
+            # estimate the number of draws needed for the remaining pairs
+            rate = max(n_accepted, 1) / max(drawn, 1)
+            size = quota.sum() / rate
+
+        if len(kept) > 0:
+            k = np.concatenate([k for k, _ in kept])
+            d = np.concatenate([d for _, d in kept])
+        else:
+            k, d = np.array([], dtype=np.int64), np.array([])
+
+        # emit the pairs in pdist order
+        order = np.argsort(k)
+        i, j = _condensed_to_pairs(k[order], n)
+        dtype = _index_dtype(n)
+        return dict(
+            i=np.ascontiguousarray(i, dtype=dtype),
+            j=np.ascontiguousarray(j, dtype=dtype),
+            d=np.ascontiguousarray(d[order], dtype=self.dtype)
+        )
+
+    def _calc_pairs(self):
+        """Collect or draw the sampled point pairs"""
+        if self.sampling == "subset":
+            arrays = _pairs_from_sparse(self.dists, len(self.coords), dtype=self.dtype)
+        else:
+            arrays = self._sample_pairs()
+        self._pairs = PairList(n=len(self.coords), **arrays)
+
+    def iter_pairs(self, values=None, max_memory=None):
+        """
+        .. versionadded:: 0.6.5
+
+        Iterate over the sampled point pairs in chunks. See
+        :func:`MetricSpace.iter_pairs <skgstat.MetricSpace.iter_pairs>`.
+        """
+        # the sample is always materialized
+        self.pairs
+        return super(ProbabalisticMetricSpace, self).iter_pairs(values, max_memory)
+
+    def append(self, coords):
+        raise NotImplementedError(
+            "Appending points to a ProbabalisticMetricSpace is not supported."
+        )
@@ -13,8 +13,10 @@ from sklearn.isotonic import IsotonicRegression
 
 from skgstat import estimators, models, binning
 from skgstat import plotting
-from skgstat.util import shannon_entropy
+from skgstat.util import shannon_entropy, QuantileSketch, DistanceHistogram
 from .MetricSpace import MetricSpace, ProbabalisticMetricSpace
+from .MetricSpace import GREAT_CIRCLE, great_circle_pdist, grid_supported
+from .MetricSpace import _readonly
 from skgstat.interfaces.gstools import skgstat_to_gstools, skgstat_to_krige
 
 
@@ -96,11 +98,16 @@ class Variogram(object):
               * nugget          [nugget effect variogram]
 
         dist_func : str
+            .. versionchanged:: 0.6.5
+                added 'great_circle'
+
             String identifying the distance function. Defaults to
             'euclidean'. Can be any metric accepted by
             scipy.spatial.distance.pdist. Additional parameters are not (yet)
             passed through to pdist. These are accepted by pdist for some of
             the metrics. In these cases the default values are used.
+            'great_circle' calculates the great circle distance in kilometers
+            for (lon, lat) coordinates given in degrees.
         bin_func : str
             .. versionchanged:: 0.3.8
                 added 'fd', 'sturges', 'scott', 'sqrt', 'doane'
@@ -194,6 +201,7 @@ class Variogram(object):
             subsets. The size of each subset is set by `samples`: if <
             1 it specifies a fraction of all points, if >= 1 it
             specifies the number of points in each subset.
+            See `sampling_method` for sampling the point pairs directly.
         n_lags : int
             Specify the number of lag classes to be defined by the binning
             function.
@@ -221,6 +229,10 @@ class Variogram(object):
             centroids. Note, that K-Means is not deterministic and is therefore
             seeded to 42 here. You can pass `None` to disable this behavior,
             but use it with care, as you will get different results.
+
+            .. versionchanged:: 0.6.5
+                Not used anymore, as `'kmeans'` finds the optimal clusters
+                deterministically.
         binning_agg_func : str
             .. versionadded:: 0.3.10
 
@@ -235,15 +247,97 @@ class Variogram(object):
             the uncertainties are propagated into the experimental variogram.
             If present, the plot will indicate the confidence interval as
             error bars around the experimental variogram.
+        max_memory : int
+            .. versionadded:: 0.6.5
+
+            Approximate memory budget in bytes for a single distance tile.
+            If set, the :class:`MetricSpace <skgstat.MetricSpace>` will
+            calculate the distances tile by tile and the squareform
+            distance matrix is never built. Without `maxlag`, the
+            distances and pairwise differences of all point pairs are
+            still stored, use `streaming` to bound the peak memory.
+        sampling_method : str
+            .. versionadded:: 0.6.5
+
+            If `samples` is set, this switches the sampling method of
+            the :class:`ProbabalisticMetricSpace <skgstat.MetricSpace.ProbabalisticMetricSpace>`.
+            ``'subset'`` (default) uses two random subsets of points,
+            ``'uniform'`` and ``'stratified'`` draw the point pairs
+            directly, either uniformly or stratified by distance bands.
+        dtype : numpy.dtype
+            .. versionadded:: 0.6.5
+
+            Floating point type of the distances and pairwise differences.
+            ``numpy.float32`` halves the memory of both arrays. Distances
+            and differences are calculated in double precision and stored
+            with a relative error of at most ``2**-24`` (about ``6e-8``).
+            Point pairs that lie within this error of a bin edge may be
+            grouped into the neighboring lag class. The estimators
+            accumulate in double precision.
+        spatial_index : str
+            .. versionadded:: 0.6.5
+
+            Spatial index of the :class:`MetricSpace <skgstat.MetricSpace>`
+            used to find the point pairs within `maxlag`. ``'tree'``
+            (default) or ``'grid'``, a uniform grid spatial hash that is
+            faster on regular or quasi-uniform point clouds. The grid only
+            supports the Minkowski p-norms.
+        copy : bool
+            .. versionadded:: 0.6.5
+
+            If True (default), the coordinates are copied once into the
+            :class:`MetricSpace <skgstat.MetricSpace>`. If False, the
+            Variogram uses read-only views on the passed coordinates and
+            values without copying them. The input arrays must not be
+            changed in place afterwards.
+        streaming : bool
+            .. versionadded:: 0.6.5
+
+            If True, the pairwise differences are never stored. The
+            experimental variogram is accumulated chunk by chunk from
+            :func:`MetricSpace.iter_pairs <skgstat.MetricSpace.iter_pairs>`,
+            for estimators that provide an `accumulator`, like
+            :func:`matheron <skgstat.estimators.matheron>` and
+            :func:`cressie <skgstat.estimators.cressie>`. With ``'even'``
+            binning, also the distances are never stored. The ``'uniform'``,
+            ``'fd'``, ``'sturges'``, ``'scott'`` and ``'sqrt'`` binning and
+            the ``'median'`` and ``'mean'`` maxlag are approximated from a
+            :class:`QuantileSketch <skgstat.util.sketch.QuantileSketch>`
+            of the distances. All other estimators and binning methods
+            calculate the pairwise differences or distances on first use.
+        sketch_size : int
+            .. versionadded:: 0.6.5
+
+            Size `k` of the
+            :class:`QuantileSketch <skgstat.util.sketch.QuantileSketch>`
+            used in `streaming` mode. Defaults to ``2048``. The rank error
+            of the approximated quantiles is in the order of ``1 / k``.
+        binning_resolution : int
+            .. versionadded:: 0.6.5
+
+            If set, the ``'uniform'``, ``'fd'``, ``'sturges'``,
+            ``'scott'``, ``'sqrt'``, ``'doane'``, ``'kmeans'``, ``'ward'``
+            and ``'stable_entropy'`` binning run on a
+            :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`
+            of this many bins, built once for all distances, instead of
+            the distances themselves. The bin edges are accurate to one
+            histogram bin width. If None (default), or if there are not
+            more distances than histogram bins, the exact distances are used.
 
         """
         # Before we do anything else, make kwargs available
         self._kwargs = self._validate_kwargs(**kwargs)
 
+        # cached results and their hit / miss counters
+        self._cache_experimental = True
+        self._cache = dict()
+        self._cache_stats = dict()
+
         # handle the coordinates
         self._1d = False
         if not isinstance(coordinates, MetricSpace):
             coordinates = np.asarray(coordinates)
+            copy = self._kwargs.get('copy', True)
 
             # handle 1D coords
             if len(coordinates.shape) < 2:
@@ -253,6 +347,9 @@ class Variogram(object):
                 ))
                 self._1d = True
 
+                # the stacked coordinates are already a new array
+                copy = False
+
             # handle maxlag for MetricSpace
             if maxlag and not isinstance(maxlag, str) and maxlag >= 1:
                 _maxlag = maxlag
@@ -261,16 +358,23 @@ class Variogram(object):
 
             if samples is None:
                 coordinates = MetricSpace(
-                    coordinates.copy(),
+                    coordinates,
                     dist_func,
-                    _maxlag
+                    _maxlag,
+                    max_memory=self._kwargs.get('max_memory'),
+                    dtype=self._kwargs.get('dtype', np.float64),
+                    index=self._kwargs.get('spatial_index', 'tree'),
+                    copy=copy
                 )
             else:
                 coordinates = ProbabalisticMetricSpace(
-                    coordinates.copy(),
+                    coordinates,
                     dist_func, _maxlag,
                     samples=samples,
-                    rnd=self._kwargs.get("binning_random_state", None)
+                    rnd=self._kwargs.get("binning_random_state", None),
+                    sampling=self._kwargs.get("sampling_method", "subset"),
+                    dtype=self._kwargs.get('dtype', np.float64),
+                    copy=copy
                 )
         elif dist_func != coordinates.dist_metric:
             raise AttributeError((
@@ -310,6 +414,7 @@ class Variogram(object):
         self._bin_func_name = None
         self._bin_func = None
         self._groups = None
+        self._group_index = None
         self._bins = None
         self.set_bin_func(bin_func=bin_func)
 
@@ -336,9 +441,6 @@ class Variogram(object):
         self.cov = None
         self.cof = None
 
-        # settings, not reachable by init (not yet)
-        self._cache_experimental = False
-
         # do the preprocessing and fitting upon initialization
         # Note that fit() calls preprocessing
         self.fit(force=True)
@@ -452,6 +554,9 @@ class Variogram(object):
         differences are recalculated.
         Raises :py:class:`ValueError`s on shape mismatches and a Warning
 
+        .. versionchanged:: 0.6.5
+            The values are stored as read-only view, without copying.
+
         Parameters
         ----------
         values : numpy.ndarray
@@ -488,15 +593,68 @@ class Variogram(object):
 
         # reset fitting parameter
         self.cof, self.cov = None, None
+        self._invalidate()
         self._diff = None
 
-        # set new values
-        self._values = np.asarray(values)
+        # set new values, as read-only view
+        self._values = _readonly(_y, copy=False)
 
         # recalculate the pairwise differences
         if calc_diff:
             self._calc_diff(force=True)
 
+    def append(self, coordinates, values):
+        """Append new observations
+
+        .. versionadded:: 0.6.5
+
+        Appends new observation locations and values to the Variogram.
+        Only the distances of the new point pairs are calculated by
+        :func:`MetricSpace.append <skgstat.MetricSpace.append>`. The
+        pairwise differences and the binning are updated and the
+        Variogram is fitted again.
+
+        Note: If the :class:`MetricSpace <skgstat.MetricSpace>` is
+        shared with other Variogram instances, these are not updated.
+
+        Parameters
+        ----------
+        coordinates : numpy.ndarray
+            Array of shape (m, n) with the new observation locations.
+            Has to match the dimensionality of the Variogram.
+        values : numpy.ndarray
+            Array of shape (m, ) with the new observations
+
+        Raises
+        ------
+        ValueError : raised if the values array shape does not match the
+            coordinates array
+
+        """
+        coordinates = np.asarray(coordinates)
+        _y = np.asarray(values)
+
+        # handle 1D coords
+        if len(coordinates.shape) < 2:
+            coordinates = np.column_stack((
+                coordinates,
+                np.zeros(len(coordinates))
+            ))
+
+        if not len(_y) == len(coordinates) or not _y.ndim == 1:
+            raise ValueError('The length of the values array has to match' +
+                             'the length of coordinates')
+
+        # extend the pair list with the new distances
+        self._X.append(coordinates)
+        self._values = _readonly(np.concatenate((self._values, _y)), copy=False)
+
+        # reset the binning and fit again
+        self._bins = None
+        self.cof, self.cov = None, None
+        self._invalidate('distances')
+        self.fit(force=True)
+
     @property
     def bin_func(self):
         """Binning function
@@ -613,11 +771,14 @@ class Variogram(object):
         distance matrix. The cluster centroids are used to calculate the
         upper edges of the lag classes, by setting it to half of the distance
         between two neighboring clusters. Note: This does not necessarily
-        result in even width bins.
+        result in even width bins. The clusters are the optimal k-means
+        clustering of the sorted distances.
 
         **`'ward'`** uses a hierachical culstering algorithm to iteratively
         merge pairs of clusters until there are only `n` remaining clusters.
         The merging is done by minimizing the variance for the merged cluster.
+        As the distances are one dimensional, only adjacent clusters of the
+        sorted distances are merged.
 
         **`'stable_entropy'`** will adjust `n` bin edges by minimizing the
         absolute differences between each lag's Shannon Entropy. This will
@@ -636,8 +797,6 @@ class Variogram(object):
         skgstat.binning.auto_derived_lags
         skgstat.binning.kmeans
         skgstat.binning.ward
-        sklearn.cluster.KMeans
-        sklearn.cluster.AgglomerativeClustering
 
         References
         ----------
@@ -686,6 +845,7 @@ class Variogram(object):
         self._groups = None
         self._bins = None
         self.cof, self.cov = None, None
+        self._invalidate()
 
     def _bin_func_wrapper(self, distances, n, maxlag):
         """
@@ -715,6 +875,17 @@ class Variogram(object):
                 maxlag
             )
 
+    @property
+    def streaming(self):
+        """
+        .. versionadded:: 0.6.5
+
+        If True, the experimental variogram is accumulated from chunks
+        of point pairs, without storing the pairwise differences.
+        Set by the `streaming` keyword argument.
+        """
+        return self._kwargs.get('streaming', False)
+
     @property
     def normalized(self):
         return self._normalized
@@ -745,7 +916,19 @@ class Variogram(object):
         """
         # if bins are not calculated, do it
         if self._bins is None:
-            self._bins, n = self.bin_func(self.distance, self._n_lags, self.maxlag)
+            if self.streaming and str(self._bin_func_name).lower() == 'even':
+                # even bins only need the largest distance
+                distances = np.array([
+                    self.maxlag if self.maxlag is not None else self._stream_max_distance()
+                ])
+            elif self.streaming and str(self._bin_func_name).lower() in self._SKETCH_BIN_FUNCS:
+                # quantile based bins only need a sketch of the distances
+                distances = self._distance_sketch()
+            elif str(self._bin_func_name).lower() in self._HISTOGRAM_BIN_FUNCS:
+                distances = self._distance_histogram()
+            else:
+                distances = self.distance
+            self._bins, n = self.bin_func(distances, self._n_lags, self.maxlag)
             # if the binning function returned an N, the n_lags need
             # to be adjusted directly (not through the setter)
             if n is not None:
@@ -762,6 +945,7 @@ class Variogram(object):
         self._groups = None
         self.cov = None
         self.cof = None
+        self._invalidate()
 
     @property
     def n_lags(self):
@@ -807,6 +991,7 @@ class Variogram(object):
         # reset the fitting
         self.cof = None
         self.cov = None
+        self._invalidate()
 
     @property
     def estimator(self):
@@ -819,6 +1004,7 @@ class Variogram(object):
     def set_estimator(self, estimator_name):
         # reset the fitting
         self.cof, self.cov = None, None
+        self._invalidate()
 
         if isinstance(estimator_name, str):
             if estimator_name.lower() == 'matheron':
@@ -862,6 +1048,7 @@ class Variogram(object):
         """
         # reset the fitting
         self.cof, self.cov = None, None
+        self._invalidate('deviations')
 
         if isinstance(model_name, str):
             # at first reset harmonize
@@ -945,6 +1132,8 @@ class Variogram(object):
     def wrapped_distance_function(cls, dist_func, x):
         if callable(dist_func):
             return dist_func(x)
+        elif dist_func == GREAT_CIRCLE:
+            return great_circle_pdist(x)
         else:
             return pdist(X=x, metric=dist_func)
 
@@ -973,6 +1162,7 @@ class Variogram(object):
         """
         # reset the fitting
         self.cof, self.cov = None, None
+        self._invalidate('distances')
 
         if isinstance(func, str):  # pragma: no cover
             if func.lower() == 'rank':
@@ -981,16 +1171,27 @@ class Variogram(object):
             raise ValueError('Input not supported. Pass a string or callable.')
 
         # re-calculate distances
-        self._X = MetricSpace(self._X.coords, func, self._X.max_dist)
+        self._X = MetricSpace(
+            self._X.coords,
+            func,
+            self._X.max_dist,
+            max_memory=self._X.max_memory,
+            dtype=self._X.dtype,
+            index=self._X.index if grid_supported(func) else 'tree',
+            copy=False
+        )
 
     @property
     def distance(self):
-        # handle sparse matrix
-        if isinstance(self.distance_matrix, sparse.spmatrix):
-            return self.triangular_distance_matrix.data
+        """
+        Distances of all point pairs, aligned to the pairwise
+        differences.
 
-        # Turn it back to triangular form not to have duplicates
-        return squareform(self.distance_matrix)
+        .. versionchanged:: 0.6.5
+            Taken from the :func:`pairs <skgstat.MetricSpace.pairs>`
+            of the MetricSpace, without building the distance matrix.
+        """
+        return self._X.pairs.d
 
     @property
     def triangular_distance_matrix(self):
@@ -1001,15 +1202,11 @@ class Variogram(object):
         if not isinstance(self.distance_matrix, sparse.spmatrix):
             raise RuntimeWarning("Only available for sparse coordinates.")
 
-        m = self.distance_matrix
-        c = m.tocsc()
-        c.data = c.indices
-        rows = c.tocsr()
-        filt = sparse.csr.csr_matrix(
-            (m.indices < rows.data, m.indices, m.indptr),
-            m.shape
+        pairs = self._X.pairs
+        return sparse.csr_matrix(
+            (pairs.d, (pairs.i, pairs.j)),
+            shape=(pairs.n, pairs.n)
         )
-        return m.multiply(filt)
 
     @property
     def distance_matrix(self):
@@ -1047,17 +1244,24 @@ class Variogram(object):
         # remove bins
         self._bins = None
         self._groups = None
+        self._invalidate()
 
         # set new maxlag
         if value is None:
             self._maxlag = None
         elif isinstance(value, str):
-            if value == 'median':
+            if self.streaming and value in ('median', 'mean'):
+                sketch = self._distance_sketch()
+                self._maxlag = sketch.quantile(0.5) if value == 'median' else sketch.mean
+            elif value == 'median':
                 self._maxlag = np.median(self.distance)
             elif value == 'mean':
                 self._maxlag = np.mean(self.distance)
         elif value < 1:
-            self._maxlag = value * np.max(self.distance)
+            if self.streaming:
+                self._maxlag = value * self._stream_max_distance()
+            else:
+                self._maxlag = value * np.max(self.distance)
         else:
             self._maxlag = value
 
@@ -1113,6 +1317,7 @@ class Variogram(object):
             # reset fit
             self.cof = None
             self.cov = None
+            self._invalidate('deviations')
 
     @property
     def fit_sigma(self):
@@ -1223,6 +1428,7 @@ class Variogram(object):
         # remove fitting parameters
         self.cof = None
         self.cov = None
+        self._invalidate('deviations')
 
     def update_kwargs(self, **kwargs):
         """
@@ -1290,14 +1496,61 @@ class Variogram(object):
         .. versionchanged:: 0.3.6
             yields an empty array for empty lag groups now
 
+        .. versionchanged:: 0.6.5
+            the pairwise differences are permuted once by lag class and
+            each lag class is yielded as a slice of the permuted array
+
         Returns
         -------
         iterable
 
         """
+        self._calc_diff()
+        order, offsets = self._lag_class_index()
+        diff = self._diff[order]
+
         # yield all groups
-        for i in range(len(self.bins)):
-            yield self._diff[np.where(self.lag_groups() == i)]
+        for i in range(len(offsets) - 1):
+            yield diff[offsets[i]:offsets[i + 1]]
+
+    def _lag_class_index(self):
+        """
+        .. versionadded:: 0.6.5
+
+        Sort the point pairs by lag class. The index is built once per
+        binning and returns the positions of all pairs within `maxlag`,
+        ordered by lag class, and the offsets of each lag class into
+        these positions. Lag class ``i`` is
+        ``order[offsets[i]:offsets[i + 1]]``.
+
+        Returns
+        -------
+        order : numpy.ndarray
+            Positions of the point pairs, sorted by lag class
+        offsets : numpy.ndarray
+            Start position of each lag class, with a last element for
+            the end of the last lag class
+
+        """
+        groups = self.lag_groups()
+        if getattr(self, '_group_index', None) is None:
+            n = len(self.bins)
+
+            # stable counting sort for less than 2**16 lag classes,
+            # pairs outside maxlag are in the first group
+            keys = groups + 1
+            if n < 2**16 - 1:
+                keys = keys.astype(np.uint16)
+            order = np.argsort(keys, kind='stable')
+            offsets = np.cumsum(np.bincount(keys, minlength=n + 1))
+
+            order = order[offsets[0]:]
+            if len(order) <= np.iinfo(np.int32).max:
+                order = order.astype(np.int32)
+            offsets = np.concatenate(([0], offsets[1:] - offsets[0]))
+            self._group_index = (order, offsets)
+
+        return self._group_index
 
     def preprocessing(self, force=False):
         """Preprocessing function
@@ -1320,6 +1573,10 @@ class Variogram(object):
         void
 
         """
+        # streaming variograms never store the pairwise differences
+        if self.streaming:
+            return
+
         # call the _calc functions
         self._calc_diff(force=force)
         self._calc_groups(force=force)
@@ -1340,6 +1597,10 @@ class Variogram(object):
         .. versionchanged:: 0.3.10
             added 'ml' and 'custom' method.
 
+        .. versionchanged:: 0.6.5
+            the 'trf' and 'lm' methods use the analytic Jacobian of the
+            built-in models instead of finite differences.
+
         Parameters
         ----------
         force : bool
@@ -1434,6 +1695,16 @@ class Variogram(object):
             def wrapped(*args):
                 return self._model(*args, 0)
 
+        # analytic Jacobian of the model, if there is one
+        model_jac = getattr(self._model, 'jac', None)
+        if model_jac is not None and 'jac' not in kwargs:
+            if self.use_nugget:
+                kwargs['jac'] = model_jac
+            else:
+                def jac(*args):
+                    return model_jac(*args, 0)[:, :-1]
+                kwargs['jac'] = jac
+
         # get p0
         bounds = (0, self.__get_fit_bounds(x, y))
         p0 = np.asarray(bounds[1])
@@ -1452,6 +1723,10 @@ class Variogram(object):
 
         # Levenberg-Marquardt
         elif self.fit_method == 'lm':
+            # leastsq halves its default maxfev, if a Jacobian is given
+            if 'jac' in kwargs and 'maxfev' not in kwargs:
+                kwargs['maxfev'] = 200 * (len(p0) + 1)
+
             self.cof, self.cov = curve_fit(
                 wrapped,
                 _x, _y,
@@ -1610,35 +1885,8 @@ class Variogram(object):
         if self._diff is not None and not force:
             return
 
-        v = self.values
-
-        # handle sparse matrix
-        if isinstance(self.distance_matrix, sparse.spmatrix):
-            c = r = self.triangular_distance_matrix
-            if not isinstance(c, sparse.csr.csr_matrix):
-                c = c.tocsr()
-            if not isinstance(r, sparse.csc.csc_matrix):
-                r = r.tocsc()
-            Vcol = sparse.csr_matrix(
-                (self.values[c.indices], c.indices, c.indptr)
-            )
-            Vrow = sparse.csc_matrix(
-                (self.values[r.indices], r.indices, r.indptr)
-            ).tocsr()
-
-            # self._diff will have same shape as self.distances, even
-            # when that's not in diagonal format...
-            # Note: it might be compelling to do np.abs(Vrow -
-            # Vcol).data instead here, but that might optimize away
-            # some zeros, leaving _diff in a different shape
-            self._diff = np.abs(Vrow.data - Vcol.data)
-        else:
-            # Append a column of zeros to make pdist happy
-            # euclidean: sqrt((a-b)**2 + (0-0)**2) == sqrt((a-b)**2)
-            self._diff = pdist(
-                np.column_stack((v, np.zeros(len(v)))),
-                metric="euclidean"
-            )
+        # the pair list avoids the full matrix for sparse and tiled spaces
+        self._diff = self._X.pairs.diff(self.values)
 
     def _calc_groups(self, force=False):
         """Calculate the lag class mask array
@@ -1655,11 +1903,15 @@ class Variogram(object):
         bin_edges = self.bins
         d = self.distance
 
+        # lag class i holds the distances in [bin_edges[i - 1], bin_edges[i])
+        groups = np.searchsorted(bin_edges, d, side='right').astype(np.int32)
+
         # -1 is the group fir distances outside maxlag
-        self._groups = np.ones(len(d), dtype=int) * -1
+        groups[groups == len(bin_edges)] = -1
+        self._groups = groups
 
-        for i, bounds in enumerate(zip([0] + list(bin_edges), bin_edges)):
-            self._groups[np.where((d >= bounds[0]) & (d < bounds[1]))] = i
+        # the sorted index has to be rebuilt
+        self._group_index = None
 
     def clone(self):
         """Deep copy of self
@@ -1673,6 +1925,89 @@ class Variogram(object):
         """
         return copy.deepcopy(self)
 
+    # cached results, each one depends on all the results before it
+    _CACHE_LEVELS = ('distances', 'histogram', 'experimental', 'deviations')
+
+    def _invalidate(self, level='experimental'):
+        """
+        .. versionadded:: 0.6.5
+
+        Drop the cached result `level` and all results depending on it.
+        The setters call this to release the cached arrays as soon as the
+        input changed.
+        """
+        for name in self._CACHE_LEVELS[self._CACHE_LEVELS.index(level):]:
+            self._cache.pop(name, None)
+
+    def _cached(self, name, key, func):
+        """
+        .. versionadded:: 0.6.5
+
+        Return the cached result `name`, if it was calculated from the
+        same `key`, otherwise calculate it by calling `func`. The `key` is
+        a tuple of the objects the result depends on. These are compared
+        by identity, as each setter replaces the objects it invalidates.
+        """
+        stats = self._cache_stats.setdefault(name, dict(hits=0, misses=0))
+        entry = self._cache.get(name)
+        if (
+            self._cache_experimental and entry is not None and
+            len(entry[0]) == len(key) and
+            all(a is b for a, b in zip(entry[0], key))
+        ):
+            stats['hits'] += 1
+            return entry[1]
+
+        stats['misses'] += 1
+        result = func()
+        if self._cache_experimental:
+            self._cache[name] = (key, result)
+        return result
+
+    @property
+    def cache_info(self):
+        """Cache statistics
+
+        .. versionadded:: 0.6.5
+
+        The number of hits and misses of the cached
+        :func:`experimental <skgstat.Variogram.experimental>` variogram
+        and of the :func:`model_deviations <skgstat.Variogram.model_deviations>`,
+        which all fit quality measures and plots are built on.
+        The cache can be switched off by setting ``_cache_experimental``
+        to ``False``.
+
+        Returns
+        -------
+        info : dict
+            Dictionary of ``{'hits': int, 'misses': int}`` for each cached
+            result.
+
+        """
+        return {name: dict(stats) for name, stats in self._cache_stats.items()}
+
+    def clear_cache(self):
+        """
+        .. versionadded:: 0.6.5
+
+        Drop all cached results and reset the
+        :func:`cache_info <skgstat.Variogram.cache_info>` counters.
+        """
+        self._cache = dict()
+        self._cache_stats = dict()
+
+    def _experimental_key(self):
+        """Objects the experimental variogram is calculated from"""
+        # bring the lag classes up to date first
+        self.preprocessing()
+        self.bins
+
+        return (
+            self._bins, self._groups, self._diff, self._values, self._X,
+            self._estimator, self._kwargs.get('percentile'),
+            self._kwargs.get('entropy_bins')
+        )
+
     @property
     def experimental(self):
         """Experimental Variogram
@@ -1694,8 +2029,14 @@ class Variogram(object):
         Variogram._experimental
         Variogram.isotonic
 
+        .. versionchanged:: 0.6.5
+            The result is cached until one of the inputs changes, see
+            :func:`cache_info <skgstat.Variogram.cache_info>`
+
         """
-        return self._experimental
+        return self._cached(
+            'experimental', self._experimental_key(), lambda: self._experimental
+        ).copy()
 
     @property
     def _experimental(self):
@@ -1711,6 +2052,11 @@ class Variogram(object):
             makes use of `kwargs <skgstat.Variogram._kwargs>` for
             specific estimators now
 
+        .. versionchanged:: 0.6.5
+            estimators with a `grouped` kernel, like
+            :func:`matheron_grouped <skgstat.estimators.matheron_grouped>`,
+            calculate all lag classes in one pass
+
         Returns
         -------
         experimental : np.ndarray
@@ -1718,6 +2064,21 @@ class Variogram(object):
             as :func:`bins <skgstat.Variogram.bins>`
 
         """
+        # accumulate the point pairs chunk by chunk
+        accumulator = getattr(self._estimator, 'accumulator', None)
+        if self.streaming and accumulator is not None:
+            return self._stream_experimental(accumulator)
+
+        # use the grouped kernel of the estimator, if available
+        grouped = getattr(self._estimator, 'grouped', None)
+        if grouped is not None:
+            kwargs = dict()
+            if self._estimator.__name__ == 'percentile' and self._kwargs.get('percentile', False):
+                kwargs['p'] = self._kwargs.get('percentile')
+
+            self._calc_diff()
+            return grouped(self._diff, self.lag_groups(), len(self.bins), **kwargs)
+
         if self._estimator.__name__ == 'entropy':
             # get the parameter from kwargs, if not set use 50
             N = self._kwargs.get('entropy_bins', 50)
@@ -1747,6 +2108,71 @@ class Variogram(object):
         # return the mapped result
         return np.fromiter(map(mapper, self.lag_classes()), dtype=float)
 
+    def _stream_max_distance(self):
+        """Largest distance of all point pairs, from chunks of pairs"""
+        return max(
+            (float(np.max(d)) for d, _ in self._X.iter_pairs() if d.size > 0),
+            default=0.
+        )
+
+    # binning methods that can be calculated from a QuantileSketch
+    _SKETCH_BIN_FUNCS = ('uniform', 'fd', 'sturges', 'scott', 'sqrt', 'doane')
+
+    # binning methods that can be calculated from a DistanceHistogram
+    _HISTOGRAM_BIN_FUNCS = _SKETCH_BIN_FUNCS + ('kmeans', 'ward', 'stable_entropy')
+
+    def _distance_sketch(self):
+        """
+        .. versionadded:: 0.6.5
+
+        :class:`QuantileSketch <skgstat.util.sketch.QuantileSketch>` of
+        all distances, built from chunks of point pairs. Streaming
+        variograms use it for quantile based binning methods and the
+        ``'median'`` and ``'mean'`` maxlag, without storing the distances.
+        """
+        def build():
+            return QuantileSketch.from_chunks(
+                (d for d, _ in self._X.iter_pairs()),
+                k=self._kwargs.get('sketch_size', 2048)
+            )
+
+        return self._cached('distances', (self._X, ), build)
+
+    def _distance_histogram(self):
+        """
+        .. versionadded:: 0.6.5
+
+        :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`
+        of all distances, if the `binning_resolution` is set and smaller
+        than the number of distances. Otherwise the exact distances are
+        returned.
+        """
+        resolution = self._kwargs.get('binning_resolution')
+        if resolution is None or len(self.distance) <= resolution:
+            return self.distance
+
+        return self._cached(
+            'histogram', (self._X, resolution),
+            lambda: DistanceHistogram(self.distance, resolution=resolution)
+        )
+
+    def _stream_experimental(self, accumulator):
+        """
+        .. versionadded:: 0.6.5
+
+        Accumulate the experimental variogram from chunks of point pairs
+        of the :func:`MetricSpace.iter_pairs <skgstat.MetricSpace.iter_pairs>`.
+        Only the accumulator of `n_lags` elements is kept in memory.
+        """
+        bins = self.bins
+        acc = accumulator(len(bins))
+        for d, diff in self._X.iter_pairs(self.values):
+            groups = np.searchsorted(bins, d, side='right')
+            groups[groups == len(bins)] = -1
+            acc.update(diff, groups)
+
+        return acc.finalize()
+
     def get_empirical(self, bin_center=False):
         """Empirical variogram
 
@@ -2142,6 +2568,10 @@ class Variogram(object):
             second element are the corresponding values of the theoretical
             model.
 
+        .. versionchanged:: 0.6.5
+            The deviations are cached until the experimental variogram
+            or the fitted parameters change
+
         """
         # get the experimental values and their bin bounds
         _exp = self.experimental
@@ -2153,9 +2583,10 @@ class Variogram(object):
             raise RuntimeError('The variogram cannot be calculated.')
 
         # calculate the model values at bin bounds
-        _model = self.transform(_bin)
+        key = self._experimental_key() + (self.cof, self._model)
+        _model = self._cached('deviations', key, lambda: self.transform(_bin))
 
-        return _exp, _model
+        return _exp, _model.copy()
 
     def cross_validate(
         self,
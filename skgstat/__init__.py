@@ -1,6 +1,7 @@
 from .Variogram import Variogram
 from .DirectionalVariogram import DirectionalVariogram
 from .SpaceTimeVariogram import SpaceTimeVariogram
+from .GridVariogram import GridVariogram
 from .Kriging import OrdinaryKriging
 from .MetricSpace import MetricSpace, MetricSpacePair
 from . import interfaces
@@ -1,8 +1,26 @@
+import heapq
+
 import numpy as np
-from sklearn.cluster import KMeans, AgglomerativeClustering
+from numba import njit
 from scipy.optimize import minimize, OptimizeWarning
 
-from skgstat.util import shannon_entropy
+from skgstat.util import QuantileSketch, DistanceHistogram
+
+
+def _is_summary(distances):
+    """
+    True for compressed distances, like a
+    :class:`QuantileSketch <skgstat.util.sketch.QuantileSketch>` or a
+    :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`
+    """
+    return isinstance(distances, (QuantileSketch, DistanceHistogram))
+
+
+def _summary_values(distances, maxlag):
+    """Weighted values of compressed distances up to maxlag"""
+    if maxlag is None or maxlag > distances.max:
+        maxlag = distances.max
+    return distances.weighted(upper=maxlag)
 
 
 def even_width_lags(distances, n, maxlag):
@@ -48,11 +66,16 @@ def uniform_count_lags(distances, n, maxlag):
         Function returns `None` as second value to indicate that
         The number of lag classes was not changed
 
+    .. versionchanged:: 0.6.5
+        The distances can be given as
+        :class:`QuantileSketch <skgstat.util.sketch.QuantileSketch>` or
+        :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`
+
     Parameters
     ----------
-    distances : numpy.array
+    distances : numpy.array, QuantileSketch, DistanceHistogram
         Flat numpy array representing the upper triangle of
-        the distance matrix.
+        the distance matrix, or compressed distances.
     n : integer
         Amount of lag classes to find
     maxlag : integer, float
@@ -64,6 +87,11 @@ def uniform_count_lags(distances, n, maxlag):
         The **upper** bin edges of the lag classes
 
     """
+    if _is_summary(distances):
+        if maxlag is None or maxlag > distances.max:
+            maxlag = distances.max
+        return distances.quantile(np.arange(1, n + 1) / n, upper=maxlag), None
+
     # maxlags larger than the maximum separating distance will be ignored
     if maxlag is None or maxlag > np.nanmax(distances):
         maxlag = np.nanmax(distances)
@@ -86,11 +114,17 @@ def auto_derived_lags(distances, method_name, maxlag):
     `histogram_bin_edges <numpy.histogram_bin_edges>`. It is recommended
     to use `'sturges'`, `'doane'` or `'fd'`.
 
+    .. versionchanged:: 0.6.5
+        The distances can be given as
+        :class:`QuantileSketch <skgstat.util.sketch.QuantileSketch>` or
+        :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`
+        for all methods but ``'stone'``.
+
     Parameters
     ----------
-    distances : numpy.array
+    distances : numpy.array, QuantileSketch, DistanceHistogram
         Flat numpy array representing the upper triangle of
-        the distance matrix.
+        the distance matrix, or compressed distances.
     maxlag : integer, float
         Limit the last lag class to this separating distance.
     method_name : str
@@ -107,6 +141,10 @@ def auto_derived_lags(distances, method_name, maxlag):
     numpy.histogram_bin_edges
 
     """
+    if _is_summary(distances):
+        edges = _summary_bin_edges(distances, method_name, maxlag)[1:]
+        return edges, len(edges)
+
     # maxlags larger than maximum separating distance will be ignored
     if maxlag is None or maxlag > np.nanmax(distances):
         maxlag = np.nanmax(distances)
@@ -120,10 +158,239 @@ def auto_derived_lags(distances, method_name, maxlag):
     return edges, len(edges)
 
 
+def _summary_bin_edges(sketch, method_name, maxlag):
+    """
+    Bin edges of :func:`numpy.histogram_bin_edges` for the distances
+    up to `maxlag` summarized by the compressed distances `sketch`.
+    """
+    if maxlag is None or maxlag >= sketch.max:
+        maxlag = sketch.max
+        last = sketch.max
+    else:
+        last = float(sketch.quantile(1., upper=maxlag))
+    first = sketch.min
+    n = sketch.rank(maxlag)
+
+    if first == last:
+        first, last = first - 0.5, last + 0.5
+    ptp = last - first
+
+    # bin widths as calculated by numpy
+    def fd():
+        q75, q25 = sketch.quantile(np.array([0.75, 0.25]), upper=maxlag)
+        return 2.0 * (q75 - q25) * n ** (-1.0 / 3.0)
+
+    def sturges():
+        return ptp / (np.log2(n) + 1.0)
+
+    if method_name == 'fd':
+        width = fd()
+    elif method_name == 'sturges':
+        width = sturges()
+    elif method_name == 'auto':
+        width = min(fd(), sturges()) if fd() else sturges()
+    elif method_name == 'sqrt':
+        width = ptp / np.sqrt(n)
+    elif method_name == 'rice':
+        width = ptp / (2.0 * n ** (1.0 / 3))
+    elif method_name == 'scott':
+        width = (24.0 * np.pi**0.5 / n)**(1.0 / 3.0) * sketch.std(upper=maxlag)
+    elif method_name == 'doane':
+        width = 0.
+        values, weights = sketch.weighted(upper=maxlag)
+        sigma = sketch.std(upper=maxlag)
+        if n > 2 and sigma > 0.0:
+            sg1 = np.sqrt(6.0 * (n - 2) / ((n + 1.0) * (n + 3)))
+            mean = np.average(values, weights=weights)
+            g1 = np.average(((values - mean) / sigma) ** 3, weights=weights)
+            width = ptp / (1.0 + np.log2(n) + np.log2(1.0 + np.absolute(g1) / sg1))
+    else:
+        raise ValueError(
+            "bin_func '%s' needs all distances, it is not supported on "
+            "compressed distances" % method_name
+        )
+
+    n_bins = int(np.ceil(ptp / width)) if width else 1
+    return np.linspace(first, last, n_bins + 1)
+
+
+def _sorted_weighted(distances, maxlag):
+    """
+    Sorted unique distances up to maxlag and their counts. Compressed
+    distances yield their weighted values.
+    """
+    if _is_summary(distances):
+        values, weights = _summary_values(distances, maxlag)
+        order = np.argsort(values, kind='stable')
+        return values[order], np.asarray(weights, dtype=float)[order]
+
+    # maxlags larger than maximum separating distance will be ignored
+    if maxlag is None or maxlag > np.nanmax(distances):
+        maxlag = np.nanmax(distances)
+
+    # filter for distances < maxlag
+    d = distances[np.where(distances <= maxlag)]
+    values, counts = np.unique(d, return_counts=True)
+    return values.astype(float), counts.astype(float)
+
+
+@njit
+def _ssq(cw, cx, cxx, j, i):
+    # weighted sum of squares of the sorted values j to i
+    sw = cw[i + 1] - cw[j]
+    sx = cx[i + 1] - cx[j]
+    return max(cxx[i + 1] - cxx[j] - sx * sx / sw, 0.)
+
+
+@njit
+def _ckmeans_1d(x, w, n):
+    """
+    Optimal clustering of the sorted values `x` with weights `w` into `n`
+    intervals, minimizing the weighted within-cluster sum of squares, by
+    the dynamic programming of Ckmeans.1d.dp. As the optimal start of the
+    last cluster is monotone in the number of values, each row of the
+    programming is solved by divide and conquer in O(m log m).
+    Returns the start index of each cluster.
+    """
+    m = x.size
+
+    # prefix sums, shifted for precision
+    shift = x[m // 2]
+    cw = np.zeros(m + 1)
+    cx = np.zeros(m + 1)
+    cxx = np.zeros(m + 1)
+    for i in range(m):
+        xi = x[i] - shift
+        cw[i + 1] = cw[i] + w[i]
+        cx[i + 1] = cx[i] + w[i] * xi
+        cxx[i + 1] = cxx[i] + w[i] * xi * xi
+
+    # cost of the first i + 1 values in k + 1 clusters
+    prev = np.empty(m)
+    for i in range(m):
+        prev[i] = _ssq(cw, cx, cxx, 0, i)
+    start = np.zeros((n, m), dtype=np.int32)
+
+    stack = np.empty((2 * m + 2, 4), dtype=np.int64)
+    for k in range(1, n):
+        cur = np.full(m, np.inf)
+        top = 0
+        stack[0] = (k, m - 1, k, m - 1)
+        while top >= 0:
+            ilo, ihi, jlo, jhi = stack[top]
+            top -= 1
+            if ilo > ihi:
+                continue
+            mid = (ilo + ihi) // 2
+
+            # the last cluster starts at j
+            best, bestj = np.inf, jlo
+            for j in range(max(jlo, k), min(mid, jhi) + 1):
+                cost = prev[j - 1] + _ssq(cw, cx, cxx, j, mid)
+                if cost < best:
+                    best, bestj = cost, j
+            cur[mid] = best
+            start[k, mid] = bestj
+
+            top += 1
+            stack[top] = (ilo, mid - 1, jlo, bestj)
+            top += 1
+            stack[top] = (mid + 1, ihi, bestj, jhi)
+        prev = cur
+
+    # backtrack the cluster starts
+    starts = np.zeros(n, dtype=np.int64)
+    i = m - 1
+    for k in range(n - 1, 0, -1):
+        starts[k] = start[k, i]
+        i = starts[k] - 1
+    return starts
+
+
+@njit
+def _ward_1d(x, w, n):
+    """
+    Ward clustering of the sorted values `x` with weights `w`. In one
+    dimension, the clusters are intervals, thus only adjacent clusters
+    are merged. The merge of the smallest increase in within-cluster
+    sum of squares is taken from a heap, until `n` clusters are left.
+    Returns the start index of each cluster.
+    """
+    m = x.size
+    size = w.copy()
+    mean = x.copy()
+    left = np.arange(m) - 1
+    right = np.arange(m) + 1
+    alive = np.ones(m, dtype=np.bool_)
+    version = np.zeros(m, dtype=np.int64)
+
+    # the merge of a cluster with its right neighbor
+    heap = [
+        (size[i] * size[i + 1] / (size[i] + size[i + 1]) * (mean[i + 1] - mean[i])**2, i, 0)
+        for i in range(m - 1)
+    ]
+    heapq.heapify(heap)
+
+    k = m
+    while k > n:
+        _, i, ver = heapq.heappop(heap)
+        if not alive[i] or ver != version[i]:
+            continue
+
+        # merge the right neighbor j into i
+        j = right[i]
+        total = size[i] + size[j]
+        mean[i] = (size[i] * mean[i] + size[j] * mean[j]) / total
+        size[i] = total
+        alive[j] = False
+        right[i] = right[j]
+        if right[j] < m:
+            left[right[j]] = i
+        k -= 1
+
+        # both merges with the new cluster changed
+        version[i] += 1
+        r = right[i]
+        if r < m:
+            cost = size[i] * size[r] / (size[i] + size[r]) * (mean[r] - mean[i])**2
+            heapq.heappush(heap, (cost, i, version[i]))
+        lft = left[i]
+        if lft >= 0:
+            version[lft] += 1
+            cost = size[lft] * size[i] / (size[lft] + size[i]) * (mean[i] - mean[lft])**2
+            heapq.heappush(heap, (cost, lft, version[lft]))
+
+    return np.flatnonzero(alive)
+
+
+def _cluster_edges(centers):
+    """Upper lag edges equidistant between the sorted cluster centers"""
+    bounds = zip([0] + list(centers)[:-1], centers)
+    return np.fromiter(((low + up) / 2 for low, up in bounds), dtype=float)
+
+
+def _weighted_median(values, weights):
+    """Median of the sorted values with integer-like weights"""
+    cumw = np.cumsum(weights)
+    pos = (cumw[-1] - 1) / 2
+    low = values[np.searchsorted(cumw, np.floor(pos), side='right')]
+    high = values[np.searchsorted(cumw, np.ceil(pos), side='right')]
+    return (low + high) / 2
+
+
 def kmeans(distances, n, maxlag, binning_random_state=42, **kwargs):
     """
     .. versionadded:: 0.3.9
 
+    .. versionchanged:: 0.6.5
+        The clusters are found by the exact 1D dynamic programming of
+        Ckmeans.1d.dp [201]_ on the sorted distinct distances, instead of
+        :class:`KMeans <sklearn.cluster.KMeans>`. The result is the
+        optimal clustering and deterministic, `binning_random_state` is
+        not used anymore. The distances can be given as
+        :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`,
+        which clusters the weighted histogram bins.
+
     Clustering of pairwise separating distances between locations up to
     maxlag. The lag class edges are formed equidistant from each cluster
     center. Note: this does not necessarily result in equidistance lag classes.
@@ -143,44 +410,38 @@ def kmeans(distances, n, maxlag, binning_random_state=42, **kwargs):
     bin_edges : numpy.ndarray
         The **upper** bin edges of the lag classes
 
-    See Also
-    --------
-    sklearn.cluster.KMeans
-
-    Note
-    ----
-    The :class:`KMeans <sklearn.cluster.KMeans>` that is used under the hood is not
-    a deterministic algorithm, as the starting cluster centroids are seeded
-    randomly. This can yield slightly different results on reach run.
-    Thus, for this application, the random_state on KMeans is fixed to a
-    specific value. You can change the seed by passing another seed to
-    :class:`Variogram <skgstat.Variogram>` as `binning_random_state`.
+    References
+    ----------
+    .. [201] Wang, H., Song, M. (2011): Ckmeans.1d.dp: Optimal k-means
+        Clustering in One Dimension by Dynamic Programming. The R Journal,
+        3(2), 29-33.
 
     """
-    # maxlags larger than maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    values, weights = _sorted_weighted(distances, maxlag)
 
-    # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
+    # there cannot be more clusters than distinct distances
+    k = min(n, len(values))
+    starts = _ckmeans_1d(values, weights, k)
 
-    # cluster the filtered distances
-    km = KMeans(n_clusters=n, random_state=binning_random_state).fit(d.reshape(-1, 1))
+    # the centers are the weighted means of the clusters
+    sums = np.add.reduceat(values * weights, starts)
+    _centers = sums / np.add.reduceat(weights, starts)
 
-    # get the centers
-    _centers = np.sort(km.cluster_centers_.flatten())
-
-    # build the upper edges
-    bounds = zip([0] + list(_centers)[:-1], _centers)
-    edges = np.fromiter(((low + up) / 2 for low, up in bounds), dtype=float)
-
-    return edges, None
+    return _cluster_edges(_centers), None if k == n else k
 
 
 def ward(distances, n, maxlag, **kwargs):
     """
     .. versionadded:: 0.3.9
 
+    .. versionchanged:: 0.6.5
+        The clusters are merged on the sorted distinct distances, where
+        only adjacent clusters have to be compared, instead of using
+        :class:`AgglomerativeClustering <sklearn.cluster.AgglomerativeClustering>`
+        on all pairs. This scales to millions of distances. The distances
+        can be given as
+        :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`.
+
     Clustering of pairwise separating distances between locations up to
     maxlag. The lag class edges are formed equidistant from each cluster
     center. Note: this does not necessarily result in equidistance lag classes.
@@ -203,35 +464,23 @@ def ward(distances, n, maxlag, **kwargs):
     bin_edges : numpy.ndarray
         The **upper** bin edges of the lag classes
 
-    See Also
-    --------
-    sklearn.clsuter.AgglomerativeClustering
-
     """
-    # maxlags larger than maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    values, weights = _sorted_weighted(distances, maxlag)
 
-    # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
-
-    # cluster the filtered distances
-    w = AgglomerativeClustering(linkage='ward', n_clusters=n).fit(d.reshape(-1, 1))
+    # there cannot be more clusters than distinct distances
+    k = min(n, len(values))
+    starts = _ward_1d(values, weights, k)
 
-    # get the aggregation function
+    # get the centers
     if kwargs.get('binning_agg_func', False) == 'median':
-        agg = np.median
+        _centers = np.array([
+            _weighted_median(v, w)
+            for v, w in zip(np.split(values, starts[1:]), np.split(weights, starts[1:]))
+        ])
     else:
-        agg = np.mean
-
-    # get the centers
-    _centers = np.sort([agg(d[np.where(w.labels_ == i)[0]]) for i in np.unique(w.labels_)])
-
-    # build the upper edges
-    bounds = zip([0] + list(_centers)[:-1], _centers)
-    edges = np.fromiter(((low + up) / 2 for low, up in bounds), dtype=float)
+        _centers = np.add.reduceat(values * weights, starts) / np.add.reduceat(weights, starts)
 
-    return edges, None
+    return _cluster_edges(_centers), None if k == n else k
 
 
 def stable_entropy_lags(distances, n, maxlag, **kwargs):
@@ -261,34 +510,68 @@ def stable_entropy_lags(distances, n, maxlag, **kwargs):
     binning_entropy_bins : int, str
         Binning method for calculating the shannon entropy
         on each iteration.
+
+    .. versionchanged:: 0.6.5
+        The distances can be given as
+        :class:`DistanceHistogram <skgstat.util.histogram.DistanceHistogram>`,
+        which weights the histogram bins in the Shannon entropy.
+        The histograms of the lag classes are taken from prefix sums
+        over the sorted distances, thus a loss evaluation does not
+        depend on the number of distances anymore.
+
     Returns
     -------
     bin_edges : numpy.ndarray
         The **upper** bin edges of the lag classes
 
     """
-    # maxlags larger than maximum separating distance will be ignored
-    if maxlag is None or maxlag > np.nanmax(distances):
-        maxlag = np.nanmax(distances)
+    entropy_bins = kwargs.get('binning_entropy_bins', 'sqrt')
+    if _is_summary(distances):
+        d, w = _summary_values(distances, maxlag)
+
+        # the weighted bins need the binning of the distances
+        if isinstance(entropy_bins, str):
+            bins = _summary_bin_edges(distances, entropy_bins, maxlag)
+        else:
+            bins = np.histogram_bin_edges(d, bins=entropy_bins)
+    else:
+        # maxlags larger than maximum separating distance will be ignored
+        if maxlag is None or maxlag > np.nanmax(distances):
+            maxlag = np.nanmax(distances)
 
-    # filter for distances < maxlag
-    d = distances[np.where(distances <= maxlag)]
+        # filter for distances < maxlag
+        d, w = distances[np.where(distances <= maxlag)], None
 
-    # create a global binning and initial guess
-    bins = np.histogram_bin_edges(d, bins=kwargs.get('binning_entropy_bins', 'sqrt'))
+        # create a global binning
+        bins = np.histogram_bin_edges(d, bins=entropy_bins)
+
+    # initial guess
     initial_guess = np.linspace(0, np.nanmax(d), n + 1)[1:]
 
+    # sorted distances and their cumulative counts, thus the histogram
+    # of any lag class is a difference of prefix sums
+    order = np.argsort(d, kind='stable')
+    sd = d[order]
+    counts = np.ones(len(sd), dtype=np.int64) if w is None else w[order]
+    cum = np.concatenate(([0], np.cumsum(counts)))
+
+    # number of distances below each histogram edge, the last bin is closed
+    below = cum[np.searchsorted(sd, bins, side='left')]
+    below[-1] = cum[np.searchsorted(sd, bins[-1], side='right')]
+
     # define the loss function
     def loss(edges):
+        # histogram of each lag class [l, u) from the prefix sums
+        ranks = cum[np.searchsorted(sd, edges, side='left')]
+        l, u = ranks[:-1, None], ranks[1:, None]
+        c = np.maximum(np.minimum(u, below[1:]) - np.maximum(l, below[:-1]), 0)
+        total = c.sum(axis=1)
+
         # get the shannon entropy for the current binning
         h = np.ones(len(edges) - 1) * 9999
-        for i, bnd in enumerate(zip(edges, edges[1:])):
-            l, u = bnd
-            x = d[np.where((d >= l) & (d < u))[0]]
-            if len(x) == 0:
-                continue
-            else:
-                h[i] = shannon_entropy(x, bins)
+        filled = total > 0
+        p = c[filled] / total[filled, None] + 1e-15
+        h[filled] = - np.sum(np.log2(p) * p, axis=1)
 
         # return the absolute differences between the bins
         return np.sum(np.abs(np.diff(h)))
@@ -63,7 +63,8 @@ def matheron(x):
     if x.size == 0:
         return np.nan
 
-    return (1. / (2 * x.size)) * np.sum(np.power(x, 2))
+    # accumulate in double precision, also for float32 input
+    return (1. / (2 * x.size)) * np.sum(np.power(x.astype(np.float64), 2))
 
 
 @njit
@@ -120,7 +121,7 @@ def cressie(x):
         return np.nan
 
     # Nominator
-    nominator = np.power((1 / n) * np.sum(np.power(x, 0.5)), 4)
+    nominator = np.power((1 / n) * np.sum(np.power(x.astype(np.float64), 0.5)), 4)
 
     # Denominator
     denominator = 0.457 + (0.494 / n) + (0.045 / n**2)
@@ -128,6 +129,132 @@ def cressie(x):
     return nominator / (2 * denominator)
 
 
+def _group_sums(weights, groups, n):
+    """Sum the weights of each of the groups 0 to n - 1, skipping group -1"""
+    return np.bincount(groups + 1, weights=weights, minlength=n + 1)[1:n + 1]
+
+
+class MomentAccumulator:
+    """
+    .. versionadded:: 0.6.5
+
+    Streaming accumulator for semi-variance estimators, that only need
+    the number and a sum of a moment of the pairwise differences in each
+    lag class. The accumulator follows an init / update / merge /
+    finalize protocol: it is initialized with the number of lag classes,
+    updated with chunks of pairwise differences, partial accumulators
+    can be merged and the semi-variances are calculated on finalize.
+    The memory does not depend on the number of point pairs.
+
+    Parameters
+    ----------
+    n : int
+        Number of lag classes
+
+    """
+    def __init__(self, n: int):
+        self.n = n
+        self.count = np.zeros(n)
+        self.total = np.zeros(n)
+
+    @staticmethod
+    def moment(x):
+        raise NotImplementedError
+
+    def update(self, x, groups):
+        """
+        Add the pairwise differences `x` with the lag classes `groups`.
+        Differences in group ``-1`` are not used.
+        """
+        self.count += _group_sums(None, groups, self.n)
+        self.total += _group_sums(self.moment(np.asarray(x, dtype=np.float64)), groups, self.n)
+        return self
+
+    def merge(self, other):
+        """Add the partial sums of another accumulator"""
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def finalize(self):
+        """Semi-variance of each lag class, NaN for empty lag classes"""
+        raise NotImplementedError
+
+
+class MatheronAccumulator(MomentAccumulator):
+    """
+    .. versionadded:: 0.6.5
+
+    Streaming accumulator of :func:`matheron <skgstat.estimators.matheron>`.
+    """
+    @staticmethod
+    def moment(x):
+        return x * x
+
+    def finalize(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.total / (2 * self.count), np.nan)
+
+
+class CressieAccumulator(MomentAccumulator):
+    """
+    .. versionadded:: 0.6.5
+
+    Streaming accumulator of :func:`cressie <skgstat.estimators.cressie>`.
+    """
+    @staticmethod
+    def moment(x):
+        return np.power(x, 0.5)
+
+    def finalize(self):
+        count = self.count
+        with np.errstate(invalid='ignore', divide='ignore'):
+            nominator = np.power(self.total / count, 4)
+            denominator = 0.457 + (0.494 / count) + (0.045 / count**2)
+            return np.where(count > 0, nominator / (2 * denominator), np.nan)
+
+
+def matheron_grouped(x, groups, n):
+    r"""
+    .. versionadded:: 0.6.5
+
+    Grouped kernel of :func:`matheron <skgstat.estimators.matheron>`.
+    Calculates the Matheron semi-variance of all `n` lag classes in one
+    pass over the pairwise differences.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Array of all pairwise differences.
+    groups : numpy.ndarray
+        Lag class of each element in `x`. Elements in group ``-1`` are
+        not used.
+    n : int
+        Number of lag classes.
+
+    Returns
+    -------
+    numpy.ndarray
+        Semi-variance of each lag class, NaN for empty lag classes.
+
+    """
+    return MatheronAccumulator(n).update(x, groups).finalize()
+
+
+def cressie_grouped(x, groups, n):
+    r"""
+    .. versionadded:: 0.6.5
+
+    Grouped kernel of :func:`cressie <skgstat.estimators.cressie>`.
+    Calculates the Cressie-Hawkins semi-variance of all `n` lag classes
+    in one pass over the pairwise differences. See
+    :func:`matheron_grouped <skgstat.estimators.matheron_grouped>` for
+    the parameters.
+
+    """
+    return CressieAccumulator(n).update(x, groups).finalize()
+
+
 def dowd(x):
     r"""Dowd semi-variance
 
@@ -189,6 +316,12 @@ def genton(x):
     data sets be close or equal to the 25% quartile of all ordered point pairs
     in X.
 
+    .. versionchanged:: 0.6.5
+        The kth order statistics are selected from the sorted sample
+        following Croux and Rousseeuw [6]_, without forming all pairwise
+        differences. The result is identical to the previous
+        implementation.
+
     Parameters
     ----------
     x : numpy.ndarray
@@ -227,24 +360,17 @@ def genton(x):
     ..  [5] Genton, M. G., (1998): Highly robust variogram estimation,
         Math. Geol., 30, 213 - 221.
 
+    ..  [6] Croux, C., and P. J. Rousseeuw (1992): Time-efficient algorithms
+        for two highly robust estimators of scale. Computational Statistics,
+        1, 411 - 428.
+
     """
     # get length
     n = x.size
 
-    if n < 2:
+    if n < 2 or np.any(np.isnan(x)):
         return np.nan
 
-    # pre-populate y => we need (n*n -n) / 2
-    y = np.zeros(int((n*n - n) / 2))
-
-    # calculate
-    z = 0
-    for i in range(n):
-        for j in range(n):
-            if i < j:
-                y[z] = np.abs(x[i] - x[j])
-                z += 1
-
     # if N > 500, (k/q) will be ~ 1/4 anyway
     if n >= 500:
         k, q, = 1, 4
@@ -255,8 +381,99 @@ def genton(x):
         # get q. Genton needs the kth quantile of q
         q = binom(n, 2)
 
+    # the kth percentile of all pairwise differences, interpolated
+    # the same way as numpy.percentile
+    m = (n * n - n) // 2
+    virtual = (m - 1) * np.true_divide(k / q, 100)
+    lower = min(int(np.floor(virtual)), m - 1)
+    gamma = virtual - lower
+
+    # select the order statistics from the sorted sample
+    s = np.sort(x)
+    a = _select_pairwise_difference(s, lower)
+    b = _select_pairwise_difference(s, lower + 1) if lower + 1 < m else a
+    diff_b_a = b - a
+    kth = b - diff_b_a * (1 - gamma) if gamma >= 0.5 else a + diff_b_a * gamma
+
     # return the kth percentile
-    return 0.5 * np.power(2.219 * np.percentile(y, (k / q)), 2)
+    return 0.5 * np.power(2.219 * kth, 2)
+
+
+@njit
+def _select_pairwise_difference(s, k):
+    """
+    .. versionadded:: 0.6.5
+
+    Select the `k`-th smallest (0-based) of all pairwise differences
+    ``s[j] - s[i], i < j`` of the sorted sample `s`, without forming them,
+    following the selection algorithm of Croux and Rousseeuw (1992).
+    The differences form a matrix with sorted rows and columns. Each
+    iteration splits the remaining candidates at the weighted median of
+    the row medians and counts the differences below it with a moving
+    pointer, which removes at least a quarter of the candidates.
+    """
+    n = s.size
+
+    # remaining candidates of row i are the columns left[i] <= j < right[i]
+    left = np.arange(1, n + 1)
+    right = np.full(n, n)
+    less = np.empty(n, dtype=np.int64)
+    less_equal = np.empty(n, dtype=np.int64)
+
+    # number of differences known to be smaller than the candidates
+    known = 0
+    while True:
+        total = np.sum(right - left)
+
+        # few candidates left, select directly
+        if total <= n:
+            values = np.empty(total)
+            z = 0
+            for i in range(n):
+                for j in range(left[i], right[i]):
+                    values[z] = s[j] - s[i]
+                    z += 1
+            return np.sort(values)[k - known]
+
+        # weighted median of the row medians
+        medians = np.empty(n)
+        weights = np.empty(n, dtype=np.int64)
+        m = 0
+        for i in range(n):
+            if right[i] > left[i]:
+                medians[m] = s[(left[i] + right[i] - 1) // 2] - s[i]
+                weights[m] = right[i] - left[i]
+                m += 1
+        order = np.argsort(medians[:m])
+        trial = medians[order[0]]
+        cumulated = 0
+        for o in order:
+            cumulated += weights[o]
+            if 2 * cumulated >= total:
+                trial = medians[o]
+                break
+
+        # first column of each row with a difference >= trial and > trial,
+        # which is not decreasing over the rows
+        p, q = 1, 1
+        for i in range(n):
+            p, q = max(p, i + 1), max(q, i + 1)
+            while p < n and s[p] - s[i] < trial:
+                p += 1
+            while q < n and s[q] - s[i] <= trial:
+                q += 1
+            less[i] = min(max(p, left[i]), right[i])
+            less_equal[i] = min(max(q, left[i]), right[i])
+
+        n_less = np.sum(less - left)
+        n_less_equal = np.sum(less_equal - left)
+        if k - known < n_less:
+            right[:] = less
+        elif k - known < n_less_equal:
+            return trial
+        else:
+            known += n_less_equal
+            left[:] = less_equal
 
 
 def minmax(x):
@@ -312,6 +529,141 @@ def percentile(x, p=50):
     return np.percentile(x, q=p)
 
 
+class SortedGroups:
+    """
+    .. versionadded:: 0.6.5
+
+    Grouped quantile engine. The pairwise differences are sorted once by
+    group and value, thus each group is a sorted, contiguous segment with
+    NaN values at its end. Medians, percentiles and extremes of all
+    groups are then read by index arithmetic, instead of one sort per
+    group.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Array of all pairwise differences.
+    groups : numpy.ndarray
+        Lag class of each element in `x`. Elements in group ``-1`` are
+        not used.
+    n : int
+        Number of lag classes.
+
+    """
+    def __init__(self, x, groups, n):
+        x = np.asarray(x)
+        keys = np.asarray(groups) + 1
+        if n < 2**16 - 1:
+            keys = keys.astype(np.uint16)
+
+        # sort by value, then stable by group, which is a counting sort
+        order = np.argsort(x, kind='stable')
+        order = order[np.argsort(keys[order], kind='stable')]
+        counts = np.bincount(keys, minlength=n + 1)
+
+        # drop the elements outside of all groups
+        outside = counts[0]
+        self.values = x[order[outside:]]
+        self.count = counts[1:n + 1]
+        self.starts = np.cumsum(self.count) - self.count
+
+        # NaN values are sorted to the end of each group
+        nan = np.isnan(self.values)
+        if np.any(nan):
+            nan_groups = np.repeat(np.arange(n), self.count)[nan]
+            self.valid = self.count - np.bincount(nan_groups, minlength=n)
+        else:
+            self.valid = self.count
+
+    def _take(self, idx, size):
+        """Element idx of each group, NaN for empty groups"""
+        out = np.full(len(size), np.nan)
+        has = size > 0
+        out[has] = self.values[self.starts[has] + idx[has]]
+        return out
+
+    def quantile(self, q, skipna=False):
+        """
+        Quantile `q` of each group, with the linear interpolation of
+        :func:`numpy.percentile`. If `skipna` is False, groups with
+        NaN values return NaN.
+        """
+        size = self.valid if skipna else self.count
+        virtual = (size - 1) * q
+        lower = np.clip(np.floor(virtual).astype(np.int64), 0, np.maximum(size - 1, 0))
+        upper = np.minimum(lower + 1, np.maximum(size - 1, 0))
+        gamma = virtual - lower
+
+        a, b = self._take(lower, size), self._take(upper, size)
+        diff_b_a = b - a
+        result = np.where(gamma >= 0.5, b - diff_b_a * (1 - gamma), a + diff_b_a * gamma)
+
+        if not skipna:
+            result[self.valid < self.count] = np.nan
+        return result
+
+    def median(self):
+        """Median of each group, ignoring NaN values"""
+        size = self.valid
+        lower, upper = (size - 1) // 2, size // 2
+
+        # the same as the mean of the two middle elements
+        a, b = self._take(lower, size), self._take(upper, size)
+        return np.where(lower == upper, a, (a + b) / 2)
+
+    def min(self):
+        """Minimum of each group, ignoring NaN values"""
+        return self._take(np.zeros(len(self.valid), dtype=np.int64), self.valid)
+
+    def max(self):
+        """Maximum of each group, ignoring NaN values"""
+        return self._take(self.valid - 1, self.valid)
+
+    def mean(self):
+        """Mean of each group, ignoring NaN values"""
+        values = np.where(np.isnan(self.values), 0., self.values)
+        group_ids = np.repeat(np.arange(len(self.count)), self.count)
+        sums = np.bincount(group_ids, weights=values, minlength=len(self.count))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.valid > 0, sums / self.valid, np.nan)
+
+
+def dowd_grouped(x, groups, n):
+    """
+    .. versionadded:: 0.6.5
+
+    Grouped kernel of :func:`dowd <skgstat.estimators.dowd>`, using
+    :class:`SortedGroups <skgstat.estimators.SortedGroups>`. See
+    :func:`matheron_grouped <skgstat.estimators.matheron_grouped>` for
+    the parameters.
+
+    """
+    return 2.198 * SortedGroups(x, groups, n).median()**2
+
+
+def percentile_grouped(x, groups, n, p=50):
+    """
+    .. versionadded:: 0.6.5
+
+    Grouped kernel of :func:`percentile <skgstat.estimators.percentile>`,
+    using :class:`SortedGroups <skgstat.estimators.SortedGroups>`.
+    """
+    return SortedGroups(x, groups, n).quantile(np.true_divide(p, 100))
+
+
+def minmax_grouped(x, groups, n):
+    """
+    .. versionadded:: 0.6.5
+
+    Grouped kernel of :func:`minmax <skgstat.estimators.minmax>`, using
+    :class:`SortedGroups <skgstat.estimators.SortedGroups>`.
+    """
+    sorted_groups = SortedGroups(x, groups, n)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sorted_groups.max() - sorted_groups.min()) / sorted_groups.mean()
+
+
 def entropy(x, bins=None):
     """Shannon Entropy estimator
 
@@ -349,3 +701,13 @@ def entropy(x, bins=None):
         bins = 15
 
     return shannon_entropy(x, bins)
+
+
+# the Variogram uses the grouped kernels and accumulators, where available
+matheron.grouped = matheron_grouped
+matheron.accumulator = MatheronAccumulator
+cressie.grouped = cressie_grouped
+cressie.accumulator = CressieAccumulator
+dowd.grouped = dowd_grouped
+percentile.grouped = percentile_grouped
+minmax.grouped = minmax_grouped
@@ -1,9 +1,7 @@
-import math
 from functools import wraps
 
 import numpy as np
 from scipy import special
-from numba import jit
 
 
 def variogram(func):
@@ -18,8 +16,54 @@ def variogram(func):
     return wrapper
 
 
-@variogram
-@jit
+def vectorized(func):
+    """
+    .. versionadded:: 0.6.5
+
+    Decorator for variogram models written with NumPy array operations.
+    Unlike :func:`variogram <skgstat.models.variogram>`, the lags are
+    passed to the model as one array of any shape, thus millions of lags
+    are evaluated in one call. A scalar lag returns a float.
+    """
+    @wraps(func)
+    def wrapper(h, *args, **kwargs):
+        result = func(np.asarray(h, dtype=float), *args, **kwargs)
+        return float(result) if np.ndim(result) == 0 else result
+
+    # the undecorated model, like the py_func of numba functions
+    wrapper.py_func = func
+
+    # analytic Jacobian, set by the jacobian decorator
+    wrapper.jac = None
+    return wrapper
+
+
+def jacobian(model):
+    """
+    .. versionadded:: 0.6.5
+
+    Register the decorated function as the Jacobian of `model`. The
+    function takes the same arguments as the model and returns the
+    partial derivatives of the semi-variance with respect to each model
+    parameter, stacked along the last axis in the order of the
+    arguments. :func:`Variogram.fit <skgstat.Variogram.fit>` passes it
+    to :func:`scipy.optimize.curve_fit` as `jac`.
+    """
+    def register(func):
+        @wraps(func)
+        def wrapper(h, *args):
+            return func(np.asarray(h, dtype=float), *args)
+        model.jac = wrapper
+        return wrapper
+    return register
+
+
+def _stack(h, *columns):
+    """Stack the derivatives along a new last axis of the shape of h"""
+    return np.stack([np.broadcast_to(c, h.shape) for c in columns], axis=-1)
+
+
+@vectorized
 def spherical(h, r, c0, b=0):
     r"""Spherical Variogram function
 
@@ -28,7 +72,7 @@ def spherical(h, r, c0, b=0):
 
     Parameters
     ----------
-    h : float
+    h : float, numpy.ndarray
         Specifies the lag of separating distances that the dependent variable
         shall be calculated for. It has to be a positive real number.
     r : float
@@ -44,7 +88,7 @@ def spherical(h, r, c0, b=0):
 
     Returns
     -------
-    gamma : numpy.float64
+    gamma : float, numpy.ndarray
         Unlike in most variogram function formulas, which define the function
         for :math:`2*\gamma`, this function will return :math:`\gamma` only.
 
@@ -76,14 +120,14 @@ def spherical(h, r, c0, b=0):
     # prepare parameters
     a = r / 1.
 
-    if h <= r:
-        return b + c0 * ((1.5 * (h / a)) - (0.5 * ((h / a) ** 3.0)))
-    else:
-        return b + c0
+    return np.where(
+        h <= r,
+        b + c0 * ((1.5 * (h / a)) - (0.5 * ((h / a) ** 3.0))),
+        b + c0
+    )
 
 
-@variogram
-@jit
+@vectorized
 def exponential(h, r, c0, b=0):
     r"""Exponential Variogram function
 
@@ -92,7 +136,7 @@ def exponential(h, r, c0, b=0):
 
     Parameters
     ----------
-    h : float
+    h : float, numpy.ndarray
         Specifies the lag of separating distances that the dependent variable
         shall be calculated for. It has to be a positive real number.
     r : float
@@ -111,7 +155,7 @@ def exponential(h, r, c0, b=0):
 
     Returns
     -------
-    gamma : numpy.float64
+    gamma : float, numpy.ndarray
         Unlike in most variogram function formulas, which define the function
         for :math:`2*\gamma`, this function will return :math:`\gamma` only.
 
@@ -141,11 +185,10 @@ def exponential(h, r, c0, b=0):
     # prepare parameters
     a = r / 3.
 
-    return b + c0 * (1. - math.exp(-(h / a)))
+    return b + c0 * (1. - np.exp(-(h / a)))
 
 
-@variogram
-@jit
+@vectorized
 def gaussian(h, r, c0, b=0):
     r""" Gaussian Variogram function
 
@@ -154,7 +197,7 @@ def gaussian(h, r, c0, b=0):
 
     Parameters
     ----------
-    h : float
+    h : float, numpy.ndarray
         Specifies the lag of separating distances that the dependent variable
         shall be calculated for. It has to be a positive real number.
     r : float
@@ -173,7 +216,7 @@ def gaussian(h, r, c0, b=0):
 
     Returns
     -------
-    gamma : numpy.float64
+    gamma : float, numpy.ndarray
         Unlike in most variogram function formulas, which define the function
         for :math:`2*\gamma`, this function will return :math:`\gamma` only.
 
@@ -206,11 +249,10 @@ def gaussian(h, r, c0, b=0):
     # prepare parameters
     a = r / 2.
 
-    return b + c0 * (1. - math.exp(- (h ** 2 / a ** 2)))
+    return b + c0 * (1. - np.exp(- (h ** 2 / a ** 2)))
 
 
-@variogram
-@jit
+@vectorized
 def cubic(h, r, c0, b=0):
     r"""Cubic Variogram function
 
@@ -219,7 +261,7 @@ def cubic(h, r, c0, b=0):
 
     Parameters
     ----------
-    h : float
+    h : float, numpy.ndarray
         Specifies the lag of separating distances that the dependent variable
         shall be calculated for. It has to be a positive real number.
     r : float
@@ -235,7 +277,7 @@ def cubic(h, r, c0, b=0):
 
     Returns
     -------
-    gamma : numpy.float64
+    gamma : float, numpy.ndarray
         Unlike in most variogram function formulas, which define the function
         for :math:`2*\gamma`, this function will return :math:`\gamma` only.
 
@@ -264,17 +306,17 @@ def cubic(h, r, c0, b=0):
     # prepare parameters
     a = r / 1.
 
-    if h < r:
-        return b + c0 * ((7 * (h ** 2 / a ** 2)) -
-                         ((35 / 4) * (h ** 3 / a ** 3)) +
-                         ((7 / 2) * (h ** 5 / a ** 5)) -
-                         ((3 / 4) * (h ** 7 / a ** 7)))
-    else:
-        return b + c0
+    return np.where(
+        h < r,
+        b + c0 * ((7 * (h ** 2 / a ** 2)) -
+                  ((35 / 4) * (h ** 3 / a ** 3)) +
+                  ((7 / 2) * (h ** 5 / a ** 5)) -
+                  ((3 / 4) * (h ** 7 / a ** 7))),
+        b + c0
+    )
 
 
-@variogram
-@jit
+@vectorized
 def stable(h, r, c0, s, b=0):
     r"""Stable Variogram function
 
@@ -286,7 +328,7 @@ def stable(h, r, c0, s, b=0):
 
     Parameters
     ----------
-    h : float
+    h : float, numpy.ndarray
         Specifies the lag of separating distances that the dependent variable
         shall be calculated for. It has to be a positive real number.
     r : float
@@ -310,7 +352,7 @@ def stable(h, r, c0, s, b=0):
 
     Returns
     -------
-    gamma : numpy.float64
+    gamma : float, numpy.ndarray
         Unlike in most variogram function formulas, which define the function
         for :math:`2*\gamma`, this function will return :math:`\gamma` only.
 
@@ -333,20 +375,16 @@ def stable(h, r, c0, s, b=0):
         geostatistical modeling and kriging (Vol. 998). John Wiley & Sons.
 
     """
-    # if s gts too small, we run into a zeroDivision error at lag 0
-    if h == 0:
-        return b
-
     # prepare parameters
     a = r / np.power(3, 1 / s)
 
-#    if s > 2:
-#        s = 2
-    return b + c0 * (1. - math.exp(- math.pow(h / a, s)))
+    # if s gts too small, we run into a zeroDivision error at lag 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        gamma = b + c0 * (1. - np.exp(- np.power(h / a, s)))
+    return np.where(h == 0, b, gamma)
 
 
-@variogram
-@jit(forceobj=True)
+@vectorized
 def matern(h, r, c0, s, b=0):
     r"""Matérn Variogram function
 
@@ -358,7 +396,7 @@ def matern(h, r, c0, s, b=0):
 
     Parameters
     ----------
-    h : float
+    h : float, numpy.ndarray
         Specifies the lag of separating distances that the dependent variable
         shall be calculated for. It has to be a positive real number.
     r : float
@@ -385,7 +423,7 @@ def matern(h, r, c0, s, b=0):
 
     Returns
     -------
-    gamma : numpy.float64
+    gamma : float, numpy.ndarray
         Unlike in most variogram function formulas, which define the function
         for :math:`2*\gamma`, this function will return :math:`\gamma` only.
 
@@ -411,13 +449,96 @@ def matern(h, r, c0, s, b=0):
         44(10), 1–18. https://doi.org/10.1029/2007WR006604
 
     """
-    if h == 0:
-        return b
     # prepare parameters
     a = r / 2.
 
-    # calculate
-    return b + c0 * (1. - (2 / special.gamma(s)) *
-                     np.power((h * np.sqrt(s)) / a, s) *
-                     special.kv(s, 2 * ((h * np.sqrt(s)) / a))
-                     )
+    # calculate, the lag 0 returns the nugget
+    with np.errstate(invalid='ignore', over='ignore'):
+        gamma = b + c0 * (1. - (2 / special.gamma(s)) *
+                          np.power((h * np.sqrt(s)) / a, s) *
+                          special.kv(s, 2 * ((h * np.sqrt(s)) / a))
+                          )
+    return np.where(h == 0, b, gamma)
+
+
+# analytic derivatives with respect to range, sill, shape and nugget
+@jacobian(spherical)
+def _spherical_jac(h, r, c0, b=0):
+    t = h / r
+    inside = h <= r
+    f = np.where(inside, 1.5 * t - 0.5 * t ** 3, 1.)
+    df_dr = np.where(inside, -1.5 * t * (1. - t ** 2) / r, 0.)
+    return _stack(h, c0 * df_dr, f, 1.)
+
+
+@jacobian(exponential)
+def _exponential_jac(h, r, c0, b=0):
+    e = np.exp(-(3. * h / r))
+    return _stack(h, -c0 * e * 3. * h / r ** 2, 1. - e, 1.)
+
+
+@jacobian(gaussian)
+def _gaussian_jac(h, r, c0, b=0):
+    e = np.exp(-(4. * h ** 2 / r ** 2))
+    return _stack(h, -c0 * e * 8. * h ** 2 / r ** 3, 1. - e, 1.)
+
+
+@jacobian(cubic)
+def _cubic_jac(h, r, c0, b=0):
+    t = h / r
+    inside = h < r
+    f = np.where(
+        inside,
+        7 * t ** 2 - (35 / 4) * t ** 3 + (7 / 2) * t ** 5 - (3 / 4) * t ** 7,
+        1.
+    )
+    df_dt = 14 * t - (105 / 4) * t ** 2 + (35 / 2) * t ** 4 - (21 / 4) * t ** 6
+    df_dr = np.where(inside, -df_dt * t / r, 0.)
+    return _stack(h, c0 * df_dr, f, 1.)
+
+
+@jacobian(stable)
+def _stable_jac(h, r, c0, s, b=0):
+    # (h / a)**s simplifies to 3 * (h / r)**s
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        u = 3. * np.power(h / r, s)
+        e = np.exp(-u)
+        df_dr = -e * s * u / r
+        df_ds = e * u * np.log(h / r)
+
+    # the lag 0 is the nugget only
+    zero = h == 0
+    return _stack(
+        h,
+        np.where(zero, 0., c0 * df_dr),
+        np.where(zero, 0., 1. - e),
+        np.where(zero, 0., c0 * df_ds),
+        1.
+    )
+
+
+@jacobian(matern)
+def _matern_jac(h, r, c0, s, b=0):
+    z = 2. * h * np.sqrt(s) / r
+    with np.errstate(invalid='ignore', over='ignore'):
+        g = np.power(z, s) * special.kv(s, 2 * z)
+        f = 1. - (2 / special.gamma(s)) * g
+
+        # d/dz z**s K_s(2z) = -2 z**s K_(s-1)(2z)
+        df_dr = -(4 / special.gamma(s)) * np.power(z, s + 1) * \
+            special.kv(s - 1, 2 * z) / r
+
+    # there is no closed form derivative of kv for the order s
+    eps = min(1e-6 * max(s, 1.), s / 2)
+    df_ds = (
+        matern.py_func(h, r, 1., s + eps) - matern.py_func(h, r, 1., s - eps)
+    ) / (2 * eps)
+
+    zero = h == 0
+    return _stack(
+        h,
+        np.where(zero, 0., c0 * df_dr),
+        np.where(zero, 0., f),
+        np.where(zero, 0., c0 * df_ds),
+        1.
+    )
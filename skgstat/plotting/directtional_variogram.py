@@ -1,7 +1,6 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
-from scipy.spatial.distance import squareform
 
 try:
     import plotly.graph_objects as go
@@ -10,26 +9,23 @@ except ImportError:
 
 
 def __calculate_plot_data(variogram, points):
-    # get the direction mask
-    direction_mask = squareform(variogram._direction_mask())
+    # get the direction mask aligned to the point pairs
+    direction_mask = variogram._direction_mask()
+    pairs = variogram._X.pairs
 
-    # build a coordinate meshgrid
-    n = len(variogram.coordinates)
-    r = np.arange(n)
-    x1, x2 = np.meshgrid(r, r)
+    # use each point pair in both directions
+    i = np.concatenate((pairs.j, pairs.i))[np.tile(direction_mask, 2)]
+    j = np.concatenate((pairs.i, pairs.j))[np.tile(direction_mask, 2)]
 
     # handle the point pairs
     if isinstance(points, int):
         points = [points]
     if isinstance(points, (list, tuple)):
-        point_mask = np.zeros((n, n), dtype=bool)
-        point_mask[:, points] = True
-    else:
-        # use all points
-        point_mask = np.ones((n, n), dtype=bool)
+        point_mask = np.isin(i, points)
+        i, j = i[point_mask], j[point_mask]
 
-    start = variogram.coordinates[x1[direction_mask & point_mask]]
-    end = variogram.coordinates[x2[direction_mask & point_mask]]
+    start = variogram.coordinates[i]
+    end = variogram.coordinates[j]
 
     # extract all lines
     lines = np.column_stack((
@@ -1,5 +1,4 @@
 import numpy as np
-from scipy.spatial.distance import squareform
 import matplotlib.pyplot as plt
 
 try:
@@ -12,15 +11,19 @@ def __calculate_plot_data(variogram):
     tails = []
     heads = []
 
-    sq_lags = squareform(variogram.lag_groups())
+    # use each point pair in both directions
+    pairs = variogram._X.pairs
+    lags = np.tile(variogram.lag_groups(), 2)
+    x = np.concatenate((pairs.i, pairs.j))
+    y = np.concatenate((pairs.j, pairs.i))
 
-    for h in np.unique(variogram.lag_groups()):
+    for h in np.unique(lags):
         # get head and tail
-        x, y = np.where(sq_lags == h)
+        mask = lags == h
 
         # add
-        tails.append(variogram.values[x].flatten())
-        heads.append(variogram.values[y].flatten())
+        tails.append(variogram.values[x[mask]].flatten())
+        heads.append(variogram.values[y[mask]].flatten())
 
     return tails, heads
 
@@ -11,6 +11,7 @@ from skgstat.binning import (
     ward,
     stable_entropy_lags
 )
+from skgstat.util import QuantileSketch, DistanceHistogram, shannon_entropy
 
 
 class TestEvenWidth(unittest.TestCase):
@@ -77,6 +78,27 @@ class TestUniformCount(unittest.TestCase):
             decimal=4
         )
 
+    def test_sketch(self):
+        np.random.seed(42)
+        d = np.random.gamma(3, 10, 50000)
+        sketch = QuantileSketch.from_chunks(np.array_split(d, 5))
+
+        for maxlag in (None, 40):
+            bins, _ = uniform_count_lags(d, 8, maxlag)
+            approx, _ = uniform_count_lags(sketch, 8, maxlag)
+            assert_array_almost_equal(approx, bins, decimal=0)
+
+    def test_histogram(self):
+        np.random.seed(42)
+        d = np.random.gamma(3, 10, 50000)
+        hist = DistanceHistogram(d, resolution=2000)
+        width = hist.edges[1] - hist.edges[0]
+
+        for maxlag in (None, 40):
+            bins, _ = uniform_count_lags(d, 8, maxlag)
+            approx, _ = uniform_count_lags(hist, 8, maxlag)
+            self.assertLess(np.max(np.abs(approx - bins)), width)
+
 
 class TestDerivedBins(unittest.TestCase):
     def test_auto(self):
@@ -111,6 +133,27 @@ class TestDerivedBins(unittest.TestCase):
             decimal=1
         )
 
+    def test_sketch(self):
+        np.random.seed(42)
+        d = np.random.gamma(3, 10, 1000)
+        sketch = QuantileSketch.from_chunks([d])
+
+        # the small sketch is exact
+        for method in ('fd', 'sturges', 'scott', 'sqrt'):
+            bins, n = auto_derived_lags(d, method, 50)
+            sbins, sn = auto_derived_lags(sketch, method, 50)
+            self.assertEqual(n, sn)
+            assert_array_almost_equal(bins, sbins)
+
+        # doane is calculated from the weighted values
+        bins, n = auto_derived_lags(d, 'doane', 50)
+        sbins, sn = auto_derived_lags(sketch, 'doane', 50)
+        self.assertEqual(n, sn)
+        assert_array_almost_equal(bins, sbins)
+
+        with self.assertRaises(ValueError):
+            auto_derived_lags(sketch, 'stone', 50)
+
 
 class TestClusteringBins(unittest.TestCase):
     def test_kmeans(self):
@@ -118,11 +161,53 @@ class TestClusteringBins(unittest.TestCase):
         bins, _ = kmeans(np.random.gamma(10, 40, 500), 6, None)
 
         assert_array_almost_equal(
-            np.array([118.5, 283.2, 374.7, 467.9, 574.5, 762.5]),
+            np.array([117.9, 281.5, 370.8, 460.2, 566.9, 759.8]),
             bins,
             decimal=1
         )
 
+    def test_kmeans_optimal(self):
+        np.random.seed(42)
+        d = np.random.gamma(10, 40, 300)
+
+        def inertia(bins):
+            # upper edges back to the clusters
+            centers = [bins[0] * 2]
+            for edge in bins[1:]:
+                centers.append(2 * edge - centers[-1])
+            bounds = (np.array(centers[:-1]) + centers[1:]) / 2
+            labels = np.searchsorted(bounds, d)
+            return sum(np.sum((d[labels == i] - d[labels == i].mean())**2) for i in range(len(bins)))
+
+        # deterministic and at least as good as any start of Lloyd's algorithm
+        from sklearn.cluster import KMeans
+        bins, _ = kmeans(d, 5, None)
+        assert_array_almost_equal(bins, kmeans(d, 5, None)[0])
+        for seed in range(5):
+            km = KMeans(n_clusters=5, n_init=1, random_state=seed).fit(d.reshape(-1, 1))
+            self.assertLessEqual(inertia(bins), km.inertia_ + 1e-6)
+
+    def test_ward_sklearn(self):
+        from sklearn.cluster import AgglomerativeClustering
+        np.random.seed(42)
+        d = np.random.gamma(10, 40, 400)
+
+        bins, _ = ward(d, 5, None)
+        w = AgglomerativeClustering(linkage='ward', n_clusters=5).fit(d.reshape(-1, 1))
+        centers = np.sort([np.mean(d[w.labels_ == i]) for i in range(5)])
+        expected = (np.concatenate(([0], centers[:-1])) + centers) / 2
+        assert_array_almost_equal(bins, expected)
+
+        # weighted histogram bins are clustered like repeated distances
+        hist = DistanceHistogram(d, resolution=200)
+        centers, counts = hist.weighted()
+        assert_array_almost_equal(
+            ward(hist, 5, None)[0], ward(np.repeat(centers, counts), 5, None)[0]
+        )
+        assert_array_almost_equal(
+            kmeans(hist, 5, None)[0], kmeans(np.repeat(centers, counts), 5, None)[0]
+        )
+
     def test_ward(self):
         np.random.seed(1312)
         bins, _ = ward(np.random.gamma(10, 40, 500), 6, None)
@@ -156,6 +241,27 @@ class TestClusteringBins(unittest.TestCase):
             decimal=1
         )
 
+    def test_stable_entropy_loss(self):
+        np.random.seed(42)
+        d = np.random.gamma(3, 40, 2000)
+        bins = np.histogram_bin_edges(d[d <= 200], bins='sqrt')
+
+        # reference loss by masking the distances of each lag class
+        def loss(edges):
+            h = np.ones(len(edges) - 1) * 9999
+            for i, (l, u) in enumerate(zip(edges, edges[1:])):
+                x = d[(d >= l) & (d < u) & (d <= 200)]
+                if len(x) > 0:
+                    h[i] = shannon_entropy(x, bins)
+            return np.sum(np.abs(np.diff(h)))
+
+        from scipy.optimize import minimize
+        initial_guess = np.linspace(0, np.max(d[d <= 200]), 7)[1:]
+        res = minimize(loss, initial_guess, method='Nelder-Mead', options=dict(maxiter=5000))
+
+        edges, _ = stable_entropy_lags(d, 6, 200)
+        assert_array_almost_equal(edges, res.x)
+
 
 if __name__ == '__main__':
     unittest.main()
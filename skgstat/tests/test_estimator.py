@@ -4,9 +4,14 @@
 import unittest
 
 import numpy as np
+from numpy.testing import assert_array_almost_equal
+from scipy.special import binom
 
 from skgstat.estimators import matheron, cressie, dowd, genton
 from skgstat.estimators import minmax, percentile, entropy
+from skgstat.estimators import matheron_grouped, cressie_grouped
+from skgstat.estimators import MatheronAccumulator, CressieAccumulator
+from skgstat.estimators import dowd_grouped, percentile_grouped, minmax_grouped
 
 
 class TestEstimator(unittest.TestCase):
@@ -48,6 +53,68 @@ class TestEstimator(unittest.TestCase):
 
         self.assertTrue(np.isnan(e(np.array([]))))
 
+    def test_grouped_kernels(self):
+        np.random.seed(42)
+        x = np.random.gamma(10, 4, 1000)
+        groups = np.random.randint(-1, 4, 1000)
+        groups[groups == 3] = -1
+
+        for e, grouped in ((matheron, matheron_grouped), (cressie, cressie_grouped)):
+            # the last group is empty
+            result = grouped(x, groups, 4)
+            self.assertTrue(np.isnan(result[3]))
+            for i in range(3):
+                self.assertAlmostEqual(result[i], e.py_func(x[groups == i]), places=6)
+
+        self.assertIs(matheron.grouped, matheron_grouped)
+
+    def test_accumulator_merge(self):
+        np.random.seed(42)
+        x = np.random.gamma(10, 4, 1000)
+        groups = np.random.randint(-1, 3, 1000)
+
+        for Acc, grouped in ((MatheronAccumulator, matheron_grouped), (CressieAccumulator, cressie_grouped)):
+            a = Acc(3).update(x[:400], groups[:400])
+            b = Acc(3).update(x[400:], groups[400:])
+            np.testing.assert_array_almost_equal(
+                a.merge(b).finalize(), grouped(x, groups, 3)
+            )
+
+    def test_grouped_quantile_kernels(self):
+        np.random.seed(1306)
+        x = np.round(np.random.gamma(4, 2, 2000), 1)
+        groups = np.random.randint(-1, 5, 2000)
+
+        d = dowd_grouped(x, groups, 5)
+        p = percentile_grouped(x, groups, 5, p=33)
+        m = minmax_grouped(x, groups, 5)
+        for i in range(5):
+            self.assertEqual(d[i], dowd(x[groups == i]))
+            self.assertEqual(p[i], percentile(x[groups == i], p=33))
+            self.assertAlmostEqual(m[i], minmax(x[groups == i]), places=10)
+
+    def test_grouped_kernels_empty_groups(self):
+        assert_array_almost_equal(
+            minmax_grouped([1, 2, 3, 4, 5], [0, 0, 0, 1, 1], 3),
+            [1, 2 / 9, np.nan]
+        )
+
+        # empty leading, middle and trailing groups
+        np.random.seed(42)
+        x = np.random.gamma(4, 2, 500)
+        groups = np.random.choice([-1, 1, 2, 4, 5], 500)
+
+        d = dowd_grouped(x, groups, 8)
+        p = percentile_grouped(x, groups, 8, p=75)
+        m = minmax_grouped(x, groups, 8)
+        for i in range(8):
+            if not np.any(groups == i):
+                self.assertTrue(np.isnan(d[i]) and np.isnan(p[i]) and np.isnan(m[i]))
+                continue
+            self.assertAlmostEqual(d[i], dowd(x[groups == i]), places=10)
+            self.assertAlmostEqual(p[i], percentile(x[groups == i], p=75), places=10)
+            self.assertAlmostEqual(m[i], minmax(x[groups == i]), places=10)
+
     def test_dowd(self):
         np.random.seed(1306)
         x1 = np.random.weibull(14, 1000)
@@ -70,6 +137,16 @@ class TestEstimator(unittest.TestCase):
         self.assertAlmostEqual(e(x1), 0.0089969, places=7)
         self.assertAlmostEqual(e(x2), 0.0364393, places=7)
 
+    def test_genton_pairwise_selection(self):
+        np.random.seed(42)
+        for x in (np.random.gamma(40, 2, 37), np.round(np.random.normal(0, 1, 120), 1)):
+            n = x.size
+            i, j = np.triu_indices(n, k=1)
+            k, q = binom(n / 2 + 1, 2), binom(n, 2)
+            expected = 0.5 * np.power(2.219 * np.percentile(np.abs(x[i] - x[j]), k / q), 2)
+
+            self.assertEqual(genton.py_func(x), expected)
+
     def test_genton_nan(self):
         # extract actual estimator
         e = genton.py_func
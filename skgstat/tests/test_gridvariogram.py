@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+from skgstat import GridVariogram, Variogram
+
+
+class TestGridVariogram(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(1306)
+        self.a = np.random.normal(0, 1, (30, 25)).cumsum(axis=0)
+        self.a[3, 4] = np.nan
+        self.mask = np.zeros(self.a.shape, dtype=bool)
+        self.mask[10:12, 5:9] = True
+        self.spacing = (2., 1.5)
+
+    def point_variogram(self, **kwargs):
+        valid = np.isfinite(self.a) & ~self.mask
+        c = np.argwhere(valid) * np.asarray(self.spacing)
+        return Variogram(c, self.a[valid], **kwargs)
+
+    def test_same_as_variogram(self):
+        for kwargs in (dict(), dict(maxlag=15), dict(maxlag='median', bin_func='uniform')):
+            G = GridVariogram(self.a, spacing=self.spacing, mask=self.mask, **kwargs)
+            V = self.point_variogram(**kwargs)
+
+            assert_array_almost_equal(G.bins, V.bins)
+            assert_array_almost_equal(G.experimental, V.experimental)
+            assert_array_almost_equal(G.parameters, V.parameters, decimal=3)
+
+    def test_pair_counts(self):
+        G = GridVariogram(self.a, spacing=self.spacing, mask=self.mask)
+        n = np.sum(np.isfinite(self.a) & ~self.mask)
+
+        self.assertEqual(G.pair_counts.sum(), n * (n - 1) // 2)
+        self.assertEqual(len(G.pair_counts), len(G.distance))
+
+    def test_set_values_mask(self):
+        G = GridVariogram(self.a, spacing=self.spacing, mask=self.mask)
+        bins = G.bins
+
+        # fill the missing cell and drop the last row
+        a = np.random.normal(0, 1, self.a.shape).cumsum(axis=1)
+        a[-1, :] = np.nan
+        G.set_values(a)
+        self.a = a
+        V = self.point_variogram()
+
+        self.assertEqual(G.pair_counts.sum(), len(V.distance))
+        self.assertFalse(np.allclose(G.bins, bins))
+        assert_array_almost_equal(G.bins, V.bins)
+        assert_array_almost_equal(G.experimental, V.experimental)
+
+    def test_one_dimensional(self):
+        a = np.random.normal(0, 1, 50).cumsum()
+        G = GridVariogram(a)
+        V = Variogram(np.arange(50), a)
+
+        assert_array_almost_equal(G.experimental, V.experimental)
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            GridVariogram(self.a, estimator='cressie')
+
+        with self.assertRaises(ValueError):
+            GridVariogram(self.a, bin_func='kmeans')
+
+        with self.assertRaises(ValueError):
+            GridVariogram(self.a, mask=self.mask[:10])
+
+        G = GridVariogram(self.a)
+        with self.assertRaises(NotImplementedError):
+            G.lag_classes()
+        with self.assertRaises(NotImplementedError):
+            G.scattergram(show=False)
+        with self.assertRaises(NotImplementedError):
+            G.distance_difference_plot(show=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -93,9 +93,11 @@ class TestVariogramEstimator(unittest.TestCase):
 
         gs = gs.fit(self.c, self.v)
 
-        # Python 3.6 yields 'exponential', 
-        # while 3.7, 3.8 yield 'gaussian' - this is so stupid
-        self.assertTrue(gs.best_params_['model'] in ['gaussian', 'exponential'])
+        # the data has no spatial structure, all models fit the same
+        # variance and the tie picks the first model
+        scores = gs.cv_results_['mean_test_score']
+        assert_array_almost_equal(scores, [scores[0]] * 4, decimal=6)
+        self.assertEqual(gs.best_params_['model'], 'spherical')
 
     def test_find_best_model_future_cv(self):
         """
@@ -113,7 +115,9 @@ class TestVariogramEstimator(unittest.TestCase):
 
         gs = gs.fit(self.c, self.v)
 
-        self.assertEqual(gs.best_params_['model'], 'exponential')
+        scores = gs.cv_results_['mean_test_score']
+        assert_array_almost_equal(scores, [scores[0]] * 4, decimal=6)
+        self.assertEqual(gs.best_params_['model'], 'spherical')
 
     def test_cross_validation_option(self):
         # this test does not support python < 3.8
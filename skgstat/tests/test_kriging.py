@@ -30,6 +30,20 @@ class TestKrigingInstantiation(unittest.TestCase):
         # two instances should be removed
         self.assertEqual(len(ok.coords), 50 - 2)
 
+    def test_no_copy(self):
+        V = Variogram(self.c, self.v, model='gaussian', normalize=False, copy=False)
+        ok = OrdinaryKriging(V, copy=False)
+
+        self.assertTrue(np.shares_memory(ok.coords.coords, self.c))
+        self.assertTrue(np.shares_memory(ok.values, self.v))
+        self.assertFalse(ok.values.flags.writeable)
+        self.assertTrue(self.v.flags.writeable)
+
+        # the default copies the inputs
+        ok = OrdinaryKriging(self.V)
+        self.assertFalse(np.shares_memory(ok.coords.coords, self.c))
+        self.assertFalse(np.shares_memory(ok.values, self.v))
+
     def test_min_points_type_check(self):
         with self.assertRaises(ValueError) as e:
             OrdinaryKriging(self.V, min_points=4.0)
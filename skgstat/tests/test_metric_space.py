@@ -1,6 +1,12 @@
+import tracemalloc
+
 import pytest
 import numpy as np
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+from scipy import sparse
+from scipy.spatial.distance import pdist, cdist, squareform
 import skgstat as skg
+from skgstat.MetricSpace import ProbabalisticMetricSpace, tree_supported
 
 # produce a random dataset
 np.random.seed(42)
@@ -46,12 +52,32 @@ def test_unkonwn_metric():
         assert 'Unknown Distance Metric:' in e.value
 
 
-def test_tree_non_euklidean():
+def test_tree_unsupported_metric():
     with pytest.raises(ValueError) as e:
-        ms = skg.MetricSpace(rcoords, 'cityblock')
+        ms = skg.MetricSpace(rcoords, lambda u, v: np.sum(np.abs(u - v)))
         ms.tree
 
-        assert 'can only be constructed' in e.value
+        assert 'can not be constructed' in e.value
+
+
+@pytest.mark.parametrize('metric', ['cityblock', 'chebyshev', 'canberra'])
+def test_sparse_non_euclidean(metric):
+    ms = skg.MetricSpace(rcoords, metric, max_dist=50)
+    d = squareform(pdist(rcoords, metric))
+    d[d > 50] = 0
+
+    assert isinstance(ms.dists, sparse.spmatrix)
+    assert_array_almost_equal(ms.dists.toarray(), d)
+
+
+def test_parametric_metric_maxlag():
+    # the variances of seuclidean need all points, thus there is no tree
+    assert not tree_supported('seuclidean')
+    assert not tree_supported('mahalanobis')
+
+    V = skg.Variogram(rcoords, rvals, dist_func='seuclidean', maxlag=2)
+    d = pdist(rcoords, 'seuclidean')
+    assert_array_almost_equal(np.sort(V.distance[V.distance <= 2]), np.sort(d[d <= 2]))
 
 
 def test_metric_pair_metrix():
@@ -76,3 +102,274 @@ def test_metric_pair_max_dist():
         skg.MetricSpacePair(ms1, ms2)
 
         assert 'same max_dist' in e.value
+
+
+def test_tiled_condensed_dists():
+    ms = skg.MetricSpace(rcoords, max_memory=500 * 32 * 7)
+    dense = skg.MetricSpace(rcoords)
+
+    assert ms.tiled
+    assert_array_almost_equal(ms.pairs.d, squareform(dense.dists))
+
+
+def test_pair_list_dense():
+    ms = skg.MetricSpace(rcoords)
+    pairs = ms.pairs
+
+    assert pairs.implicit
+    assert pairs.i.dtype == np.int32
+    assert_array_almost_equal(pairs.d, pdist(rcoords))
+    assert_array_almost_equal(
+        pairs.d, np.sqrt(np.sum((rcoords[pairs.i] - rcoords[pairs.j])**2, axis=1))
+    )
+    assert_array_almost_equal(pairs.diff(rvals), np.abs(rvals[pairs.i] - rvals[pairs.j]))
+
+
+@pytest.mark.parametrize('max_memory', [None, 1e5])
+def test_pair_list_sparse(max_memory):
+    ms = skg.MetricSpace(rcoords, max_dist=100, max_memory=max_memory)
+    d = pdist(rcoords)
+    i, j = np.triu_indices(len(rcoords), k=1)
+    within = d <= 100
+
+    assert not ms.pairs.implicit
+    assert ms.pairs.i.dtype == np.int32
+    assert_array_equal(ms.pairs.i, i[within])
+    assert_array_equal(ms.pairs.j, j[within])
+    assert_array_almost_equal(ms.pairs.d, d[within])
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(),
+    dict(max_dist=100),
+    dict(max_dist=100, max_memory=1e5),
+    dict(dist_metric='cityblock', max_dist=100),
+    dict(max_dist=100, index='grid'),
+])
+def test_append(kwargs):
+    ms = skg.MetricSpace(rcoords[:400], **kwargs)
+    ms.pairs
+    ms.append(rcoords[400:450])
+    ms.append(rcoords[450:])
+    full = skg.MetricSpace(rcoords, **kwargs)
+
+    assert len(ms) == len(rcoords)
+    assert ms.pairs.implicit == full.pairs.implicit
+    assert_array_equal(ms.pairs.i, full.pairs.i)
+    assert_array_equal(ms.pairs.j, full.pairs.j)
+    assert_array_almost_equal(ms.pairs.d, full.pairs.d)
+
+
+@pytest.mark.parametrize('kwargs', [dict(), dict(max_dist=100), dict(max_memory=1e5)])
+def test_float32_pairs(kwargs):
+    ms = skg.MetricSpace(rcoords, dtype=np.float32, **kwargs)
+    ms64 = skg.MetricSpace(rcoords, **kwargs)
+
+    assert ms.pairs.d.dtype == np.float32
+    assert ms.pairs.diff(rvals).dtype == np.float32
+    assert_array_almost_equal(ms.pairs.d, ms64.pairs.d, decimal=4)
+
+    with pytest.raises(ValueError):
+        skg.MetricSpace(rcoords, dtype=int)
+
+
+def test_float32_peak_memory():
+    np.random.seed(42)
+    coords = np.random.random((3000, 2))
+    n_pairs = 3000 * 2999 // 2
+
+    tracemalloc.start()
+    ms = skg.MetricSpace(coords, dtype=np.float32)
+    ms.pairs
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # the double precision distances are never held at once
+    assert peak < 0.75 * 8 * n_pairs
+    assert_array_almost_equal(ms.pairs.d, pdist(coords), decimal=6)
+
+
+@pytest.mark.parametrize('kwargs', [
+    dict(), dict(max_dist=100), dict(dist_metric='cityblock'),
+    dict(max_dist=100, index='grid'), dict(max_dist=100, dist_metric='canberra')
+])
+def test_iter_pairs(kwargs):
+    ms = skg.MetricSpace(rcoords, **kwargs)
+    full = skg.MetricSpace(rcoords, **kwargs).pairs
+
+    for _ in range(2):
+        chunks = list(ms.iter_pairs(rvals, max_memory=1e5))
+        assert len(chunks) > 1
+        assert_array_almost_equal(np.concatenate([d for d, _ in chunks]), full.d)
+        assert_array_almost_equal(np.concatenate([v for _, v in chunks]), full.diff(rvals))
+
+        # from the calculated pairs
+        ms.pairs
+
+
+def test_copy():
+    c = rcoords.copy()
+    ms = skg.MetricSpace(c, copy=False)
+
+    assert np.shares_memory(ms.coords, c)
+    assert not ms.coords.flags.writeable
+    assert c.flags.writeable
+
+    ms = skg.MetricSpace(c)
+    assert not np.shares_memory(ms.coords, c)
+    assert not ms.coords.flags.writeable
+
+
+def test_tiled_sparse_non_euclidean():
+    ms = skg.MetricSpace(rcoords, 'sqeuclidean', max_dist=2000, max_memory=1e5)
+    d = squareform(pdist(rcoords, 'sqeuclidean'))
+    d[d > 2000] = 0
+
+    assert ms.tiled
+    assert isinstance(ms.dists, sparse.spmatrix)
+    assert_array_almost_equal(ms.dists.toarray(), d)
+
+
+def test_tiled_variogram():
+    V = skg.Variogram(rcoords, rvals, dist_func='sqeuclidean', maxlag=2000)
+    Vt = skg.Variogram(
+        rcoords, rvals, dist_func='sqeuclidean', maxlag=2000, max_memory=1e5
+    )
+
+    assert Vt.metric_space.tiled
+    assert_array_almost_equal(V.experimental, Vt.experimental)
+    assert_array_almost_equal(V.parameters, Vt.parameters)
+
+
+@pytest.mark.parametrize('metric', ['euclidean', 'cityblock'])
+def test_find_closest_batch(metric):
+    c1 = np.random.gamma(100, 4, (50, 2))
+    pair = skg.MetricSpacePair(
+        skg.MetricSpace(c1, metric),
+        skg.MetricSpace(rcoords, metric)
+    )
+    ridx, dists = pair.find_closest_batch(np.arange(50), 30, 10)
+
+    assert ridx.shape == (50, 10)
+    for idx in range(50):
+        found = ridx[idx][ridx[idx] < len(rcoords)]
+        assert set(found) == set(pair.find_closest(idx, 30, 10))
+        assert np.all(np.isinf(dists[idx][len(found):]))
+
+
+@pytest.mark.parametrize('metric', ['euclidean', 'cityblock', 'chebyshev'])
+def test_grid_pairs(metric):
+    ms = skg.MetricSpace(rcoords, metric, max_dist=100, index='grid')
+    tree = skg.MetricSpace(rcoords, metric, max_dist=100)
+
+    assert_array_equal(ms.pairs.i, tree.pairs.i)
+    assert_array_equal(ms.pairs.j, tree.pairs.j)
+    assert_array_almost_equal(ms.pairs.d, tree.pairs.d)
+    assert_array_almost_equal(ms.dists.toarray(), tree.dists.toarray())
+
+
+def test_grid_metric_pair():
+    c1 = np.random.gamma(100, 4, (50, 2))
+    pair = skg.MetricSpacePair(
+        skg.MetricSpace(c1, max_dist=30),
+        skg.MetricSpace(rcoords, max_dist=30, index='grid')
+    )
+    d = cdist(c1, rcoords)
+    d[d > 30] = 0
+    assert_array_almost_equal(pair.dists.toarray(), d)
+
+    ridx, dists = pair.find_closest_batch(np.arange(50), 30, 10)
+    for idx in range(50):
+        found = ridx[idx][ridx[idx] < len(rcoords)]
+        assert set(found) == set(pair.find_closest(idx, 30, 10))
+        assert_array_almost_equal(dists[idx][:len(found)], d[idx, found])
+
+
+def test_grid_unsupported_metric():
+    with pytest.raises(ValueError):
+        skg.MetricSpace(rcoords, 'cosine', index='grid')
+
+    with pytest.raises(ValueError):
+        skg.MetricSpace(rcoords, index='octree')
+
+
+def test_great_circle_dists():
+    lonlat = np.array([[0, 0], [0, 90], [90, 0], [13.4, 52.5], [2.35, 48.86]])
+    d = squareform(skg.MetricSpace(lonlat, 'great_circle').dists)
+
+    # quarter circles on the sphere and Berlin - Paris
+    r = 6371.0088
+    assert_array_almost_equal(d[[0, 1, 4]], [r * np.pi / 2] * 3)
+    assert np.abs(d[-1] - 878) < 2
+
+
+def test_great_circle_sparse():
+    rng = np.random.default_rng(42)
+    lonlat = np.column_stack((rng.uniform(5, 15, 300), rng.uniform(45, 55, 300)))
+    ms = skg.MetricSpace(lonlat, 'great_circle', max_dist=200)
+    d = skg.MetricSpace(lonlat, 'great_circle').dists
+    d[d > 200] = 0
+
+    assert isinstance(ms.dists, sparse.spmatrix)
+    assert_array_almost_equal(ms.dists.toarray(), d)
+
+    # variogram and nearest neighbors on the sphere
+    V = skg.Variogram(ms, rng.normal(10, 2, 300), dist_func='great_circle')
+    assert V.bins.max() <= 200
+
+    pair = skg.MetricSpacePair(
+        skg.MetricSpace(lonlat[:10], 'great_circle', max_dist=200),
+        ms
+    )
+    ridx, dists = pair.find_closest_batch(np.arange(10), 200, 5)
+    assert_array_almost_equal(dists[:, 0], np.zeros(10))
+    assert np.all(dists[np.isfinite(dists)] <= 200)
+
+
+@pytest.mark.parametrize('sampling', ['uniform', 'stratified'])
+def test_direct_pair_sampling(sampling):
+    ms = ProbabalisticMetricSpace(
+        rcoords, samples=100, rnd=42, sampling=sampling
+    )
+    pairs = ms.pairs
+    n = len(rcoords)
+
+    # unique pairs in pdist order
+    k = n * pairs.i.astype(int) - pairs.i * (pairs.i + 1) // 2 + pairs.j - pairs.i - 1
+    assert np.all(np.diff(k) > 0)
+    assert np.all(pairs.i < pairs.j)
+    assert_array_almost_equal(pairs.d, pdist(rcoords)[k])
+
+    if sampling == 'uniform':
+        assert len(pairs) == ms.pair_count
+
+
+@pytest.mark.parametrize('max_dist', [None, 20])
+def test_stratified_sampling_memory(max_dist):
+    np.random.seed(0)
+    coords = np.random.random((5000, 2)) * 100
+    ms = ProbabalisticMetricSpace(
+        coords, max_dist=max_dist, samples=200, rnd=42, sampling='stratified'
+    )
+
+    tracemalloc.start()
+    ms.pairs
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # bounded by the draws of one round, not by all 12.5 million pairs
+    assert peak < 20e6
+    assert len(ms.pairs) > 0.75 * ms.pair_count
+
+
+def test_direct_pair_sampling_max_dist():
+    ms = ProbabalisticMetricSpace(
+        rcoords, max_dist=100, samples=100, rnd=42, sampling='uniform'
+    )
+
+    assert len(ms.pairs) == ms.pair_count
+    assert ms.pairs.d.max() <= 100
+
+    # all pairs are drawn, if samples covers all points
+    ms = ProbabalisticMetricSpace(rcoords[:50], samples=50, rnd=42, sampling='uniform')
+    assert_array_almost_equal(ms.pairs.d, pdist(rcoords[:50]))
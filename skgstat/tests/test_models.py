@@ -8,7 +8,7 @@ from numpy.testing import assert_array_almost_equal
 
 from skgstat.models import spherical, exponential
 from skgstat.models import gaussian, cubic, stable, matern
-from skgstat.models import variogram
+from skgstat.models import variogram, vectorized
 
 
 class TestModels(unittest.TestCase):
@@ -167,6 +167,58 @@ class TestModels(unittest.TestCase):
         assert_array_almost_equal(result, model, decimal=2)
 
 
+class TestVectorizedModels(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        self.h = np.random.uniform(0, 150, size=(40, 40))
+        self.h[0, :5] = 0
+
+    def test_models_match_scalar(self):
+        for model, args in [
+            (spherical, (50, 10, 2)), (exponential, (50, 10, 2)),
+            (gaussian, (50, 10, 2)), (cubic, (50, 10, 2)),
+            (stable, (50, 10, 0.5, 2)), (matern, (50, 10, 1.5, 2))
+        ]:
+            gamma = model(self.h, *args)
+
+            # the shape of the lags is kept
+            self.assertEqual(gamma.shape, self.h.shape)
+            assert_array_almost_equal(gamma[0, :5], 2.)
+
+            scalar = [model.py_func(h, *args) for h in self.h.flat]
+            assert_array_almost_equal(gamma.ravel(), scalar, decimal=10)
+
+    def test_scalar_lag(self):
+        self.assertIsInstance(spherical(10, 50, 10), float)
+        self.assertIsInstance(matern(0, 50, 10, 1.5, 2), float)
+        self.assertEqual(stable(0., 50, 10, 0.1, 3), 3)
+
+    def test_jacobian(self):
+        h = self.h[0]
+        for model, args in [
+            (spherical, [50, 10, 2]), (exponential, [50, 10, 2]),
+            (gaussian, [50, 10, 2]), (cubic, [50, 10, 2]),
+            (stable, [50, 10, 0.5, 2]), (matern, [50, 10, 1.5, 2])
+        ]:
+            jac = model.jac(h, *args)
+            self.assertEqual(jac.shape, (h.size, len(args)))
+
+            # compare to central differences of each parameter
+            for i in range(len(args)):
+                up, down = list(args), list(args)
+                up[i] += 1e-6
+                down[i] -= 1e-6
+                diff = (model(h, *up) - model(h, *down)) / 2e-6
+                assert_array_almost_equal(jac[:, i], diff, decimal=5)
+
+    def test_list(self):
+        @vectorized
+        def linear(h, r, c0):
+            return np.minimum(h / r, 1) * c0
+
+        assert_array_almost_equal(linear([0, 5, 20], 10, 2), [0, 1, 2])
+
+
 class TestVariogramDecorator(unittest.TestCase):
     def test_scalar(self):
         @variogram
@@ -1,13 +1,19 @@
 import pytest
 import os
+import pickle
 import numpy as np
 import pandas as pd
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+from scipy.spatial import cKDTree
 
-from skgstat import Variogram
+from skgstat import Variogram, MetricSpace
 from skgstat import data
-from skgstat.util import shannon_entropy
+from skgstat.util import shannon_entropy, DistanceCache
 from skgstat.util.cross_validation import jacknife
 from skgstat.util.uncertainty import propagate
+from skgstat.util.grid import GridIndex
+from skgstat.util.sketch import QuantileSketch
+from skgstat.util.histogram import DistanceHistogram
 
 
 # read the sample data
@@ -117,4 +123,156 @@ def test_propagate_many_targets():
     # unstack the list
     conf_exp, conf_par = conf_list
     assert conf_exp.shape == (12, 3)
-    assert conf_par.shape == (3, 3)
\ No newline at end of file
+    assert conf_par.shape == (3, 3)
+
+def test_distance_cache_dense(tmp_path):
+    c = np.random.default_rng(42).random((100, 2)) * 50
+    ms = MetricSpace(c, cache=str(tmp_path))
+    d = ms.dists
+
+    # a new MetricSpace re-opens the cached distances
+    ms2 = MetricSpace(c, cache=DistanceCache(str(tmp_path)))
+    assert_array_almost_equal(ms2.dists, d)
+    assert len(ms2.cache.entries()) == 1
+
+
+def test_distance_cache_sparse(tmp_path):
+    c = np.random.default_rng(42).random((100, 2)) * 50
+    v = np.random.default_rng(42).normal(10, 2, 100)
+    V = Variogram(MetricSpace(c, max_dist=20), v)
+
+    ms = MetricSpace(c, max_dist=20, cache=str(tmp_path))
+    ms.dists
+    V2 = Variogram(MetricSpace(c, max_dist=20, cache=str(tmp_path)), v)
+
+    # the point pairs are read-only views on the memory map
+    assert not V2.metric_space.pairs.d.flags.writeable
+    assert_array_almost_equal(V.experimental, V2.experimental)
+
+
+def test_distance_cache_eviction(tmp_path):
+    cache = DistanceCache(str(tmp_path), max_size=10000)
+    rng = np.random.default_rng(42)
+
+    # each dense entry of 40 points is larger than half the cache
+    for _ in range(3):
+        MetricSpace(rng.random((40, 2)), cache=cache).dists
+
+    assert len(cache.entries()) == 1
+    assert cache.size <= 10000
+
+
+@pytest.mark.parametrize('max_dist', [None, 20])
+def test_shared_metric_space(max_dist):
+    c = np.random.default_rng(42).random((100, 2)) * 50
+    ms = MetricSpace(c, max_dist=max_dist)
+    d = np.array(ms.pairs.d)
+    ms.share()
+
+    try:
+        assert ms.shared
+        assert not ms.pairs.d.flags.writeable
+
+        # the pickled copy attaches to the same memory
+        copy = pickle.loads(pickle.dumps(ms))
+        assert np.shares_memory(copy.pairs.d, ms.pairs.d)
+        assert_array_almost_equal(copy.coords, c)
+        assert_array_almost_equal(copy.pairs.d, d)
+        copy.unshare()
+    finally:
+        ms.unshare()
+
+    assert not ms.shared
+    assert_array_almost_equal(ms.pairs.d, d)
+
+    # the restored arrays are still read-only
+    assert not ms.coords.flags.writeable
+    assert not ms.pairs.d.flags.writeable
+    if max_dist is not None:
+        assert not ms.pairs.i.flags.writeable
+
+
+def test_propagate_shared():
+    df = get_sample()
+    V = Variogram(df[['x', 'y']].values, df.z.values, n_lags=10)
+
+    conf = propagate(V, 'values', sigma=5, evalf='parameter', num_iter=4, n_jobs=2)
+
+    assert conf.shape == (3, 3)
+    assert not V.metric_space.shared
+    assert not V.coordinates.flags.writeable
+
+
+@pytest.mark.parametrize('p', [1, 2, np.inf])
+def test_grid_index(p):
+    rng = np.random.default_rng(42)
+    c = rng.random((300, 2)) * 100
+    q = rng.random((40, 2)) * 120 - 10
+    grid = GridIndex(c, cell_size=10, p=p)
+    tree = cKDTree(c)
+
+    # self pairs
+    i, j, d = grid.query_pairs(10)
+    assert np.all(i < j)
+    assert set(zip(i, j)) == tree.query_pairs(10, p=p)
+    assert_array_almost_equal(d, np.linalg.norm(c[i] - c[j], ord=p, axis=1))
+
+    # cross pairs
+    i, j, _ = grid.query_pairs(15, coords=q)
+    expected = [(a, b) for a, nb in enumerate(tree.query_ball_point(q, 15, p=p)) for b in nb]
+    assert set(zip(i, j)) == set(expected)
+
+    # nearest neighbors
+    for bound in (np.inf, 8):
+        d, idx = grid.query(q, k=5, distance_upper_bound=bound)
+        td, tidx = tree.query(q, k=5, p=p, distance_upper_bound=bound)
+        assert_array_almost_equal(d, td)
+        assert_array_equal(idx[np.isfinite(d)], tidx[np.isfinite(td)])
+
+
+def test_quantile_sketch():
+    rng = np.random.default_rng(42)
+    x = rng.gamma(3, 10, 100000)
+    q = np.linspace(0, 1, 21)
+
+    # exact for small streams
+    small = QuantileSketch.from_chunks(np.array_split(x[:1000], 3))
+    assert_array_equal(small.quantile(q), np.quantile(x[:1000], q))
+    assert_array_equal(small.quantile(q, upper=30), np.quantile(x[:1000][x[:1000] <= 30], q))
+
+    # bounded rank error and memory for large streams
+    sketch = QuantileSketch(k=1024)
+    for chunk in np.array_split(x, 10):
+        sketch.update(chunk)
+    ranks = np.searchsorted(np.sort(x), sketch.quantile(q)) / x.size
+    assert np.max(np.abs(ranks - q)) < 0.01
+    assert sum(b.size for b in sketch._levels) < 3 * 1024
+    assert sketch.count == x.size
+    assert sketch.max == x.max() and sketch.quantile(1.) == x.max()
+    assert np.isclose(sketch.mean, x.mean())
+
+    # merged sketches
+    a = QuantileSketch.from_chunks([x[:50000]], k=1024)
+    a.merge(QuantileSketch.from_chunks([x[50000:]], k=1024))
+    assert a.count == x.size
+    assert np.abs(a.rank(np.median(x)) / x.size - 0.5) < 0.01
+
+
+def test_distance_histogram():
+    rng = np.random.default_rng(42)
+    x = rng.gamma(3, 10, 100000)
+    q = np.linspace(0, 1, 21)
+    h = DistanceHistogram(x, resolution=1000)
+    width = h.edges[1] - h.edges[0]
+
+    # quantiles are accurate to one bin width
+    assert np.max(np.abs(h.quantile(q) - np.quantile(x, q))) < width
+    assert np.max(np.abs(h.quantile(q, upper=30) - np.quantile(x[x <= 30], q))) < width
+    assert h.quantile(0.) == x.min() and h.quantile(1.) == x.max()
+    assert np.abs(h.rank(30) - np.sum(x <= 30)) <= h.counts.max()
+
+    values, weights = h.weighted(upper=30)
+    assert weights.sum() == np.sum(x < h.edges[np.searchsorted(h.edges, 30)])
+    assert np.isclose(h.mean, x.mean())
+    assert np.abs(h.std() - x.std()) < width
+
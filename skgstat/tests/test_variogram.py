@@ -667,6 +667,33 @@ class TestVariogramFittingProcedure(unittest.TestCase):
             V.parameters, [162.3, 0.5, 0.8], decimal=1
         )
 
+    def test_fit_jacobian(self):
+        df = pd.read_csv(os.path.dirname(__file__) + '/sample.csv')
+        for model in ('spherical', 'stable', 'matern'):
+            for use_nugget in (True, False):
+                V = Variogram(
+                    df[['x', 'y']], df.z.values, model=model,
+                    use_nugget=use_nugget, n_lags=8
+                )
+                cof = V.cof
+
+                # finite differences instead of the analytic Jacobian
+                V.fit(jac='2-point')
+                assert_array_almost_equal(cof, V.cof, decimal=3)
+
+    def test_fit_jacobian_lm(self):
+        np.random.seed(0)
+        c = np.random.rand(120, 2) * 100
+        v = np.sin(c.sum(axis=1) / 20) + np.random.normal(0, 0.1, 120)
+
+        for model in ('spherical', 'exponential', 'gaussian', 'cubic', 'stable', 'matern'):
+            V = Variogram(c, v, model=model, fit_method='lm')
+            rmse = V.rmse
+
+            # finite differences converge to the same fit
+            V.fit(jac=None)
+            self.assertAlmostEqual(rmse, V.rmse, places=4)
+
     def test_fitted_model(self):
         self.V._fit_method = 'trf'
         self.V.fit_sigma = None
@@ -955,6 +982,146 @@ class TestVariogramMethods(unittest.TestCase):
         assert_array_almost_equal(copy.experimental, self.V.experimental)
         assert_array_almost_equal(copy.bins, self.V.bins)
 
+    def test_append(self):
+        V = Variogram(self.c[:20], self.v[:20], normalize=False, n_lags=10)
+        V.append(self.c[20:], self.v[20:])
+
+        assert_array_almost_equal(V.bins, self.V.bins)
+        assert_array_almost_equal(V.experimental, self.V.experimental)
+        assert_array_almost_equal(V.parameters, self.V.parameters)
+
+    def test_append_sparse(self):
+        V = Variogram(self.c, self.v, maxlag=20)
+        V2 = Variogram(self.c[:20], self.v[:20], maxlag=20)
+        V2.append(self.c[20:], self.v[20:])
+
+        assert_array_almost_equal(V.distance, V2.distance)
+        assert_array_almost_equal(V.experimental, V2.experimental)
+
+    def test_float32(self):
+        V = Variogram(self.c, self.v, normalize=False, n_lags=10, dtype=np.float32)
+
+        self.assertEqual(V.distance.dtype, np.float32)
+        self.assertEqual(V._diff.dtype, np.float32)
+        assert_array_almost_equal(V.experimental, self.V.experimental, decimal=4)
+
+    def test_streaming(self):
+        for kwargs in (dict(), dict(maxlag=40), dict(estimator='cressie', maxlag=0.5)):
+            V = Variogram(self.c, self.v, n_lags=10, **kwargs)
+            S = Variogram(self.c, self.v, n_lags=10, streaming=True, max_memory=1e4, **kwargs)
+
+            assert_array_almost_equal(S.experimental, V.experimental)
+            assert_array_almost_equal(S.parameters, V.parameters)
+            self.assertIsNone(S._diff)
+
+        # quantile based binning and maxlag from the distance sketch
+        for kwargs in (dict(bin_func='uniform'), dict(bin_func='fd', maxlag='median')):
+            V = Variogram(self.c, self.v, n_lags=10, **kwargs)
+            S = Variogram(self.c, self.v, n_lags=10, streaming=True, **kwargs)
+
+            assert_array_almost_equal(S.bins, V.bins)
+            assert_array_almost_equal(S.experimental, V.experimental)
+            self.assertIsNone(S._X._dists)
+
+        # the neighbors within maxlag are searched in the tree or grid
+        for kwargs in (dict(), dict(spatial_index='grid'), dict(dist_func='canberra')):
+            V = Variogram(self.c, self.v, n_lags=10, maxlag=40, **kwargs)
+            S = Variogram(self.c, self.v, n_lags=10, maxlag=40, streaming=True, max_memory=1e4, **kwargs)
+
+            assert_array_almost_equal(S.experimental, V.experimental)
+            self.assertIsNone(S._X._pairs)
+
+        # estimators without accumulator fall back to the stored differences
+        S = Variogram(self.c, self.v, n_lags=10, estimator='dowd', streaming=True)
+        V = Variogram(self.c, self.v, n_lags=10, estimator='dowd')
+        assert_array_almost_equal(S.experimental, V.experimental)
+
+    def test_lag_classes(self):
+        V = Variogram(self.c, self.v, n_lags=12, maxlag=40)
+        groups = V.lag_groups()
+
+        for i, lag_class in enumerate(V.lag_classes()):
+            assert_array_almost_equal(lag_class, V._diff[groups == i])
+
+        # regrouping after an edge change
+        V.bins = [5, 10, 20]
+        groups = V.lag_groups()
+        self.assertEqual(groups.max(), 2)
+        self.assertEqual(
+            [len(lc) for lc in V.lag_classes()],
+            [np.sum(groups == i) for i in range(3)]
+        )
+
+    def test_no_copy(self):
+        V = Variogram(self.c, self.v, n_lags=10, copy=False)
+
+        self.assertTrue(np.shares_memory(V.coordinates, self.c))
+        self.assertTrue(np.shares_memory(V.values, self.v))
+        self.assertFalse(V.values.flags.writeable)
+        assert_array_almost_equal(V.experimental, Variogram(self.c, self.v, n_lags=10).experimental)
+
+    def test_cache(self):
+        V = Variogram(self.c, self.v, n_lags=10)
+        V.clear_cache()
+
+        exp = V.experimental
+        V.rmse, V.residuals, V.describe()
+        info = V.cache_info
+        self.assertEqual(info['experimental']['misses'], 1)
+        self.assertGreater(info['experimental']['hits'], 2)
+        self.assertEqual(info['deviations']['misses'], 1)
+
+        # the cached array is not handed out
+        exp[:] = -1
+        self.assertTrue(np.all(V.experimental >= 0))
+
+        # each setter invalidates the cache
+        for attr, value in (('estimator', 'cressie'), ('n_lags', 8), ('maxlag', 30)):
+            setattr(V, attr, value)
+            self.assertNotIn('experimental', V._cache)
+            ref = Variogram(self.c, self.v, n_lags=V.n_lags, estimator=V.estimator, maxlag=V.maxlag)
+            assert_array_almost_equal(V.experimental, ref.experimental)
+            assert_array_almost_equal(V.parameters, ref.parameters)
+
+        # the model only invalidates the deviations
+        V.model = 'exponential'
+        self.assertIn('experimental', V._cache)
+        self.assertNotIn('deviations', V._cache)
+
+        # switched off cache
+        V._cache_experimental = False
+        misses = V.cache_info['experimental']['misses']
+        V.experimental, V.experimental
+        self.assertEqual(V.cache_info['experimental']['misses'], misses + 2)
+
+    def test_binning_resolution(self):
+        np.random.seed(1)
+        c = np.random.gamma(10, 4, (200, 2))
+        v = np.random.normal(10, 4, 200)
+
+        for bin_func in ('uniform', 'fd', 'kmeans'):
+            V = Variogram(c, v, n_lags=6, bin_func=bin_func, maxlag=40)
+            H = Variogram(c, v, n_lags=6, bin_func=bin_func, maxlag=40, binning_resolution=5000)
+
+            self.assertEqual(H.cache_info['histogram']['misses'], 1)
+            self.assertEqual(len(H.bins), len(V.bins))
+            assert_array_almost_equal(H.bins, V.bins, decimal=0)
+
+        # exact fallback for few distances
+        H = Variogram(self.c, self.v, n_lags=6, bin_func='uniform', binning_resolution=5000)
+        assert_array_almost_equal(H.bins, Variogram(self.c, self.v, n_lags=6, bin_func='uniform').bins)
+        self.assertNotIn('histogram', H.cache_info)
+
+    def test_grid_index(self):
+        V = Variogram(self.c, self.v, normalize=False, n_lags=10, maxlag=30)
+        V2 = Variogram(
+            self.c, self.v, normalize=False, n_lags=10, maxlag=30, spatial_index='grid'
+        )
+
+        self.assertEqual(V2.metric_space.index, 'grid')
+        assert_array_almost_equal(V.distance, V2.distance)
+        assert_array_almost_equal(V.experimental, V2.experimental)
+
     def test_data_no_force(self):
         lags, var = self.V.data(n=10, force=False)
 
@@ -1316,6 +1483,22 @@ class TestSampling(unittest.TestCase):
             self.assertAlmostEqual(Vf["effective_range"], Vs["effective_range"], delta = Vf["effective_range"] / 5)
             self.assertAlmostEqual(Vf["sill"], Vs["sill"], delta = Vf["sill"] / 5)
 
+
+    def test_direct_samples(self):
+        Vf = Variogram(
+            self.data[['x', 'y']].values,
+            self.data.z.values,
+            binning_random_state=44).describe()
+
+        for method in ('uniform', 'stratified'):
+            Vs = Variogram(
+                self.data[['x', 'y']].values,
+                self.data.z.values, samples=0.5,
+                sampling_method=method,
+                binning_random_state=44).describe()
+
+            self.assertAlmostEqual(Vf["effective_range"], Vs["effective_range"], delta = Vf["effective_range"] / 5)
+            self.assertAlmostEqual(Vf["sill"], Vs["sill"], delta = Vf["sill"] / 5)
        
 class TestVariogramPickling(unittest.TestCase):
     def setUp(self):
@@ -1 +1,4 @@
-from .shannon import shannon_entropy
\ No newline at end of file
+from .shannon import shannon_entropy
+from .cache import DistanceCache
+from .sketch import QuantileSketch
+from .histogram import DistanceHistogram
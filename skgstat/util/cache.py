@@ -0,0 +1,166 @@
+"""
+Persistent on-disk cache for the distances calculated by a
+:class:`MetricSpace <skgstat.MetricSpace>`. The arrays are stored as
+``.npy`` files and re-opened as read-only memory maps, thus a new
+process can use the distances without copying them into memory.
+"""
+from typing import Union, Dict, Tuple
+import os
+import hashlib
+import tempfile
+
+import numpy as np
+
+
+class DistanceCache:
+    """
+    .. versionadded:: 0.6.5
+
+    Directory of cached distance arrays. Each entry is keyed by a hash
+    of the coordinates, the distance metric and the maximum distance.
+    If `max_size` is given, the least recently used entries are removed
+    whenever the cache grows larger than `max_size` bytes.
+
+    Parameters
+    ----------
+    path : str
+        Directory for the cache files. Will be created if needed.
+    max_size : int
+        Maximum size of the cache in bytes. If None (default),
+        the cache is not limited.
+
+    """
+    def __init__(self, path: str, max_size: int = None):
+        self.path = os.path.abspath(path)
+        self.max_size = max_size
+
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(coords: np.ndarray, dist_metric, max_dist=None, dtype=None) -> Union[str, None]:
+        """
+        Hash the input of a :class:`MetricSpace <skgstat.MetricSpace>`.
+        Returns None for callable distance metrics, as these
+        cannot be identified across processes.
+        """
+        if callable(dist_metric):
+            return None
+
+        coords = np.ascontiguousarray(coords)
+        h = hashlib.sha1()
+        h.update(str((coords.shape, coords.dtype.str)).encode())
+        h.update(coords.tobytes())
+        h.update(str((dist_metric, max_dist)).encode())
+        if dtype is not None and np.dtype(dtype) != np.float64:
+            h.update(np.dtype(dtype).str.encode())
+
+        return h.hexdigest()
+
+    def _file(self, key: str, name: str) -> str:
+        return os.path.join(self.path, '%s.%s.npy' % (key, name))
+
+    def load(self, key: str, names: Tuple[str]) -> Union[Dict[str, np.memmap], None]:
+        """
+        Open the arrays `names` of the entry `key` as read-only memory
+        maps. Returns None if the entry is not complete.
+        """
+        if key is None:
+            return None
+
+        fnames = [self._file(key, name) for name in names]
+        try:
+            arrays = {
+                name: np.load(fname, mmap_mode='r')
+                for name, fname in zip(names, fnames)
+            }
+        except (FileNotFoundError, ValueError):
+            return None
+
+        # mark the entry as recently used
+        for fname in fnames:
+            try:
+                os.utime(fname)
+            except FileNotFoundError:  # pragma: no cover
+                return None
+
+        return arrays
+
+    def store(self, key: str, **arrays: np.ndarray) -> Dict[str, np.memmap]:
+        """
+        Write the passed arrays to the entry `key` and evict old
+        entries if needed. Returns the stored arrays re-opened as
+        read-only memory maps.
+        """
+        if key is None:
+            return arrays
+
+        for name, arr in arrays.items():
+            # write to a temporary file first, so that concurrent
+            # processes never open a partially written array
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, np.asarray(arr))
+            os.replace(tmp, self._file(key, name))
+
+        # remove the least recently used entries
+        self.evict(keep=key)
+
+        loaded = self.load(key, tuple(arrays.keys()))
+        return loaded if loaded is not None else arrays
+
+    def entries(self) -> Dict[str, Tuple[float, int]]:
+        """
+        Return the last access time and size in bytes of all
+        entries in the cache.
+        """
+        entries = dict()
+        for fname in os.listdir(self.path):
+            if not fname.endswith('.npy'):
+                continue
+            key = fname.split('.')[0]
+            try:
+                stat = os.stat(os.path.join(self.path, fname))
+            except FileNotFoundError:  # pragma: no cover
+                continue
+            t, s = entries.get(key, (0, 0))
+            entries[key] = (max(t, stat.st_mtime), s + stat.st_size)
+
+        return entries
+
+    @property
+    def size(self) -> int:
+        """Size of the cache in bytes"""
+        return sum(s for _, s in self.entries().values())
+
+    def evict(self, keep: str = None):
+        """
+        Remove the least recently used entries until the cache is
+        smaller than `max_size`. The entry `keep` is never removed.
+        """
+        if self.max_size is None:
+            return
+
+        entries = self.entries()
+        total = sum(s for _, s in entries.values())
+
+        for key, (_, s) in sorted(entries.items(), key=lambda e: e[1][0]):
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            total -= s
+
+    def remove(self, key: str):
+        """Remove all files of the entry `key`"""
+        for fname in os.listdir(self.path):
+            if fname.startswith(key + '.') and fname.endswith('.npy'):
+                try:
+                    os.remove(os.path.join(self.path, fname))
+                except FileNotFoundError:  # pragma: no cover
+                    pass
+
+    def clear(self):
+        """Remove all entries from the cache"""
+        for key in self.entries():
+            self.remove(key)
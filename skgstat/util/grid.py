@@ -0,0 +1,271 @@
+"""
+Uniform grid spatial hash index for fixed-radius and nearest neighbor
+searches on regular or quasi-uniform point clouds. The points are
+hashed into square cells, thus each query only has to look at the
+points in the few cells around it.
+"""
+from typing import Tuple
+import itertools
+
+import numpy as np
+
+
+class GridIndex:
+    """
+    .. versionadded:: 0.6.5
+
+    Spatial hash index of points on a uniform grid of cells. The index
+    supports Minkowski p-norm distances, as these are never shorter than
+    the largest coordinate difference along one axis, which bounds the
+    cells that need to be searched.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        Coordinate array of shape (Npoints, Ndim)
+    cell_size : float
+        Edge length of the cells. If None (default), the cells are sized
+        to hold about two points each, assuming the points are uniformly
+        distributed over their bounding box.
+    p : float
+        Order of the Minkowski p-norm. Defaults to ``2``, the euclidean
+        distance.
+
+    """
+    def __init__(self, coords: np.ndarray, cell_size: float = None, p: float = 2):
+        self.data = np.asarray(coords, dtype=float)
+        if self.data.ndim != 2:
+            raise ValueError("coords has to be of shape (Npoints, Ndim)")
+        self.p = p
+
+        n, ndim = self.data.shape
+        self.origin = self.data.min(axis=0) if n > 0 else np.zeros(ndim)
+        extent = self.data.max(axis=0) - self.origin if n > 0 else np.zeros(ndim)
+
+        if cell_size is None:
+            # about two points per cell on the bounding box
+            ext = extent[extent > 0]
+            if ext.size == 0:
+                cell_size = 1.
+            else:
+                cell_size = (np.prod(ext) * 2 / max(n, 1)) ** (1 / ext.size)
+        if not cell_size > 0:
+            raise ValueError("cell_size has to be positive")
+        self.cell_size = float(cell_size)
+
+        # number of cells along each axis
+        self.dims = np.floor(extent / self.cell_size).astype(np.int64) + 1
+        if np.prod(self.dims.astype(float)) >= np.iinfo(np.int64).max:
+            raise ValueError("cell_size is too small for the extent of the points")
+
+        # sort the points by cell
+        keys = self._keys(self._cells(self.data))
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+        # direct addressing of the cells, if the grid is not too sparse
+        ncells = int(np.prod(self.dims))
+        if ncells <= 8 * max(n, 1):
+            self.starts = np.searchsorted(self.keys, np.arange(ncells + 1))
+        else:
+            self.starts = None
+
+    def __len__(self):
+        return len(self.data)
+
+    def _cells(self, coords: np.ndarray) -> np.ndarray:
+        return np.floor((coords - self.origin) / self.cell_size).astype(np.int64)
+
+    def _keys(self, cells: np.ndarray) -> np.ndarray:
+        return np.ravel_multi_index(cells.T, self.dims)
+
+    def _cell_range(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end position of the points of the cells `keys`"""
+        if self.starts is not None:
+            return self.starts[keys], self.starts[keys + 1]
+        return (
+            np.searchsorted(self.keys, keys, side="left"),
+            np.searchsorted(self.keys, keys, side="right")
+        )
+
+    def _dist(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        diff = np.abs(a - b)
+        if self.p == 2:
+            return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        if self.p == 1:
+            return diff.sum(axis=1)
+        if np.isinf(self.p):
+            return diff.max(axis=1)
+        return np.sum(diff**self.p, axis=1)**(1 / self.p)
+
+    def _candidates(self, coords: np.ndarray, qidx: np.ndarray, ring: int):
+        """
+        All point pairs between the query points `qidx` and the indexed
+        points in the cells up to `ring` cells around the query points.
+        """
+        # query points outside of the grid search from the closest cell,
+        # which keeps ring * cell_size a lower bound of unsearched points
+        cells = np.clip(self._cells(coords[qidx]), 0, self.dims - 1)
+        ndim = cells.shape[1]
+
+        qi, pj = [np.array([], dtype=np.int64)], [np.array([], dtype=np.int64)]
+        for offset in itertools.product(range(-ring, ring + 1), repeat=ndim):
+            nb = cells + np.asarray(offset, dtype=np.int64)
+            valid = np.all((nb >= 0) & (nb < self.dims), axis=1)
+            if not np.any(valid):
+                continue
+
+            start, end = self._cell_range(self._keys(nb[valid]))
+            counts = end - start
+            total = counts.sum()
+            if total == 0:
+                continue
+
+            # expand each query point to all points of the cell
+            first = np.cumsum(counts) - counts
+            pos = np.arange(total) - np.repeat(first - start, counts)
+            qi.append(np.repeat(qidx[valid], counts))
+            pj.append(self.order[pos])
+
+        qi, pj = np.concatenate(qi), np.concatenate(pj)
+        return qi, pj, self._dist(coords[qi], self.data[pj])
+
+    def query_pairs(self, r: float, coords: np.ndarray = None):
+        """
+        Find all point pairs within distance `r`.
+
+        Parameters
+        ----------
+        r : float
+            Maximum distance of the point pairs
+        coords : numpy.ndarray
+            Query points of shape (Mpoints, Ndim). If None (default),
+            the point pairs ``i < j`` within the index are returned.
+
+        Returns
+        -------
+        i : numpy.ndarray
+            Index of the query points
+        j : numpy.ndarray
+            Index of the indexed points
+        d : numpy.ndarray
+            Distances of the point pairs
+
+        """
+        ring = max(1, int(np.ceil(r / self.cell_size)))
+        if coords is None:
+            return self._self_pairs(r, ring)
+
+        coords = np.asarray(coords, dtype=float)
+        qi, pj, d = self._candidates(coords, np.arange(len(coords)), ring)
+
+        mask = d <= r
+        return qi[mask], pj[mask], d[mask]
+
+    def _self_pairs(self, r: float, ring: int):
+        """
+        Point pairs within the index. Each pair of cells is visited once,
+        using only the offsets that are lexicographically not negative.
+        """
+        # work on the points sorted by cell
+        data = self.data[self.order]
+        cells = self._cells(data)
+        pos = np.arange(len(data))
+        ndim = cells.shape[1]
+
+        i, j, d = [np.array([], dtype=np.int64)], [np.array([], dtype=np.int64)], [np.array([])]
+        for offset in itertools.product(range(-ring, ring + 1), repeat=ndim):
+            if offset < (0, ) * ndim:
+                continue
+            nb = cells + np.asarray(offset, dtype=np.int64)
+            valid = np.all((nb >= 0) & (nb < self.dims), axis=1)
+            if not np.any(valid):
+                continue
+
+            start, end = self._cell_range(self._keys(nb[valid]))
+            if offset == (0, ) * ndim:
+                # pairs within the same cell only with the following points
+                start = pos[valid] + 1
+            counts = np.maximum(end - start, 0)
+            total = counts.sum()
+            if total == 0:
+                continue
+
+            first = np.cumsum(counts) - counts
+            pi = np.repeat(pos[valid], counts)
+            pj = np.arange(total) - np.repeat(first - start, counts)
+            dist = self._dist(data[pi], data[pj])
+
+            mask = dist <= r
+            i.append(pi[mask])
+            j.append(pj[mask])
+            d.append(dist[mask])
+
+        # map back to the input order, with i < j
+        i, j = self.order[np.concatenate(i)], self.order[np.concatenate(j)]
+        return np.minimum(i, j), np.maximum(i, j), np.concatenate(d)
+
+    def query(self, coords: np.ndarray, k: int = 1, distance_upper_bound: float = np.inf):
+        """
+        Find the `k` nearest neighbors of the query points, like
+        :func:`cKDTree.query <scipy.spatial.cKDTree.query>` with
+        a two-dimensional result. Missing neighbors are indicated by
+        ``len(self)`` and a distance of infinity. Neighbors at
+        exactly `distance_upper_bound` are included.
+
+        Returns
+        -------
+        d : numpy.ndarray
+            Array of shape (Mpoints, k) of the distances
+        idx : numpy.ndarray
+            Array of shape (Mpoints, k) of the neighbor indices
+
+        """
+        coords = np.asarray(coords, dtype=float)
+        m, n = len(coords), len(self)
+        dist = np.full((m, k), np.inf)
+        idx = np.full((m, k), n, dtype=np.int64)
+        if m == 0 or n == 0 or k == 0:
+            return dist, idx
+
+        # search in growing rings of cells, until the k-th neighbor is
+        # closer than the distance to the first unsearched cell
+        todo = np.arange(m)
+
+        # ring at which all cells are searched for each query point
+        cells = np.clip(self._cells(coords), 0, self.dims - 1)
+        max_ring = np.max(np.maximum(cells, self.dims - 1 - cells), axis=1)
+
+        if np.isfinite(distance_upper_bound):
+            ring = max(1, int(np.ceil(distance_upper_bound / self.cell_size)))
+        else:
+            ring = 1
+        while todo.size > 0:
+            ring = int(min(ring, max_ring[todo].max()))
+            qi, pj, d = self._candidates(coords, todo, ring)
+            within = d <= distance_upper_bound
+            qi, pj, d = qi[within], pj[within], d[within]
+
+            # rank the candidates of each query point by distance
+            order = np.lexsort((d, qi))
+            qi, pj, d = qi[order], pj[order], d[order]
+            first = np.searchsorted(qi, qi, side="left")
+            rank = np.arange(len(qi)) - first
+            keep = rank < k
+            qi, pj, d, rank = qi[keep], pj[keep], d[keep], rank[keep]
+
+            dist[todo] = np.inf
+            idx[todo] = n
+            dist[qi, rank] = d
+            idx[qi, rank] = pj
+
+            bound = ring * self.cell_size
+            done = (
+                (dist[todo, -1] <= bound) |
+                (bound >= distance_upper_bound) |
+                (ring >= max_ring[todo])
+            )
+            todo = todo[~done]
+            ring *= 2
+
+        return dist, idx
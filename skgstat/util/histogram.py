@@ -0,0 +1,128 @@
+"""
+Fine resolution histogram of pairwise distances. The binning methods
+can work on the weighted histogram bins instead of millions of raw
+distances, with an error bound by the width of the histogram bins.
+"""
+from typing import Union
+
+import numpy as np
+
+
+class DistanceHistogram:
+    """
+    .. versionadded:: 0.6.5
+
+    Histogram of `resolution` equal width bins between the smallest and
+    largest distance. It offers the same summary methods as the
+    :class:`QuantileSketch <skgstat.util.sketch.QuantileSketch>`, thus
+    both can be passed to the functions in :mod:`skgstat.binning` in
+    place of the distance array. The count, sum, minimum and maximum
+    are exact, the distances are assumed to be evenly spread within each
+    histogram bin. Quantiles are accurate to one bin width.
+
+    Parameters
+    ----------
+    distances : numpy.ndarray
+        Flat array of the distances. Non-finite values are ignored.
+    resolution : int
+        Number of histogram bins. Defaults to ``10000``.
+
+    """
+    def __init__(self, distances: np.ndarray, resolution: int = 10000):
+        if resolution < 1:
+            raise ValueError("resolution has to be a positive integer")
+        d = np.asarray(distances, dtype=float).ravel()
+        d = d[np.isfinite(d)]
+
+        self.resolution = int(resolution)
+        self.count = d.size
+        self.sum = float(np.sum(d))
+        self.min = float(np.min(d)) if d.size > 0 else np.inf
+        self.max = float(np.max(d)) if d.size > 0 else -np.inf
+
+        if d.size > 0:
+            self.counts, self.edges = np.histogram(
+                d, bins=self.resolution, range=(self.min, self.max)
+            )
+        else:
+            self.counts, self.edges = np.zeros(self.resolution, dtype=np.int64), np.zeros(self.resolution + 1)
+        self._cum = np.cumsum(self.counts)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def mean(self) -> float:
+        """Exact mean of all distances"""
+        return self.sum / self.count if self.count > 0 else np.nan
+
+    def rank(self, x: float) -> int:
+        """
+        Approximate number of distances smaller or equal to `x`.
+        """
+        if x >= self.max:
+            return self.count
+        if x < self.min:
+            return 0
+
+        k = min(int(np.searchsorted(self.edges, x, side='right')) - 1, self.resolution - 1)
+        frac = (x - self.edges[k]) / (self.edges[k + 1] - self.edges[k])
+        before = self._cum[k] - self.counts[k]
+        return int(round(before + frac * self.counts[k]))
+
+    def quantile(self, q: Union[float, np.ndarray], upper: float = None):
+        """
+        Approximate quantiles of the distances.
+
+        Parameters
+        ----------
+        q : float, numpy.ndarray
+            Quantiles in the interval ``[0, 1]``.
+        upper : float
+            If given, only the distances smaller or equal to `upper` are
+            considered, like ``np.quantile(x[x <= upper], q)``.
+
+        Returns
+        -------
+        quantiles : float, numpy.ndarray
+            NaN for an empty histogram.
+
+        """
+        n = self.count if upper is None else self.rank(upper)
+        if n == 0:
+            return np.full(np.shape(q), np.nan)[()]
+
+        # the distances of each bin are spread evenly over the bin
+        pos = np.asarray(q, dtype=float) * (n - 1)
+        k = np.minimum(np.searchsorted(self._cum, pos, side='right'), self.resolution - 1)
+        within = (pos - (self._cum[k] - self.counts[k]) + 0.5) / np.maximum(self.counts[k], 1)
+        result = self.edges[k] + np.clip(within, 0, 1) * (self.edges[k + 1] - self.edges[k])
+
+        # the extremes are known exactly
+        last = self.max if upper is None or upper >= self.max else upper
+        result = np.clip(result, self.min, last)
+        result = np.where(pos <= 0, self.min, result)
+        if upper is None or upper >= self.max:
+            result = np.where(pos >= n - 1, self.max, result)
+        return result[()]
+
+    def weighted(self, upper: float = None):
+        """
+        Centers of the non-empty histogram bins up to `upper` and the
+        number of distances in each of them.
+        """
+        centers = (self.edges[:-1] + self.edges[1:]) / 2
+        mask = self.counts > 0
+        if upper is not None:
+            mask &= centers <= upper
+        return centers[mask], self.counts[mask]
+
+    def std(self, upper: float = None) -> float:
+        """
+        Approximate standard deviation of the distances up to `upper`.
+        """
+        values, weights = self.weighted(upper=upper)
+        if values.size == 0:
+            return np.nan
+        mean = np.average(values, weights=weights)
+        return float(np.sqrt(np.average((values - mean) ** 2, weights=weights)))
@@ -31,4 +31,4 @@ def shannon_entropy(x, bins):
     p = c / np.sum(c) + 1e-15
 
     # map information function and return product
-    return - np.fromiter(map(np.log2, p), dtype=float).dot(p)
+    return - np.log2(p).dot(p)
@@ -0,0 +1,108 @@
+"""
+Shared memory blocks for the arrays of a
+:class:`MetricSpace <skgstat.MetricSpace>`. The arrays are exported
+once into :mod:`multiprocessing.shared_memory` and worker processes
+attach to the blocks by name, without copying the data.
+"""
+from typing import Tuple
+
+import numpy as np
+
+
+# blocks created or attached by this process, by name
+_BLOCKS = dict()
+
+
+def _shared_memory():
+    # shared_memory is new in Python 3.8, the import is deferred until
+    # sharing is requested, thus skgstat still imports on older versions
+    try:
+        from multiprocessing import shared_memory
+    except ImportError as e:  # pragma: no cover
+        raise ImportError(
+            "Sharing arrays needs multiprocessing.shared_memory, "
+            "which is available from Python 3.8 on."
+        ) from e
+    return shared_memory
+
+
+def _view(shm: 'shared_memory.SharedMemory', shape: tuple, dtype) -> np.ndarray:
+    # frombuffer keeps the buffer exported, thus the block cannot be
+    # unmapped while the view is alive
+    arr = np.frombuffer(shm.buf, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+    arr.flags.writeable = False
+    return arr
+
+
+def share_array(arr: np.ndarray) -> Tuple['shared_memory.SharedMemory', np.ndarray]:
+    """
+    .. versionadded:: 0.6.5
+
+    Copy `arr` into a new shared memory block.
+
+    Returns
+    -------
+    shm : multiprocessing.shared_memory.SharedMemory
+        The new block. The caller owns the block and has to
+        :func:`release <skgstat.util.shared.release>` it.
+    view : numpy.ndarray
+        Read-only view of the shared array
+
+    """
+    shared_memory = _shared_memory()
+    arr = np.ascontiguousarray(arr)
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    shm.buf[:arr.nbytes] = arr.reshape(-1).view(np.uint8)
+    _BLOCKS[shm.name] = shm
+
+    return shm, _view(shm, arr.shape, arr.dtype)
+
+
+def attach_array(name: str, shape: tuple, dtype) -> Tuple['shared_memory.SharedMemory', np.ndarray]:
+    """
+    .. versionadded:: 0.6.5
+
+    Attach to the shared memory block `name` and return a read-only
+    view of the array. Blocks already known to this process are
+    re-used.
+    """
+    shm = _BLOCKS.get(name)
+    if shm is None:
+        shared_memory = _shared_memory()
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # before Python 3.13, attaching registers the block with the
+            # resource tracker of this process, which would remove it when
+            # this process exits, although the block is owned by another one
+            from multiprocessing import resource_tracker
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args, **kwargs: None
+            try:
+                shm = shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+        _BLOCKS[name] = shm
+
+    return shm, _view(shm, shape, dtype)
+
+
+def release(shm: 'shared_memory.SharedMemory', unlink: bool = False):
+    """
+    .. versionadded:: 0.6.5
+
+    Close the block `shm` in this process. If `unlink` is True, the
+    block is removed, once all processes have closed it.
+    """
+    _BLOCKS.pop(shm.name, None)
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:  # pragma: no cover
+            pass
+    try:
+        shm.close()
+    except BufferError:
+        # views on the block are still alive, the memory is
+        # unmapped when they are garbage collected
+        pass
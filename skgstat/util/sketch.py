@@ -0,0 +1,209 @@
+"""
+Mergeable quantile sketch for streams of distances. The sketch keeps a
+few thousand weighted samples of the stream, thus the quantiles of
+all pairwise distances can be approximated chunk by chunk, without
+storing the distances.
+"""
+from typing import Union
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    .. versionadded:: 0.6.5
+
+    KLL quantile sketch [1]_ of a stream of values. The values are
+    collected in a hierarchy of compactors. Whenever a compactor is full,
+    it is sorted and every other value is promoted to the next level,
+    which doubles the weight of the promoted values. The count, sum,
+    minimum and maximum of the stream are tracked exactly.
+
+    As long as less than `k` values were added, the sketch is exact and
+    :func:`quantile <skgstat.util.sketch.QuantileSketch.quantile>` is
+    identical to :func:`numpy.percentile`. Beyond, the rank error of a
+    quantile is in the order of ``1 / k`` with high probability and
+    the sketch holds less than ``3 * k`` values.
+
+    Parameters
+    ----------
+    k : int
+        Size of the largest compactor. Defaults to ``2048``.
+    seed : int
+        Seed for the random offsets of the compactions. The sketch is
+        deterministic for a given seed and order of updates.
+
+    References
+    ----------
+    .. [1] Karnin, Z., Lang, K., Liberty, E. (2016): Optimal Quantile
+        Approximation in Streams. 2016 IEEE 57th Annual Symposium on
+        Foundations of Computer Science (FOCS), 71-78.
+
+    """
+    def __init__(self, k: int = 2048, seed: int = 42):
+        if k < 8:
+            raise ValueError("k has to be at least 8")
+        self.k = int(k)
+        self._rng = np.random.default_rng(seed)
+
+        self._levels = [np.array([], dtype=float)]
+        self.count = 0
+        self.sum = 0.
+        self.min = np.inf
+        self.max = -np.inf
+
+    def __len__(self):
+        return self.count
+
+    def _capacity(self, h: int) -> int:
+        # the top level has k, the ones below shrink by 2 / 3
+        depth = len(self._levels) - 1 - h
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 8)
+
+    def _compress(self):
+        h = 0
+        while h < len(self._levels):
+            buf = self._levels[h]
+            if buf.size > self._capacity(h):
+                buf = np.sort(buf)
+
+                # an odd value stays on this level
+                keep = buf.size % 2
+                offset = int(self._rng.integers(2))
+                promoted = buf[keep + offset::2]
+
+                self._levels[h] = buf[:keep]
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.array([], dtype=float))
+                self._levels[h + 1] = np.concatenate((self._levels[h + 1], promoted))
+            h += 1
+
+    def update(self, values: np.ndarray):
+        """
+        Add the finite `values` to the sketch.
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+
+        self.count += values.size
+        self.sum += float(np.sum(values))
+        self.min = min(self.min, float(np.min(values)))
+        self.max = max(self.max, float(np.max(values)))
+
+        self._levels[0] = np.concatenate((self._levels[0], values))
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        """
+        Add all values of the sketch `other` to this sketch.
+        """
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.array([], dtype=float))
+        for h, buf in enumerate(other._levels):
+            self._levels[h] = np.concatenate((self._levels[h], buf))
+
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    @property
+    def mean(self) -> float:
+        """Exact mean of all values"""
+        return self.sum / self.count if self.count > 0 else np.nan
+
+    def _sorted(self, upper: float = None):
+        """Sorted values and their cumulative weights"""
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(buf.size, 2 ** h, dtype=np.int64)
+            for h, buf in enumerate(self._levels)
+        ])
+        if upper is not None:
+            inside = values <= upper
+            values, weights = values[inside], weights[inside]
+
+        order = np.argsort(values, kind='stable')
+        cumw = np.cumsum(weights[order])
+        return values[order], cumw
+
+    def rank(self, x: float) -> int:
+        """
+        Approximate number of values smaller or equal to `x`.
+        """
+        if x >= self.max:
+            return self.count
+        values, cumw = self._sorted()
+        pos = np.searchsorted(values, x, side='right')
+        return int(cumw[pos - 1]) if pos > 0 else 0
+
+    def quantile(self, q: Union[float, np.ndarray], upper: float = None):
+        """
+        Approximate quantiles of the values.
+
+        Parameters
+        ----------
+        q : float, numpy.ndarray
+            Quantiles in the interval ``[0, 1]``.
+        upper : float
+            If given, only the values smaller or equal to `upper` are
+            considered, like ``np.quantile(x[x <= upper], q)``.
+
+        Returns
+        -------
+        quantiles : float, numpy.ndarray
+            Interpolated linearly between the ranks, like
+            :func:`numpy.quantile`. NaN for an empty sketch.
+
+        """
+        values, cumw = self._sorted(upper=upper)
+        if values.size == 0:
+            return np.full(np.shape(q), np.nan)[()]
+
+        # fractional rank of the quantiles, each value covers the
+        # ranks [cumw - w, cumw - 1]
+        pos = np.asarray(q, dtype=float) * (cumw[-1] - 1)
+        low = np.floor(pos)
+        frac = pos - low
+        a = values[np.minimum(np.searchsorted(cumw, low, side='right'), values.size - 1)]
+        b = values[np.minimum(np.searchsorted(cumw, low + 1, side='right'), values.size - 1)]
+
+        # same interpolation as numpy
+        diff = b - a
+        result = np.where(frac >= 0.5, b - diff * (1 - frac), a + diff * frac)
+
+        # the extremes are known exactly
+        result = np.where(pos <= 0, self.min, result)
+        if upper is None or upper >= self.max:
+            result = np.where(pos >= cumw[-1] - 1, self.max, result)
+        return result[()]
+
+    def weighted(self, upper: float = None):
+        """
+        Sorted values of the sketch up to `upper` and their weights.
+        """
+        values, cumw = self._sorted(upper=upper)
+        return values, np.diff(np.concatenate(([0], cumw)))
+
+    def std(self, upper: float = None) -> float:
+        """
+        Approximate standard deviation of the values up to `upper`.
+        """
+        values, weights = self.weighted(upper=upper)
+        if values.size == 0:
+            return np.nan
+        mean = np.average(values, weights=weights)
+        return float(np.sqrt(np.average((values - mean) ** 2, weights=weights)))
+
+    @classmethod
+    def from_chunks(cls, chunks, **kwargs) -> 'QuantileSketch':
+        """
+        Build a sketch from an iterable of value arrays.
+        """
+        sketch = cls(**kwargs)
+        for chunk in chunks:
+            sketch.update(chunk)
+        return sketch
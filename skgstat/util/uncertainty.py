@@ -80,6 +80,10 @@ def propagate(
         how many processes may be spawned in parallel. None will spwan
         only one (default).
 
+        .. versionchanged:: 0.6.5
+            The MetricSpace is shared with the worker processes using
+            :func:`MetricSpace.share <skgstat.MetricSpace.share>`.
+
         .. note::
             This is an untested experimental feature.
 
@@ -174,8 +178,18 @@ def propagate(
     else:
         generator = (delayed(func)(par) for par in param_field)
 
+    # share the distances with all workers, instead of copying them
+    n_jobs = kwargs.get('n_jobs')
+    share = n_jobs is not None and n_jobs != 1 and not metricSpace.shared
+    if share:
+        metricSpace.share()
+
     # run
-    result = worker(generator)
+    try:
+        result = worker(generator)
+    finally:
+        if share:
+            metricSpace.unshare()
 
     # split up conf intervals
     conf_intervals = []